@@ -0,0 +1,52 @@
+"""
+Jinx and Gravity Level Compiler
+
+Compiles the Tiled JSON maps into the binary level files the game loads
+in their place. Run it after editing a map:
+
+python compile_levels.py          # compile every level
+python compile_levels.py 3 7      # compile levels 3 and 7
+python compile_levels.py --check  # list levels whose compiled file is missing or stale
+"""
+import argparse
+import os
+import time
+
+import jinxs_adventure
+
+
+def all_levels():
+    """ Every level that has a Tiled map """
+    levels = []
+    level = 0
+    while os.path.exists(jinxs_adventure.level_map_paths(level)[0]):
+        levels.append(level)
+        level += 1
+    return levels
+
+
+def main():
+    """ Main function """
+    parser = argparse.ArgumentParser(description="Compile Tiled maps into binary level files")
+    parser.add_argument("levels", nargs="*", type=int, help="levels to compile (default: all)")
+    parser.add_argument("--check", action="store_true",
+                        help="only report levels whose compiled file is missing or stale")
+    args = parser.parse_args()
+
+    stale = 0
+    for level in args.levels or all_levels():
+        json_path, compiled_path = jinxs_adventure.level_map_paths(level)
+        if args.check:
+            if not jinxs_adventure.compiled_level_is_fresh(json_path, compiled_path):
+                print(f"level {level}: stale")
+                stale += 1
+            continue
+        start_time = time.perf_counter()
+        size = jinxs_adventure.compile_level(json_path, compiled_path)
+        print(f"level {level}: {os.path.getsize(json_path):,} -> {size:,} bytes "
+              f"in {time.perf_counter() - start_time:.2f}s")
+    return 1 if stale else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -5,8 +5,22 @@ This is the main game script
 """
 import os
 import math
+import bisect
+import collections
+import hashlib
+import itertools
+import json
+import pathlib
+import struct
+import threading
+import time
+import zlib
 import arcade
-import random
+import numpy as np
+import PIL.Image
+import pyglet
+import pymunk
+import pytiled_parser
 # from signal import pause
 from sys import builtin_module_names
 from tokenize import Name
@@ -14,6 +28,7 @@ from typing import Optional
 from unicodedata import name
 
 from arcade import Point
+from arcade.arcade_types import TiledObject
 
 file_path = os.path.dirname(os.path.abspath(__file__))
 
@@ -111,12 +126,51 @@ LEFT_FACING = 1
 # How many pixels to move before we change the texture in the walking animation
 DISTANCE_TO_CHANGE_TEXTURE = 20
 
+# Animation frames
+
+# Where each frame of a character is in its AnimationSet.frames: idle, jump
+# and fall, then the walk cycle and the climb
+ANIMATION_FRAME_IDLE = 0
+ANIMATION_FRAME_JUMP = 1
+ANIMATION_FRAME_FALL = 2
+ANIMATION_FRAME_WALK = 3
+ANIMATION_WALK_FRAMES = 8
+ANIMATION_FRAME_CLIMB = ANIMATION_FRAME_WALK + ANIMATION_WALK_FRAMES
+ANIMATION_CLIMB_FRAMES = 2
+ANIMATION_FRAME_COUNT = ANIMATION_FRAME_CLIMB + ANIMATION_CLIMB_FRAMES
+
+# Set to False to change the texture of an animated sprite as its frame
+# changes, rather than having the GPU pick the frame (see AnimatedSpriteRenderer)
+USE_GPU_ANIMATION = True
+
+class AnimatedSprite(arcade.Sprite):
+    """
+    A sprite that shows one frame of its AnimationSet at a time.
+
+    Changing a sprite's texture takes it out of and back into spatial
+    hashes and updates it in every sprite list it is in. With GPU animation
+    the frame and facing are only recorded, and the texture is left alone.
+    """
+    def __init__(self):
+        super().__init__()
+        self.animation_set = None
+        self.animation_frame = ANIMATION_FRAME_IDLE
+        self.animation_facing = RIGHT_FACING
+
+    def show_frame(self, frame, facing):
+        """ Show a frame, facing left or right """
+        self.animation_frame = frame
+        self.animation_facing = facing
+        if not USE_GPU_ANIMATION:
+            self.texture = self.animation_set.frames[frame][facing]
+
 # Main Player Class
-class PlayerSprite(arcade.Sprite):
+class PlayerSprite(AnimatedSprite):
     """ Player Sprite """
     def __init__(self,
                  ladder_list: arcade.SpriteList,
-                 hit_box_algorithm):
+                 hit_box_algorithm,
+                 sensors=None):
         """ Init """
         # Let parent initialize
         super().__init__()
@@ -125,26 +179,14 @@ class PlayerSprite(arcade.Sprite):
         self.scale = SPRITE_SCALING_PLAYER
 
         # Images from Character pack
-        main_path = file_path + "\\src\\resources\\images\\animated_characters\\jinx\\jinx"
+        main_path = file_path + "/src/resources/images/animated_characters/jinx/jinx"
 
-        # Load textures for idle standing
+        # Load textures for idle standing, with the hit box we were asked for
         self.idle_texture_pair = arcade.load_texture_pair(f"{main_path}_idle.png",
                                                           hit_box_algorithm=hit_box_algorithm)
-        self.jump_texture_pair = arcade.load_texture_pair(f"{main_path}_jump.png")
-        self.fall_texture_pair = arcade.load_texture_pair(f"{main_path}_fall.png")
-
-        # Load textures for walking
-        self.walk_textures = []
-        for i in range(8):
-            texture = arcade.load_texture_pair(f"{main_path}_walk{i}.png")
-            self.walk_textures.append(texture)
-
-        # Load textures for climbing
-        self.climbing_textures = []
-        texture = arcade.load_texture(f"{main_path}_climb0.png")
-        self.climbing_textures.append(texture)
-        texture = arcade.load_texture(f"{main_path}_climb1.png")
-        self.climbing_textures.append(texture)
+
+        # Every frame, shared with any other player
+        self.animation_set = animation_registry.get("jinx", "jinx")
 
         # Set the initial texture
         self.texture = self.idle_texture_pair[0]
@@ -165,6 +207,15 @@ class PlayerSprite(arcade.Sprite):
         self.ladder_list = ladder_list
         self.is_on_ladder = False
 
+        # Physics sensor events, which count the ladders we overlap
+        self.sensors = sensors
+
+    def touching_ladder(self):
+        """ Are we touching a ladder? """
+        if self.sensors is not None:
+            return self.sensors.overlapping(LAYER_NAME_LADDERS)
+        return len(arcade.check_for_collision_with_list(self, self.ladder_list)) > 0
+
     def pymunk_moved(self, physics_engine, dx, dy, d_angle):
         """ Handle being moved by the pymunk engine """
         # Figure out if we need to face left or right
@@ -177,7 +228,7 @@ class PlayerSprite(arcade.Sprite):
         is_on_ground = physics_engine.is_on_ground(self)
 
         # Are we on a ladder?
-        if len(arcade.check_for_collision_with_list(self, self.ladder_list)) > 0:
+        if self.touching_ladder():
             if not self.is_on_ladder:
                 self.is_on_ladder = True
                 self.pymunk.gravity = (0, 0)
@@ -206,21 +257,22 @@ class PlayerSprite(arcade.Sprite):
 
             if self.cur_texture > 1:
                 self.cur_texture = 0
-            self.texture = self.climbing_textures[self.cur_texture]
+            # The climbing frames aren't mirrored
+            self.show_frame(ANIMATION_FRAME_CLIMB + self.cur_texture, RIGHT_FACING)
             return
 
         # Jumping animation
         if not is_on_ground:
             if dy > DEAD_ZONE:
-                self.texture = self.jump_texture_pair[self.character_face_direction]
+                self.show_frame(ANIMATION_FRAME_JUMP, self.character_face_direction)
                 return
             elif dy < -DEAD_ZONE:
-                self.texture = self.fall_texture_pair[self.character_face_direction]
+                self.show_frame(ANIMATION_FRAME_FALL, self.character_face_direction)
                 return
 
         # Idle animation
         if abs(dx) <= DEAD_ZONE:
-            self.texture = self.idle_texture_pair[self.character_face_direction]
+            self.show_frame(ANIMATION_FRAME_IDLE, self.character_face_direction)
             return
 
         # Have we moved far enough to change the texture?
@@ -233,7 +285,7 @@ class PlayerSprite(arcade.Sprite):
             self.cur_texture += 1
             if self.cur_texture > 7:
                 self.cur_texture = 0
-            self.texture = self.walk_textures[self.cur_texture][self.character_face_direction]
+            self.show_frame(ANIMATION_FRAME_WALK + self.cur_texture, self.character_face_direction)
 
 SPRITE_SCALING_ENEMIES = 0.8
 ENEMY_SPRITE_IMAGE_SIZE = 64
@@ -244,13 +296,99 @@ def load_texture_pair(filename):
     """
     Load a texture pair, with the second being a mirror image.
     """
-    return [
+    return (
         arcade.load_texture(filename),
         arcade.load_texture(filename, flipped_horizontally=True),
-    ]
+    )
+
+# Every frame an enemy or ally can show, plus the hit box taken from the idle frame.
+# Tuples all the way down so one set can be safely shared by every instance.
+AnimationSet = collections.namedtuple(
+    "AnimationSet",
+    ["idle_texture_pair", "jump_texture_pair", "fall_texture_pair",
+     "walk_textures", "climbing_textures", "hit_box", "frames"],
+)
+
+def load_animation_set(name_folder, name_file):
+    """
+    Load all the frames for one character from disk.
+    """
+    main_path = file_path + f"/src/resources/images/animated_characters/{name_folder}/{name_file}"
+
+    idle_texture_pair = load_texture_pair(f"{main_path}_idle.png")
+    jump_texture_pair = load_texture_pair(f"{main_path}_jump.png")
+    fall_texture_pair = load_texture_pair(f"{main_path}_fall.png")
+    # Textures for walking
+    walk_textures = tuple(load_texture_pair(f"{main_path}_walk{i}.png") for i in range(ANIMATION_WALK_FRAMES))
+    # Textures for climbing
+    climbing_textures = tuple(arcade.load_texture(f"{main_path}_climb{i}.png")
+                              for i in range(ANIMATION_CLIMB_FRAMES))
+
+    # Hit box will be set based on the first image used. If you want to specify
+    # a different hit box, you can do it like the code below.
+    # hit_box = ((-22, -64), (22, -64), (22, 28), (-22, 28))
+    hit_box = tuple(tuple(point) for point in idle_texture_pair[0].hit_box_points)
+
+    return AnimationSet(
+        idle_texture_pair=idle_texture_pair,
+        jump_texture_pair=jump_texture_pair,
+        fall_texture_pair=fall_texture_pair,
+        walk_textures=walk_textures,
+        climbing_textures=climbing_textures,
+        hit_box=hit_box,
+        # Every frame as a pair, in ANIMATION_FRAME order. Climbing frames
+        # aren't mirrored, so are the same either way.
+        frames=(idle_texture_pair, jump_texture_pair, fall_texture_pair) + walk_textures
+        + tuple((texture, texture) for texture in climbing_textures),
+    )
+
+class AnimationRegistry:
+    """
+    Process-wide cache of animation sets keyed by (name_folder, name_file).
+
+    The first enemy or ally of a kind loads its frames, every later one gets
+    the very same AnimationSet, so texture memory grows with the number of
+    distinct characters rather than with the number of sprites.
+    """
+    def __init__(self):
+        self._animation_sets = {}
+
+        # Levels are prefetched on a worker thread, which loads sets too
+        self._lock = threading.Lock()
+
+        # Counters, handy when profiling level loads
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, name_folder, name_file):
+        """ Return the shared animation set, loading it on first use """
+        key = (name_folder, name_file)
+        with self._lock:
+            animation_set = self._animation_sets.get(key)
+            if animation_set is None:
+                self.misses += 1
+                animation_set = load_animation_set(name_folder, name_file)
+                self._animation_sets[key] = animation_set
+            else:
+                self.hits += 1
+        return animation_set
+
+    def clear(self):
+        """ Forget every cached set and reset the counters """
+        self._animation_sets.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._animation_sets)
+
+    def __contains__(self, key):
+        return key in self._animation_sets
+
+animation_registry = AnimationRegistry()
 
 # Base enemy class
-class Entity(arcade.Sprite):
+class Entity(AnimatedSprite):
     def __init__(self, name_folder, name_file):
         super().__init__()
 
@@ -261,34 +399,33 @@ class Entity(arcade.Sprite):
         self.cur_texture = 0
         self.scale = SPRITE_SCALING_ENEMIES
 
-        main_path = file_path + f"/src/resources/images/animated_characters/{name_folder}/{name_file}"
-
-        self.idle_texture_pair = load_texture_pair(f"{main_path}_idle.png")
-        self.jump_texture_pair = load_texture_pair(f"{main_path}_jump.png")
-        self.fall_texture_pair = load_texture_pair(f"{main_path}_fall.png")
-
-        # Load textures for walking
-        self.walk_textures = []
-        for i in range(8):
-            texture = load_texture_pair(f"{main_path}_walk{i}.png")
-            self.walk_textures.append(texture)
+        # Frames are shared between every instance of the same character
+        self.animation_set = animation_registry.get(name_folder, name_file)
 
-        # Load textures for climbing
-        self.climbing_textures = []
-        texture = arcade.load_texture(f"{main_path}_climb0.png")
-        self.climbing_textures.append(texture)
-        texture = arcade.load_texture(f"{main_path}_climb1.png")
-        self.climbing_textures.append(texture)
+        self.idle_texture_pair = self.animation_set.idle_texture_pair
+        self.jump_texture_pair = self.animation_set.jump_texture_pair
+        self.fall_texture_pair = self.animation_set.fall_texture_pair
+        self.walk_textures = self.animation_set.walk_textures
+        self.climbing_textures = self.animation_set.climbing_textures
 
         # Set the initial texture
         self.texture = self.idle_texture_pair[0]
 
-        # Hit box will be set based on the first image used. If you want to specify
-        # a different hit box, you can do it like the code below.
-        # self.set_hit_box([[-22, -64], [22, -64], [22, 28], [-22, 28]])
-        self.set_hit_box(self.texture.hit_box_points) 
+        # Hit box was worked out once when the set was loaded
+        self.set_hit_box(self.animation_set.hit_box)
+
+# Enemy weapons. A RandomFire volley has a 1 in odds chance of firing each frame,
+# an AimedFire volley shoots at the player every rate frames.
+RandomFire = collections.namedtuple("RandomFire", ["odds", "change_x", "change_y", "weapon"])
+AimedFire = collections.namedtuple("AimedFire", ["rate", "bullet_speed", "weapon"])
+
+# Everything the game needs to know about an enemy type, declared once on the class
+# so it can be looked up straight from type(enemy) without building a throwaway enemy.
+EnemyBehaviour = collections.namedtuple("EnemyBehaviour", ["health", "kill_score", "weapons"])
 
 class Enemy(Entity):
+    behaviour = EnemyBehaviour(health=0, kill_score=0, weapons=())
+
     def __init__(self, name_folder, name_file):
 
         # Setup parent class
@@ -297,6 +434,9 @@ class Enemy(Entity):
         self.should_update_walk = 0
         self.scale = SPRITE_SCALING_ENEMIES
 
+        # Starting health comes from the behaviour table
+        self.health = self.behaviour.health
+
     def update_animation(self, delta_time: float = 1 / 60):
 
         # Figure out if we need to flip face left or right
@@ -307,7 +447,7 @@ class Enemy(Entity):
 
         # Idle animation
         if self.change_x == 0:
-            self.texture = self.idle_texture_pair[self.facing_direction]
+            self.show_frame(ANIMATION_FRAME_IDLE, self.facing_direction)
             return
 
         # Walking animation
@@ -315,148 +455,333 @@ class Enemy(Entity):
             self.cur_texture += 1
             if self.cur_texture > 7:
                 self.cur_texture = 0
-            self.texture = self.walk_textures[self.cur_texture][self.facing_direction]
+            self.show_frame(ANIMATION_FRAME_WALK + self.cur_texture, self.facing_direction)
             self.should_update_walk = 0
             return
 
         self.should_update_walk += 1
 
 class GreenWorm(Enemy):
+    behaviour = EnemyBehaviour(
+        health=10,
+        kill_score=10,
+        weapons=(
+            RandomFire(odds=2000, change_x=-1, change_y=0, weapon="meteorGrey_tiny1.png"),
+            RandomFire(odds=2000, change_x=1, change_y=0, weapon="meteorGrey_tiny1.png"),
+        ),
+    )
+
     def __init__(self):
 
         # Set up parent class
         super().__init__("wormGreen", "wormGreen")
 
-        self.health = 10
-
 class BlueSlime(Enemy):
+    behaviour = EnemyBehaviour(
+        health=20,
+        kill_score=20,
+        weapons=(
+            RandomFire(odds=1000, change_x=-2, change_y=0, weapon="candyBlue.png"),
+            RandomFire(odds=1000, change_x=2, change_y=0, weapon="candyBlue.png"),
+        ),
+    )
+
     def __init__(self):
 
         # Set up parent class
         super().__init__("slimeBlue", "slimeBlue")
 
-        self.health = 20
-
 class LavaSnake(Enemy):
+    behaviour = EnemyBehaviour(
+        health=50,
+        kill_score=50,
+        weapons=(
+            RandomFire(odds=500, change_x=-4, change_y=0, weapon="lava_ball_small.png"),
+            RandomFire(odds=500, change_x=4, change_y=0, weapon="lava_ball_small.png"),
+            RandomFire(odds=500, change_x=-4, change_y=-1, weapon="lava_ball_small.png"),
+            RandomFire(odds=500, change_x=4, change_y=-1, weapon="lava_ball_small.png"),
+            RandomFire(odds=500, change_x=-4, change_y=1, weapon="lava_ball_small.png"),
+            RandomFire(odds=500, change_x=4, change_y=1, weapon="lava_ball_small.png"),
+        ),
+    )
+
     def __init__(self):
 
         # Set up parent class
         super().__init__("snakeLava", "snakeLava")
 
-        self.health = 50
-
 class GreenSlime(Enemy):
+    behaviour = EnemyBehaviour(
+        health=50,
+        kill_score=50,
+        weapons=(
+            RandomFire(odds=500, change_x=-3, change_y=0, weapon="candyGreen.png"),
+            RandomFire(odds=500, change_x=-3, change_y=1, weapon="candyGreen.png"),
+            RandomFire(odds=500, change_x=3, change_y=0, weapon="candyGreen.png"),
+            RandomFire(odds=500, change_x=3, change_y=1, weapon="candyGreen.png"),
+        ),
+    )
+
     def __init__(self):
 
         # Set up parent class
         super().__init__("slimeGreen", "slimeGreen")
 
-        self.health = 50
-
 class PurpleSlime(Enemy):
+    behaviour = EnemyBehaviour(
+        health=100,
+        kill_score=100,
+        weapons=(
+            RandomFire(odds=250, change_x=-4, change_y=0, weapon="candyRed.png"),
+            RandomFire(odds=250, change_x=4, change_y=0, weapon="candyRed.png"),
+            RandomFire(odds=250, change_x=-4, change_y=1, weapon="candyRed.png"),
+            RandomFire(odds=250, change_x=4, change_y=1, weapon="candyRed.png"),
+        ),
+    )
+
     def __init__(self):
 
         # Set up parent class
         super().__init__("slimePurple", "slimePurple")
 
-        self.health = 100
-
 class Thunderer(Enemy):
+    behaviour = EnemyBehaviour(
+        health=150,
+        kill_score=150,
+        weapons=(
+            RandomFire(odds=500, change_x=1, change_y=-3, weapon="thunderbullet1.png"),
+            RandomFire(odds=500, change_x=-1, change_y=-3, weapon="thunderbullet1.png"),
+            RandomFire(odds=500, change_x=-2, change_y=-6, weapon="thunderbullet2.png"),
+            RandomFire(odds=500, change_x=2, change_y=-6, weapon="thunderbullet2.png"),
+            RandomFire(odds=500, change_x=0, change_y=-10, weapon="sparky.png"),
+            AimedFire(rate=360, bullet_speed=6, weapon="thunderbullet.png"),
+        ),
+    )
+
     def __init__(self):
 
         # Set up parent class
         super().__init__("thunderer", "thunderer")
 
-        self.health = 150
-
 class BlueSlimeBoss(Enemy):
+    behaviour = EnemyBehaviour(
+        health=2500,
+        kill_score=2500,
+        weapons=(
+            AimedFire(rate=60, bullet_speed=6, weapon="spinner.png"),
+            RandomFire(odds=1000, change_x=-10, change_y=0, weapon="spinner.png"),
+            RandomFire(odds=1000, change_x=-10, change_y=1, weapon="spinner.png"),
+            RandomFire(odds=1000, change_x=-10, change_y=2, weapon="spinner.png"),
+            RandomFire(odds=1000, change_x=-10, change_y=3, weapon="spinner.png"),
+            RandomFire(odds=1000, change_x=-10, change_y=4, weapon="spinner.png"),
+            RandomFire(odds=1000, change_x=-10, change_y=-1, weapon="spinner.png"),
+            RandomFire(odds=1000, change_x=-10, change_y=-2, weapon="spinner.png"),
+            RandomFire(odds=1000, change_x=-10, change_y=-3, weapon="spinner.png"),
+            RandomFire(odds=1000, change_x=-10, change_y=-4, weapon="spinner.png"),
+            RandomFire(odds=1000, change_x=10, change_y=0, weapon="spinner.png"),
+            RandomFire(odds=1000, change_x=10, change_y=1, weapon="spinner.png"),
+            RandomFire(odds=1000, change_x=10, change_y=2, weapon="spinner.png"),
+            RandomFire(odds=1000, change_x=10, change_y=3, weapon="spinner.png"),
+            RandomFire(odds=1000, change_x=10, change_y=4, weapon="spinner.png"),
+            RandomFire(odds=1000, change_x=10, change_y=-1, weapon="spinner.png"),
+            RandomFire(odds=1000, change_x=10, change_y=-2, weapon="spinner.png"),
+            RandomFire(odds=1000, change_x=10, change_y=-3, weapon="spinner.png"),
+            RandomFire(odds=1000, change_x=10, change_y=-4, weapon="spinner.png"),
+        ),
+    )
+
     def __init__(self):
 
         # Set up parent class
         super().__init__("slimeBlueBoss", "slimeBlueBoss")
 
-        self.health = 2500
-
 class Chomper(Enemy):
+    behaviour = EnemyBehaviour(
+        health=350,
+        kill_score=350,
+        weapons=(
+            AimedFire(rate=100, bullet_speed=8, weapon="chomper_bullet.png"),
+        ),
+    )
+
     def __init__(self):
 
         # Set up parent class
         super().__init__("chomper", "chomper")
 
-        self.health = 350
-
 class SilverSlime(Enemy):
+    behaviour = EnemyBehaviour(
+        health=1000,
+        kill_score=1000,
+        weapons=(
+            AimedFire(rate=120, bullet_speed=8, weapon="spinner.png"),
+        ),
+    )
+
     def __init__(self):
 
         # Set up parent class
         super().__init__("slimeSilver", "slimeSilver")
 
-        self.health = 1000
-
 class DiamondShooter(Enemy):
+    behaviour = EnemyBehaviour(
+        health=500,
+        kill_score=500,
+        weapons=(
+            RandomFire(odds=1000, change_x=-10, change_y=2, weapon="gemYellow.png"),
+            RandomFire(odds=1000, change_x=-20, change_y=-1, weapon="gemGreen.png"),
+            RandomFire(odds=1000, change_x=-30, change_y=1, weapon="gemBlue.png"),
+            RandomFire(odds=1000, change_x=-20, change_y=-2, weapon="gemGreen.png"),
+            RandomFire(odds=1000, change_x=-30, change_y=2, weapon="gemBlue.png"),
+            RandomFire(odds=1000, change_x=-40, change_y=0, weapon="gemRed.png"),
+            RandomFire(odds=1000, change_x=10, change_y=2, weapon="gemYellow.png"),
+            RandomFire(odds=1000, change_x=20, change_y=-1, weapon="gemGreen.png"),
+            RandomFire(odds=1000, change_x=30, change_y=1, weapon="gemBlue.png"),
+            RandomFire(odds=1000, change_x=20, change_y=-2, weapon="gemGreen.png"),
+            RandomFire(odds=1000, change_x=30, change_y=2, weapon="gemBlue.png"),
+            RandomFire(odds=1000, change_x=40, change_y=0, weapon="gemRed.png"),
+            RandomFire(odds=1000, change_x=0, change_y=10, weapon="gemYellow.png"),
+        ),
+    )
+
     def __init__(self):
 
         # Set up parent class
         super().__init__("diamondshooter", "diamondshooter")
 
-        self.health = 500
-
 class PrimarySlime(Enemy):
+    behaviour = EnemyBehaviour(
+        health=1500,
+        kill_score=1500,
+        weapons=(
+            AimedFire(rate=360, bullet_speed=12, weapon="mupBiggest.png"),
+            AimedFire(rate=120, bullet_speed=8, weapon="mupBig.png"),
+            AimedFire(rate=60, bullet_speed=4, weapon="mupSmall.png"),
+        ),
+    )
+
     def __init__(self):
 
         # Set up parent class
         super().__init__("primaryslime", "primaryslime")
 
-        self.health = 1500
-
 class SecondarySlime(Enemy):
+    behaviour = EnemyBehaviour(
+        health=3000,
+        kill_score=3000,
+        weapons=(
+            AimedFire(rate=120, bullet_speed=12, weapon="mupBiggest2.png"),
+            AimedFire(rate=60, bullet_speed=8, weapon="mupBig2.png"),
+            AimedFire(rate=30, bullet_speed=4, weapon="mupSmall2.png"),
+        ),
+    )
+
     def __init__(self):
 
         # Set up parent class
         super().__init__("secondaryslime", "secondaryslime")
 
-        self.health = 3000
-
 class SuperThunderer(Enemy):
+    behaviour = EnemyBehaviour(
+        health=10000,
+        kill_score=10000,
+        weapons=(
+            RandomFire(odds=100, change_x=1, change_y=-3, weapon="thunderbullet1.png"),
+            RandomFire(odds=100, change_x=-1, change_y=-3, weapon="thunderbullet1.png"),
+            RandomFire(odds=100, change_x=-2, change_y=-6, weapon="thunderbullet2.png"),
+            RandomFire(odds=100, change_x=2, change_y=-6, weapon="thunderbullet2.png"),
+            RandomFire(odds=100, change_x=0, change_y=-10, weapon="sparky.png"),
+            AimedFire(rate=30, bullet_speed=12, weapon="thunderbullet.png"),
+        ),
+    )
+
     def __init__(self):
 
         # Set up parent class
         super().__init__("superthunderer", "superthunderer")
 
-        self.health = 10000
-
 class RobotEnemy(Enemy):
+    behaviour = EnemyBehaviour(
+        health=5000,
+        kill_score=5000,
+        weapons=(
+            AimedFire(rate=60, bullet_speed=5, weapon="laserRed02.png"),
+            AimedFire(rate=20, bullet_speed=2, weapon="laserBlue01.png"),
+        ),
+    )
+
     def __init__(self):
 
         # Set up parent class
         super().__init__("robot", "robot")
 
-        self.health = 5000
-
 class RolyPolyBot(Enemy):
+    behaviour = EnemyBehaviour(
+        health=10000,
+        kill_score=10000,
+        weapons=(
+            AimedFire(rate=40, bullet_speed=10, weapon="laserGreenHorizontal.png"),
+            AimedFire(rate=30, bullet_speed=5, weapon="laserRed02.png"),
+            AimedFire(rate=20, bullet_speed=2, weapon="laserBlue01.png"),
+        ),
+    )
+
     def __init__(self):
 
         # Set up parent class
         super().__init__("rolypolybot", "rolypolybot")
 
-        self.health = 10000
-
 class MasterVerse(Enemy):
+    behaviour = EnemyBehaviour(
+        health=50000,
+        kill_score=50000,
+        weapons=(
+            AimedFire(rate=60, bullet_speed=20, weapon="laserPurple.png"),
+            AimedFire(rate=30, bullet_speed=10, weapon="laserGreenHorizontal.png"),
+            AimedFire(rate=20, bullet_speed=5, weapon="laserRed02.png"),
+            AimedFire(rate=10, bullet_speed=2, weapon="laserBlue01.png"),
+        ),
+    )
+
     def __init__(self):
 
         # Set up parent class
         super().__init__("masterverse", "masterverse")
 
-        self.health = 50000
-
 class FlufflePop(Enemy):
+    behaviour = EnemyBehaviour(
+        health=100000,
+        kill_score=100000,
+        weapons=(
+            AimedFire(rate=20, bullet_speed=20, weapon="laserPurple.png"),
+            AimedFire(rate=10, bullet_speed=10, weapon="laserGreenHorizontal.png"),
+            AimedFire(rate=5, bullet_speed=5, weapon="laserRed02.png"),
+            RandomFire(odds=1000, change_x=-10, change_y=0, weapon="spinner.png"),
+            RandomFire(odds=1000, change_x=-10, change_y=1, weapon="spinner.png"),
+            RandomFire(odds=1000, change_x=-10, change_y=2, weapon="spinner.png"),
+            RandomFire(odds=1000, change_x=-10, change_y=3, weapon="spinner.png"),
+            RandomFire(odds=1000, change_x=-10, change_y=4, weapon="spinner.png"),
+            RandomFire(odds=1000, change_x=-10, change_y=-1, weapon="spinner.png"),
+            RandomFire(odds=1000, change_x=-10, change_y=-2, weapon="spinner.png"),
+            RandomFire(odds=1000, change_x=-10, change_y=-3, weapon="spinner.png"),
+            RandomFire(odds=1000, change_x=-10, change_y=-4, weapon="spinner.png"),
+            RandomFire(odds=1000, change_x=10, change_y=0, weapon="spinner.png"),
+            RandomFire(odds=1000, change_x=10, change_y=1, weapon="spinner.png"),
+            RandomFire(odds=1000, change_x=10, change_y=2, weapon="spinner.png"),
+            RandomFire(odds=1000, change_x=10, change_y=3, weapon="spinner.png"),
+            RandomFire(odds=1000, change_x=10, change_y=4, weapon="spinner.png"),
+            RandomFire(odds=1000, change_x=10, change_y=-1, weapon="spinner.png"),
+            RandomFire(odds=1000, change_x=10, change_y=-2, weapon="spinner.png"),
+            RandomFire(odds=1000, change_x=10, change_y=-3, weapon="spinner.png"),
+            RandomFire(odds=1000, change_x=10, change_y=-4, weapon="spinner.png"),
+        ),
+    )
+
     def __init__(self):
 
         # Set up parent class
         super().__init__("flufflepop", "flufflepop")
 
-        self.health = 100000
-
 # Now for ally characters
 class Ally(Entity):
     def __init__(self, name_folder, name_file):
@@ -477,7 +802,7 @@ class Ally(Entity):
 
         # Idle animation
         if self.change_x == 0:
-            self.texture = self.idle_texture_pair[self.facing_direction]
+            self.show_frame(ANIMATION_FRAME_IDLE, self.facing_direction)
             return
 
         # Walking animation
@@ -485,7 +810,7 @@ class Ally(Entity):
             self.cur_texture += 1
             if self.cur_texture > 7:
                 self.cur_texture = 0
-            self.texture = self.walk_textures[self.cur_texture][self.facing_direction]
+            self.show_frame(ANIMATION_FRAME_WALK + self.cur_texture, self.facing_direction)
             self.should_update_walk = 0
             return
 
@@ -499,7 +824,7 @@ class Hooboo(Ally):
 
         self.health = 500
 
-class FlufflePop(Ally):
+class FlufflePopAlly(Ally):
     def __init__(self):
 
         # Set up parent class
@@ -523,7 +848,7 @@ class Excalibur(Ally):
 
         self.health = 2500
 
-class MasterVerse(Ally):
+class MasterVerseAlly(Ally):
     def __init__(self):
 
         # Set up parent class
@@ -531,7 +856,7 @@ class MasterVerse(Ally):
 
         self.health = 50000
 
-class RolyPolyBot(Ally):
+class RolyPolyBotAlly(Ally):
     def __init__(self):
 
         # Set up parent class
@@ -539,7 +864,7 @@ class RolyPolyBot(Ally):
 
         self.health = 10000
 
-class SecondarySlime(Ally):
+class SecondarySlimeAlly(Ally):
     def __init__(self):
 
         # Set up parent class
@@ -559,6 +884,27 @@ BULLET_SPEED = 2
 SHIELD_SPEED = 1000
 PLAYER_BULLET_DAMAGE = 10
 
+# Player weapons, picked by the player's level up: (highest level up, image, scale)
+PLAYER_BULLET_WEAPONS = (
+    (3, "swordBronze.png", SPRITE_SCALING_PROJECTILES/1.5),
+    (6, "swordSilver.png", SPRITE_SCALING_PROJECTILES/1.25),
+    (8, "swordGold.png", SPRITE_SCALING_PROJECTILES),
+    (10, "laserGreenHorizontal.png", SPRITE_SCALING_PROJECTILES),
+)
+PLAYER_SHIELD_WEAPONS = (
+    (3, "shieldBronze.png", SPRITE_SCALING_PROJECTILES/1.25),
+    (6, "shieldSilver.png", SPRITE_SCALING_PROJECTILES),
+    (9, "shieldGold.png", SPRITE_SCALING_PROJECTILES*1.25),
+    (10, "chomper_bullet.png", SPRITE_SCALING_PROJECTILES*1.25),
+)
+
+def player_weapon(weapons, level_up):
+    """ Pick the image and scale of a player weapon for their level up """
+    for max_level_up, weapon, scale in weapons:
+        if level_up <= max_level_up:
+            return weapon, scale
+    return weapons[-1][1:]
+
 # How much force to put on the bullet
 BULLET_MOVE_FORCE = 1000
 
@@ -574,7 +920,3059 @@ class GrenadeSprite(arcade.SpriteSolidColor):
         """ Handle when the sprite is moved by the physics engine. """
         # If the bullet falls below the screen, remove it
         if self.center_y < -100:
-            self.remove_from_sprite_lists()
+            retire_projectile(self)
+
+# How many of each projectile to have ready before a level starts
+POOL_PREWARM_PLAYER = 8
+POOL_PREWARM_ENEMY = 16
+
+class ProjectilePool:
+    """
+    Recycles projectile sprites instead of building a new one for every shot.
+
+    Each weapon gets its own free list, keyed by image and scale (or by size
+    for grenades). Retired projectiles go back on their list ready for the
+    next shot, and the pool keeps a high-water mark of how many of each were
+    in play at once.
+    """
+    def __init__(self):
+        self._free = {}
+        self._live = {}
+        self.high_water_marks = {}
+        self.created = 0
+        self.reused = 0
+
+    def _new(self, key, factory):
+        projectile = factory()
+        projectile.projectile_pool = self
+        projectile.pool_key = key
+        self.created += 1
+        return projectile
+
+    def _acquire(self, key, factory):
+        free = self._free.setdefault(key, [])
+        if free:
+            projectile = free.pop()
+            self.reused += 1
+        else:
+            projectile = self._new(key, factory)
+
+        # Clear anything left over from its last flight
+        projectile.age = 0
+        projectile.angle = 0
+        projectile.change_x = 0
+        projectile.change_y = 0
+        projectile.change_angle = 0
+
+        live = self._live.setdefault(key, set())
+        live.add(projectile)
+        if len(live) > self.high_water_marks.get(key, 0):
+            self.high_water_marks[key] = len(live)
+        return projectile
+
+    def _prewarm(self, key, factory, count):
+        free = self._free.setdefault(key, [])
+        while len(free) + len(self._live.get(key, ())) < count:
+            free.append(self._new(key, factory))
+
+    @staticmethod
+    def _sprite_factory(weapon, scale):
+        path = file_path + f"/src/resources/images/weapons/{weapon}"
+        return lambda: arcade.Sprite(path, scale)
+
+    @staticmethod
+    def _grenade_factory(level_up):
+        return lambda: GrenadeSprite((5 + level_up), level_up, arcade.color.PURPLE_HEART)
+
+    def acquire_sprite(self, weapon, scale=1):
+        """ Get a projectile using an image from the weapons folder """
+        return self._acquire((weapon, scale), self._sprite_factory(weapon, scale))
+
+    def acquire_grenade(self, level_up):
+        """ Get a grenade sized for the player's level """
+        return self._acquire(("grenade", level_up), self._grenade_factory(level_up))
+
+    def prewarm_sprite(self, weapon, scale=1, count=POOL_PREWARM_PLAYER):
+        """ Make sure at least count of this projectile exist """
+        self._prewarm((weapon, scale), self._sprite_factory(weapon, scale), count)
+
+    def prewarm_grenade(self, level_up, count=POOL_PREWARM_PLAYER):
+        """ Make sure at least count grenades of this size exist """
+        self._prewarm(("grenade", level_up), self._grenade_factory(level_up), count)
+
+    def release(self, projectile):
+        """ Take a projectile out of play and put it back on its free list """
+        projectile.remove_from_sprite_lists()
+        live = self._live.get(projectile.pool_key)
+        if live is None or projectile not in live:
+            # Already back in the pool
+            return
+        live.remove(projectile)
+        self._free[projectile.pool_key].append(projectile)
+
+    def release_all(self):
+        """ Recycle everything still in play, used when a level is torn down """
+        for live in self._live.values():
+            for projectile in list(live):
+                self.release(projectile)
+
+    def report(self):
+        """ Live, free and high-water counts for every kind of projectile """
+        keys = set(self._free) | set(self._live)
+        return {
+            key: {
+                "live": len(self._live.get(key, ())),
+                "free": len(self._free.get(key, ())),
+                "high_water": self.high_water_marks.get(key, 0),
+            }
+            for key in keys
+        }
+
+def retire_projectile(projectile):
+    """ Remove a projectile from play, recycling it if it came from a pool """
+    pool = getattr(projectile, "projectile_pool", None)
+    if pool is None:
+        projectile.remove_from_sprite_lists()
+    else:
+        pool.release(projectile)
+
+# Enemy weapon pattern engine
+
+# The old randfire helper rolled 1 in 2000 whatever odds it was given, and the game
+# has been balanced around that ever since. Set to None to use the odds each
+# RandomFire volley declares instead.
+ENEMY_FIRE_ODDS_OVERRIDE = 2000
+
+class WeaponSchedule:
+    """ The volleys of one enemy class, compiled into arrays """
+    def __init__(self, weapons, weapon_id):
+        random_volleys = [weapon for weapon in weapons if type(weapon) is RandomFire]
+        aimed_volleys = [weapon for weapon in weapons if type(weapon) is AimedFire]
+
+        # Random volleys, fired from the top of the enemy
+        odds = [ENEMY_FIRE_ODDS_OVERRIDE or volley.odds for volley in random_volleys]
+        self.random_odds = np.array(odds, dtype=np.float64)
+        self.random_change_x = np.array([volley.change_x for volley in random_volleys], dtype=np.float64)
+        self.random_change_y = np.array([volley.change_y for volley in random_volleys], dtype=np.float64)
+        self.random_weapon = np.array([weapon_id(volley.weapon) for volley in random_volleys], dtype=np.intp)
+
+        # Aimed volleys, fired from the centre of the enemy towards the player
+        self.aimed_rate = np.array([volley.rate for volley in aimed_volleys], dtype=np.int64)
+        self.aimed_speed = np.array([volley.bullet_speed for volley in aimed_volleys], dtype=np.float64)
+        self.aimed_weapon = np.array([weapon_id(volley.weapon) for volley in aimed_volleys], dtype=np.intp)
+
+    @property
+    def random_count(self):
+        return len(self.random_odds)
+
+    @property
+    def aimed_count(self):
+        return len(self.aimed_rate)
+
+class EnemyWeaponEngine:
+    """
+    Fires every enemy's volleys in one batched pass per frame.
+
+    Each enemy class's behaviour table is compiled into a WeaponSchedule the
+    first time it is seen, bullet textures are loaded once per weapon, and all
+    the random volleys on screen share a single vectorised RNG draw.
+    """
+    def __init__(self, seed=None, pool=None):
+        self.rng = np.random.default_rng(seed)
+
+        # Where bullets come from, None builds a fresh sprite for every shot
+        self.pool = pool
+
+        # Weapon id -> file name and texture
+        self.weapon_names = []
+        self.weapon_textures = []
+        self._weapon_ids = {}
+
+        # Enemy class -> WeaponSchedule
+        self._schedules = {}
+
+    def weapon_id(self, weapon):
+        """ Get the id for a weapon image, loading its texture the first time """
+        weapon_id = self._weapon_ids.get(weapon)
+        if weapon_id is None:
+            weapon_id = len(self.weapon_names)
+            self._weapon_ids[weapon] = weapon_id
+            self.weapon_names.append(weapon)
+            self.weapon_textures.append(
+                arcade.load_texture(file_path + f"/src/resources/images/weapons/{weapon}")
+            )
+        return weapon_id
+
+    def schedule_for(self, enemy_class):
+        """ Get the compiled schedule for an enemy class """
+        schedule = self._schedules.get(enemy_class)
+        if schedule is None:
+            schedule = WeaponSchedule(enemy_class.behaviour.weapons, self.weapon_id)
+            self._schedules[enemy_class] = schedule
+        return schedule
+
+    def make_bullet(self, weapon_id):
+        """ Get a bullet sprite for a weapon """
+        if self.pool is not None:
+            bullet = self.pool.acquire_sprite(self.weapon_names[weapon_id])
+        else:
+            bullet = arcade.Sprite(texture=self.weapon_textures[weapon_id])
+        bullet.weapon_id = weapon_id
+        return bullet
+
+    def prewarm(self, enemy_classes, count=POOL_PREWARM_ENEMY):
+        """ Compile the schedules for these enemies and fill the pool with their bullets """
+        for enemy_class in enemy_classes:
+            self.schedule_for(enemy_class)
+        if self.pool is not None:
+            for weapon in self.weapon_names:
+                self.pool.prewarm_sprite(weapon, count=count)
+
+    def fire(self, enemies, target_x, target_y, frame_count, delta_time):
+        """ Work out which volleys go off this frame and return the new bullets """
+        bullets = []
+
+        # Group the enemies by class, each group shares a schedule
+        groups = {}
+        for enemy in enemies:
+            group = groups.get(type(enemy))
+            if group is None:
+                group = groups[type(enemy)] = []
+            group.append(enemy)
+
+        # Random volleys. Lay every (enemy, volley) pair end to end so one draw covers them all.
+        random_groups = []
+        chances = []
+        for enemy_class, group in groups.items():
+            schedule = self.schedule_for(enemy_class)
+            if schedule.random_count:
+                # Odds are per frame at 60 FPS, scale them to the real frame time
+                adj_odds = np.maximum((schedule.random_odds * (1 / 60) / delta_time).astype(np.int64), 1)
+                chances.append(np.tile(1.0 / adj_odds, len(group)))
+                random_groups.append((group, schedule))
+
+        if chances:
+            fired = self.rng.random(sum(len(chance) for chance in chances)) < np.concatenate(chances)
+            offset = 0
+            for group, schedule in random_groups:
+                count = len(group) * schedule.random_count
+                hits = np.flatnonzero(fired[offset:offset + count])
+                offset += count
+                for hit in hits:
+                    enemy = group[hit // schedule.random_count]
+                    volley = hit % schedule.random_count
+                    bullet = self.make_bullet(schedule.random_weapon[volley])
+                    bullet.center_x = enemy.center_x
+                    bullet.angle = 0
+                    bullet.top = enemy.top
+                    bullet.change_x = schedule.random_change_x[volley]
+                    bullet.change_y = schedule.random_change_y[volley]
+                    bullets.append(bullet)
+
+        # Aimed volleys go off on fixed frames, so only look at the enemies when one is due
+        for enemy_class, group in groups.items():
+            schedule = self.schedule_for(enemy_class)
+            if not schedule.aimed_count:
+                continue
+            due = np.flatnonzero(frame_count % schedule.aimed_rate == 0)
+            if not len(due):
+                continue
+
+            origins = np.array([enemy.position for enemy in group], dtype=np.float64)
+            angles = np.arctan2(target_y - origins[:, 1], target_x - origins[:, 0])
+            cos_angles = np.cos(angles)
+            sin_angles = np.sin(angles)
+            degrees = np.degrees(angles)
+
+            for volley in due:
+                speed = schedule.aimed_speed[volley]
+                for i in range(len(group)):
+                    bullet = self.make_bullet(schedule.aimed_weapon[volley])
+                    bullet.center_x = origins[i, 0]
+                    bullet.center_y = origins[i, 1]
+
+                    # Angle the bullet sprite and send it towards the target
+                    bullet.angle = degrees[i]
+                    bullet.change_x = cos_angles[i] * speed
+                    bullet.change_y = sin_angles[i] * speed
+                    bullets.append(bullet)
+
+        return bullets
+
+class TileOccupancyGrid:
+    """
+    Which cells of the level hold a solid tile.
+
+    The level is a regular grid of GRID_PIXEL_SIZE cells, so solid tiles are
+    kept as a bitmap, one cell per tile, with the tile sprites in each cell
+    alongside it. Asking whether a box touches terrain is then an array
+    lookup, vectorised over as many boxes as needed, and the exact arcade test
+    is only run against the tiles in the cells a box actually overlaps.
+    """
+    def __init__(self):
+        self.solid = np.zeros((0, 0), dtype=bool)
+        self.tiles = {}
+        self._cells_of = {}
+        self._summed = None
+
+    def setup(self, map_width, map_height, tile_lists):
+        """ Build the bitmap for a new level from its solid tile layers """
+        columns = int(math.ceil(map_width / GRID_PIXEL_SIZE))
+        rows = int(math.ceil(map_height / GRID_PIXEL_SIZE))
+        self.solid = np.zeros((rows, columns), dtype=bool)
+        self.tiles = {}
+        self._cells_of = {}
+        self._summed = None
+        for tile_list in tile_lists:
+            for tile in tile_list:
+                self.add(tile)
+
+    def _cell_range(self, left, right, bottom, top):
+        """ First and last row and column a box covers, clipped to the map """
+        rows, columns = self.solid.shape
+        row_0 = max(int(bottom // GRID_PIXEL_SIZE), 0)
+        row_1 = min(int(top // GRID_PIXEL_SIZE), rows - 1)
+        column_0 = max(int(left // GRID_PIXEL_SIZE), 0)
+        column_1 = min(int(right // GRID_PIXEL_SIZE), columns - 1)
+        return row_0, row_1, column_0, column_1
+
+    def cells_under(self, tile):
+        """ The cells a tile covers """
+        # Tiles sit exactly on cell edges, so pull the box in a little to keep
+        # them out of their neighbours' cells
+        row_0, row_1, column_0, column_1 = self._cell_range(
+            tile.left + 1, tile.right - 1, tile.bottom + 1, tile.top - 1
+        )
+        return [(row, column)
+                for row in range(row_0, row_1 + 1)
+                for column in range(column_0, column_1 + 1)]
+
+    def add(self, tile, cells=None):
+        """ Mark the cells under a tile as solid, given them if cells_under has been asked already """
+        if cells is None:
+            cells = self.cells_under(tile)
+        for cell in cells:
+            self.tiles.setdefault(cell, []).append(tile)
+            self.solid[cell] = True
+        self._cells_of[tile] = cells
+        self._summed = None
+
+    def remove(self, tile):
+        """ Clear a destroyed or unloaded tile out of its cells """
+        for cell in self._cells_of.pop(tile, ()):
+            tiles = self.tiles[cell]
+            tiles.remove(tile)
+            if not tiles:
+                del self.tiles[cell]
+                self.solid[cell] = False
+        self._summed = None
+
+    def _summed_area(self):
+        """ Running totals of solid cells, rebuilt only after the bitmap changes """
+        if self._summed is None:
+            rows, columns = self.solid.shape
+            self._summed = np.zeros((rows + 1, columns + 1), dtype=np.int32)
+            self._summed[1:, 1:] = self.solid.cumsum(axis=0).cumsum(axis=1)
+        return self._summed
+
+    def any_solid(self, left, right, bottom, top):
+        """ For arrays of boxes, whether each box overlaps any solid cell """
+        rows, columns = self.solid.shape
+        row_0 = np.maximum(np.floor_divide(bottom, GRID_PIXEL_SIZE).astype(np.intp), 0)
+        row_1 = np.minimum(np.floor_divide(top, GRID_PIXEL_SIZE).astype(np.intp), rows - 1)
+        column_0 = np.maximum(np.floor_divide(left, GRID_PIXEL_SIZE).astype(np.intp), 0)
+        column_1 = np.minimum(np.floor_divide(right, GRID_PIXEL_SIZE).astype(np.intp), columns - 1)
+        inside = (row_0 <= row_1) & (column_0 <= column_1)
+        row_0, row_1 = row_0[inside], row_1[inside] + 1
+        column_0, column_1 = column_0[inside], column_1[inside] + 1
+
+        summed = self._summed_area()
+        counts = summed[row_1, column_1] - summed[row_0, column_1] - \
+            summed[row_1, column_0] + summed[row_0, column_0]
+        solid = np.zeros(len(inside), dtype=bool)
+        solid[inside] = counts > 0
+        return solid
+
+    def tiles_near(self, sprite):
+        """ The tiles in every cell a sprite's box overlaps """
+        row_0, row_1, column_0, column_1 = self._cell_range(
+            sprite.left, sprite.right, sprite.bottom, sprite.top
+        )
+        tiles = []
+        for row in range(row_0, row_1 + 1):
+            for column in range(column_0, column_1 + 1):
+                for tile in self.tiles.get((row, column), ()):
+                    if tile not in tiles:
+                        tiles.append(tile)
+        return tiles
+
+    def hits(self, sprite):
+        """ Tiles a sprite is touching, tested exactly """
+        return [tile for tile in self.tiles_near(sprite)
+                if arcade.check_for_collision(sprite, tile)]
+
+class EnemyBulletEngine:
+    """
+    Moves and collides enemy bullets as NumPy arrays.
+
+    Position, velocity, weapon id and age live in parallel arrays, one row
+    per bullet. Each frame the bullets are advanced, tested against the
+    level's tile occupancy grid and against the few moving obstacles in
+    vectorised passes, and the ones that hit something are culled. The
+    sprites are kept only for drawing through the sprite list, when
+    USE_INSTANCED_PROJECTILES is off: their positions are then written
+    straight into the sprite list's buffer. A sprite's own position is only
+    brought up to date when it needs an exact collision test.
+    """
+    def __init__(self, capacity=256):
+        self.count = 0
+        self.sprites = []
+        self.sprite_list = None
+        self._allocate(capacity)
+
+        # Solid tiles, shared with the rest of the game
+        self.terrain = TileOccupancyGrid()
+
+    def _allocate(self, capacity):
+        """ Grow the arrays, keeping the bullets we already have """
+        def grow(old, dtype):
+            new = np.zeros(capacity, dtype=dtype)
+            if old is not None:
+                new[:self.count] = old[:self.count]
+            return new
+
+        self.x = grow(getattr(self, "x", None), np.float64)
+        self.y = grow(getattr(self, "y", None), np.float64)
+        self.change_x = grow(getattr(self, "change_x", None), np.float64)
+        self.change_y = grow(getattr(self, "change_y", None), np.float64)
+        self.radius = grow(getattr(self, "radius", None), np.float64)
+        self.angle = grow(getattr(self, "angle", None), np.float32)
+        self.weapon = grow(getattr(self, "weapon", None), np.intp)
+        self.age = grow(getattr(self, "age", None), np.int32)
+        self.slot = grow(getattr(self, "slot", None), np.intp)
+        self.capacity = capacity
+
+    def setup(self, sprite_list, terrain):
+        """ Start a new level, drawing into sprite_list and colliding with terrain """
+        self.sprites = []
+        self.count = 0
+        self.sprite_list = sprite_list
+        self.terrain = terrain
+
+    def clear(self):
+        """ Retire every bullet """
+        for sprite in self.sprites:
+            retire_projectile(sprite)
+        self.sprites = []
+        self.count = 0
+
+    def add(self, bullet):
+        """ Start tracking a bullet sprite and add it to the sprite list for drawing """
+        if self.count == self.capacity:
+            self._allocate(self.capacity * 2)
+
+        i = self.count
+        self.x[i], self.y[i] = bullet.position
+        self.change_x[i] = bullet.change_x
+        self.change_y[i] = bullet.change_y
+        self.radius[i] = bullet.collision_radius
+        self.angle[i] = bullet.angle
+        self.weapon[i] = getattr(bullet, "weapon_id", -1)
+        self.age[i] = 0
+
+        self.sprite_list.append(bullet)
+        self.slot[i] = self.sprite_list.sprite_slot[bullet]
+        self.sprites.append(bullet)
+        self.count += 1
+
+    def _sync_sprite(self, i):
+        """ Bring one sprite's position up to date before an exact test """
+        sprite = self.sprites[i]
+        sprite.position = (self.x[i], self.y[i])
+        return sprite
+
+    def _terrain_hits(self, n):
+        """ Bullets touching a solid tile, testing exactly only near solid cells """
+        x, y, radius = self.x[:n], self.y[:n], self.radius[:n]
+        hits = self.terrain.any_solid(x - radius, x + radius, y - radius, y + radius)
+        for i in np.flatnonzero(hits):
+            hits[i] = bool(self.terrain.hits(self._sync_sprite(i)))
+        return hits
+
+    def _candidates(self, n, sprites):
+        """ (bullet, sprite) pairs whose bounding circles' boxes overlap """
+        if not sprites or not n:
+            return ()
+        centres = np.array([sprite.position for sprite in sprites], dtype=np.float64)
+        radii = np.array([sprite.collision_radius for sprite in sprites], dtype=np.float64)
+        reach = self.radius[:n, None] + radii[None, :]
+        overlap = (np.abs(self.x[:n, None] - centres[None, :, 0]) <= reach) & \
+                  (np.abs(self.y[:n, None] - centres[None, :, 1]) <= reach)
+        return zip(*np.nonzero(overlap))
+
+    def _obstacle_hits(self, n, obstacle_lists):
+        """ Bullets touching any sprite in the obstacle lists """
+        obstacles = [sprite for sprite_list in obstacle_lists for sprite in sprite_list]
+        hits = np.zeros(n, dtype=bool)
+        for i, j in self._candidates(n, obstacles):
+            if not hits[i] and arcade.check_for_collision(self._sync_sprite(i), obstacles[j]):
+                hits[i] = True
+        return hits
+
+    def hits_on(self, sprite):
+        """ Bullet sprites touching a sprite, such as the player """
+        hit_list = []
+        for i, _ in self._candidates(self.count, [sprite]):
+            bullet = self._sync_sprite(i)
+            if arcade.check_for_collision(bullet, sprite):
+                hit_list.append(bullet)
+        return hit_list
+
+    def _sync_draw_positions(self, n, x=None, y=None):
+        """ Copy the positions (or x and y, if given) into the sprite list's buffer in one go """
+        x = self.x[:n] if x is None else x
+        y = self.y[:n] if y is None else y
+        sprite_list = self.sprite_list
+        pos_data = getattr(sprite_list, "_sprite_pos_data", None)
+        if pos_data is None:
+            for i in range(n):
+                self.sprites[i].position = (x[i], y[i])
+            return
+        buffer = np.frombuffer(pos_data, dtype=np.float32)
+        buffer[self.slot[:n] * 2] = x
+        buffer[self.slot[:n] * 2 + 1] = y
+        del buffer
+        sprite_list._sprite_pos_changed = True
+
+    def draw_positions(self, alpha=1.0):
+        """ Where to draw the bullets, alpha of the way through their last move """
+        n = self.count
+        back = 1.0 - alpha
+        return self.x[:n] - self.change_x[:n] * back, self.y[:n] - self.change_y[:n] * back
+
+    def interpolate(self, alpha):
+        """ Draw the bullets alpha of the way through their last move """
+        n = self.count
+        if not n:
+            return
+        self._sync_draw_positions(n, *self.draw_positions(alpha))
+
+    def cull(self, dead):
+        """ Retire the bullets flagged in dead and pack the arrays """
+        n = self.count
+        for i in np.flatnonzero(dead):
+            retire_projectile(self._sync_sprite(i))
+        keep = ~dead
+        m = int(keep.sum())
+        for array in (self.x, self.y, self.change_x, self.change_y,
+                      self.radius, self.angle, self.weapon, self.age, self.slot):
+            array[:m] = array[:n][keep]
+        self.sprites = list(itertools.compress(self.sprites, keep.tolist()))
+        self.count = m
+
+    def update(self, obstacle_lists):
+        """ Move every bullet one frame and cull the ones that hit something """
+        n = self.count
+        if not n:
+            return
+
+        self.x[:n] += self.change_x[:n]
+        self.y[:n] += self.change_y[:n]
+        self.age[:n] += 1
+
+        # Nothing is written for drawing here: the ProjectileRenderer reads the
+        # arrays, and without it interpolate() fills the sprite list's buffer
+        dead = self._terrain_hits(n) | self._obstacle_hits(n, obstacle_lists)
+        if dead.any():
+            self.cull(dead)
+
+# Projectile culling
+
+# How long a projectile may stay in play, checked once a frame for every projectile
+# layer. max_age is in frames (None for no limit), map_bounds culls projectiles that
+# leave the map, and camera_distance is how far in pixels from the centre of the
+# camera a projectile may get (None for no limit).
+CullPolicy = collections.namedtuple("CullPolicy", ["max_age", "map_bounds", "camera_distance"])
+
+# How far outside the map a projectile may stray before it is culled
+CULL_MAP_MARGIN = GRID_PIXEL_SIZE * 2
+
+PROJECTILE_CULL_POLICIES = {
+    LAYER_NAME_PLAYER_BULLETS: CullPolicy(max_age=60 * 30, map_bounds=True, camera_distance=SCREEN_WIDTH * 2),
+    LAYER_NAME_PLAYER_GRENADES: CullPolicy(max_age=60 * 10, map_bounds=True, camera_distance=SCREEN_WIDTH * 2),
+    # Shields are walls the player leaves behind, so they last as long as they are on the map
+    LAYER_NAME_SHIELD: CullPolicy(max_age=None, map_bounds=True, camera_distance=None),
+    LAYER_NAME_ENEMY_BULLETS: CullPolicy(max_age=60 * 10, map_bounds=True, camera_distance=SCREEN_WIDTH * 2),
+}
+
+class ProjectileCuller:
+    """
+    Retires projectiles that have outlived their layer's cull policy.
+
+    Sprite layers are checked sprite by sprite, counting each projectile's age
+    on the sprite itself. Layers moved by an array engine, such as the enemy
+    bullets, are checked in one vectorised pass over the engine's arrays.
+    Every culled projectile is counted by layer and by the reason it went.
+    """
+    def __init__(self, policies=None):
+        self.policies = dict(PROJECTILE_CULL_POLICIES if policies is None else policies)
+        self.culled = collections.Counter()
+        self.left = self.bottom = 0
+        self.right = self.top = 0
+
+    def setup(self, map_width, map_height):
+        """ Start a new level with a map this size """
+        self.left = -CULL_MAP_MARGIN
+        self.bottom = -CULL_MAP_MARGIN
+        self.right = map_width + CULL_MAP_MARGIN
+        self.top = map_height + CULL_MAP_MARGIN
+
+    def _reason(self, policy, age, x, y, centre_x, centre_y):
+        """ Why a projectile should go, or None if it can stay """
+        if policy.max_age is not None and age > policy.max_age:
+            return "age"
+        if policy.map_bounds and not (self.left <= x <= self.right and self.bottom <= y <= self.top):
+            return "bounds"
+        if policy.camera_distance is not None and \
+                max(abs(x - centre_x), abs(y - centre_y)) > policy.camera_distance:
+            return "camera"
+        return None
+
+    def _cull_sprites(self, layer, sprite_list, policy, centre_x, centre_y):
+        for projectile in list(sprite_list):
+            age = getattr(projectile, "age", 0) + 1
+            projectile.age = age
+            reason = self._reason(policy, age, projectile.center_x, projectile.center_y,
+                                  centre_x, centre_y)
+            if reason:
+                retire_projectile(projectile)
+                self.culled[layer, reason] += 1
+
+    def _cull_engine(self, layer, engine, policy, centre_x, centre_y):
+        n = engine.count
+        if not n:
+            return
+        x, y = engine.x[:n], engine.y[:n]
+        dead = np.zeros(n, dtype=bool)
+        for reason, expired in self._engine_reasons(policy, engine.age[:n], x, y, centre_x, centre_y):
+            # Count each bullet once, under the first reason it matched
+            fresh = expired & ~dead
+            if fresh.any():
+                self.culled[layer, reason] += int(fresh.sum())
+                dead |= fresh
+        if dead.any():
+            engine.cull(dead)
+
+    def _engine_reasons(self, policy, age, x, y, centre_x, centre_y):
+        if policy.max_age is not None:
+            yield "age", age > policy.max_age
+        if policy.map_bounds:
+            yield "bounds", (x < self.left) | (x > self.right) | (y < self.bottom) | (y > self.top)
+        if policy.camera_distance is not None:
+            yield "camera", np.maximum(np.abs(x - centre_x), np.abs(y - centre_y)) > policy.camera_distance
+
+    def cull(self, scene, centre_x, centre_y, engines=None):
+        """ Check every projectile layer, using engines for the layers they move """
+        engines = engines or {}
+        for layer, policy in self.policies.items():
+            if layer in engines:
+                self._cull_engine(layer, engines[layer], policy, centre_x, centre_y)
+            else:
+                self._cull_sprites(layer, scene[layer], policy, centre_x, centre_y)
+
+    def report(self):
+        """ How many projectiles each layer has culled, by reason """
+        report = {}
+        for (layer, reason), count in self.culled.items():
+            report.setdefault(layer, {})[reason] = count
+        return report
+
+# Collision broadphase
+
+# Width of a collision manager cell, two tiles across
+COLLISION_CELL_SIZE = GRID_PIXEL_SIZE * 2
+
+# Layers that move, so are put back in the grid every frame
+COLLISION_DYNAMIC_LAYERS = (
+    LAYER_NAME_ENEMIES,
+    LAYER_NAME_MOVING_PLATFORMS,
+    LAYER_NAME_DYNAMIC_ITEMS,
+    LAYER_NAME_SHIELD,
+)
+
+# Dynamic layers whose sprites are mostly at rest or parked, so are only
+# moved in the grid once they have moved
+COLLISION_RESTING_LAYERS = (
+    LAYER_NAME_DYNAMIC_ITEMS,
+)
+
+# Resting sprites go in the cells this far around their bounds, so they can
+# settle and jiggle as far as this without being put back in the grid
+COLLISION_RESTING_MARGIN = 4
+
+# Layers that never move, so are put in the grid once per level. Collectibles,
+# hazards and ladders are physics sensors instead, see SENSOR_LAYERS.
+COLLISION_STATIC_LAYERS = ()
+
+class CollisionManager:
+    """
+    One broadphase for every collision query in a frame.
+
+    The sprites of every dynamic layer are dropped into a uniform grid once a
+    frame, and the static layers once a level. A query looks only in the cells
+    a sprite covers, runs the exact arcade test on what it finds there, and
+    returns the contacts as a list per layer. Layers moved by an array engine,
+    such as the enemy bullets, are answered by that engine instead.
+
+    A sprite goes in every cell its bounds cover, so a long moving platform
+    thousands of pixels across lands in the cells along it rather than every
+    cell of a square as wide as it is long. The resting layers keep a grid
+    of their own, where only the sprites that have moved are put back.
+    """
+    def __init__(self, cell_size=COLLISION_CELL_SIZE):
+        self.cell_size = cell_size
+        self.dynamic_lists = {}
+        self.resting_lists = {}
+        self.engines = {}
+        self._cells = {}
+        self._static_cells = {}
+        self._resting_cells = {}
+
+        # layer: {sprite: (position, angle, cell keys)} of the resting sprites in the grid
+        self._resting_at = {}
+
+    def setup(self, scene, dynamic_layers=COLLISION_DYNAMIC_LAYERS,
+              static_layers=COLLISION_STATIC_LAYERS, engines=None):
+        """ Start a new level, indexing its static layers straight away """
+        self.dynamic_lists = {layer: scene[layer] for layer in dynamic_layers
+                              if layer not in COLLISION_RESTING_LAYERS}
+        self.resting_lists = {layer: scene[layer] for layer in dynamic_layers
+                              if layer in COLLISION_RESTING_LAYERS}
+        self.engines = dict(engines or {})
+        self._cells = {}
+        self._static_cells = {}
+        self._resting_cells = {}
+        self._resting_at = {layer: {} for layer in self.resting_lists}
+        for layer in static_layers:
+            for sprite in scene[layer]:
+                self._insert(self._static_cells, layer, sprite)
+
+    def _cell_keys(self, sprite, margin=0):
+        """ Every cell the sprite's bounds, grown by margin, cover """
+        # One pass over the hit box, where left, right, bottom and top take one each
+        points = sprite.get_adjusted_hit_box()
+        if len(points):
+            xs, ys = zip(*points)
+        else:
+            xs, ys = (sprite.center_x,), (sprite.center_y,)
+        size = self.cell_size
+        column_0, column_1 = int((min(xs) - margin) // size), int((max(xs) + margin) // size)
+        row_0, row_1 = int((min(ys) - margin) // size), int((max(ys) + margin) // size)
+        for row in range(row_0, row_1 + 1):
+            for column in range(column_0, column_1 + 1):
+                yield row, column
+
+    def _insert(self, cells, layer, sprite):
+        for key in self._cell_keys(sprite):
+            cells.setdefault(key, []).append((layer, sprite))
+
+    def rebuild(self):
+        """ Put every dynamic sprite back in the grid, once a frame after things have moved """
+        self._cells = {}
+        for layer, sprite_list in self.dynamic_lists.items():
+            for sprite in sprite_list:
+                self._insert(self._cells, layer, sprite)
+        for layer, sprite_list in self.resting_lists.items():
+            self._move_resting(layer, sprite_list)
+
+    def _remove_resting(self, layer, sprite):
+        for key in self._resting_at[layer].pop(sprite)[2]:
+            entries = self._resting_cells[key]
+            entries.remove((layer, sprite))
+            if not entries:
+                del self._resting_cells[key]
+
+    def _move_resting(self, layer, sprite_list):
+        """ Put back only the sprites of a resting layer that have moved or turned past the margin """
+        placed = self._resting_at[layer]
+        if len(placed) != len(sprite_list):
+            # Sprites are only ever taken out of these layers during a level
+            for sprite in set(placed) - set(sprite_list):
+                self._remove_resting(layer, sprite)
+        for sprite in sprite_list:
+            position, angle = sprite.position, sprite.angle
+            placed_at = placed.get(sprite)
+            if placed_at is not None:
+                (x, y), placed_angle, _ = placed_at
+                # How far any point of the hit box can have gone since
+                drift = abs(position[0] - x) + abs(position[1] - y) + \
+                    sprite.collision_radius * math.radians(abs(angle - placed_angle))
+                if drift <= COLLISION_RESTING_MARGIN:
+                    continue
+                self._remove_resting(layer, sprite)
+            keys = list(self._cell_keys(sprite, COLLISION_RESTING_MARGIN))
+            for key in keys:
+                self._resting_cells.setdefault(key, []).append((layer, sprite))
+            placed[sprite] = position, angle, keys
+
+    def query(self, sprite, layers):
+        """ What a sprite is touching in each of layers, as a dict of contact lists """
+        contacts = {layer: [] for layer in layers}
+        seen = set()
+        for key in self._cell_keys(sprite):
+            for cells in (self._cells, self._resting_cells, self._static_cells):
+                for layer, other in cells.get(key, ()):
+                    if layer not in contacts or other is sprite or other in seen:
+                        continue
+                    seen.add(other)
+                    # Skip anything removed since the grid was built
+                    if other.sprite_lists and arcade.check_for_collision(sprite, other):
+                        contacts[layer].append(other)
+
+        for layer, engine in self.engines.items():
+            if layer in contacts:
+                contacts[layer] = engine.hits_on(sprite)
+        return contacts
+
+    def touching(self, sprite, layer):
+        """ Whether a sprite touches anything in one layer """
+        return bool(self.query(sprite, (layer,))[layer])
+
+# Physics sensors
+
+# Layers registered with the physics engine as static sensor shapes, and the
+# collision type each uses. Sensors report the player touching them but never
+# push back, and static bodies cost nothing to simulate.
+SENSOR_LAYERS = (
+    (LAYER_NAME_COINS, "coin"),
+    (LAYER_NAME_HEARTS, "heart"),
+    (LAYER_NAME_POWER_UPS, "power_up"),
+    (LAYER_NAME_DONT_TOUCH, "hazard"),
+    (LAYER_NAME_LADDERS, "ladder"),
+)
+
+class SensorEvents:
+    """
+    Pickup, hazard and ladder events, reported by the physics step itself.
+
+    Each sensor layer's collision handlers queue the sprites the player starts
+    touching, to be drained by the game once the step is over, and keep count
+    of how many of the layer's sensors the player is overlapping right now.
+    """
+    def __init__(self):
+        self.physics_engine = None
+        self.touched = {layer: [] for layer, _ in SENSOR_LAYERS}
+        self.overlaps = collections.Counter()
+
+    def register(self, physics_engine, scene, player_type="player"):
+        """ Add the sensor layers of a new level to its physics engine """
+        self.physics_engine = physics_engine
+        self.touched = {layer: [] for layer, _ in SENSOR_LAYERS}
+        self.overlaps = collections.Counter()
+        for layer, collision_type in SENSOR_LAYERS:
+            self.add(layer, scene[layer])
+            physics_engine.add_collision_handler(player_type, collision_type,
+                                                 begin_handler=self._begin_handler(layer),
+                                                 separate_handler=self._separate_handler(layer))
+
+    def add(self, layer, sprites):
+        """ Add sensors for sprites of a sensor layer, such as tiles that have just been streamed in """
+        collision_type = dict(SENSOR_LAYERS)[layer]
+        for sprite in sprites:
+            self.physics_engine.add_sprite(sprite,
+                                           collision_type=collision_type,
+                                           body_type=arcade.PymunkPhysicsEngine.STATIC)
+            self.physics_engine.get_physics_object(sprite).shape.sensor = True
+
+    def _begin_handler(self, layer):
+        def begin_handler(_player_sprite, sprite, _arbiter, _space, _data):
+            """ The player started touching a sensor """
+            self.overlaps[layer] += 1
+            touched = self.touched[layer]
+            if sprite is not None and sprite not in touched:
+                touched.append(sprite)
+            return True
+        return begin_handler
+
+    def _separate_handler(self, layer):
+        def separate_handler(_player_sprite, _sprite, _arbiter, _space, _data):
+            """ The player stopped touching a sensor, or it was removed """
+            self.overlaps[layer] = max(self.overlaps[layer] - 1, 0)
+        return separate_handler
+
+    def drain(self, layer):
+        """ The sprites of a layer the player has touched since the last drain """
+        touched = self.touched[layer]
+        self.touched[layer] = []
+        return touched
+
+    def overlapping(self, layer):
+        """ Is the player touching any sensor in the layer right now? """
+        return self.overlaps[layer] > 0
+
+# Static collision geometry
+
+# Static tile geometry is merged within square patches this many tiles across,
+# so destroying a tile only rebuilds the shapes of its own patch
+STATIC_PATCH_SIZE = 8
+
+class StaticGeometry:
+    """
+    Static tile layers merged into as few physics shapes as possible.
+
+    Tiles whose hit box fills their cell are merged with their neighbours
+    into maximal rectangles, one pymunk box per rectangle, within each patch
+    of the map. Any other tile keeps a shape of its own hit box. Each shape
+    remembers the tiles it was built from, so a collision with a merged
+    shape can still be traced back to the tile that was hit, and adding or
+    removing tiles rebuilds only the patches they sit in.
+    """
+    def __init__(self):
+        self.physics_engine = None
+        self.frictions = {}
+        self.patch_tiles = {}
+        self.patch_shapes = {}
+        self.shape_tiles = {}
+
+    def setup(self, physics_engine, frictions):
+        """ Start a new level's geometry, with the friction of each collision type """
+        self.physics_engine = physics_engine
+        self.frictions = dict(frictions)
+        self.patch_tiles = {}
+        self.patch_shapes = {}
+        self.shape_tiles = {}
+
+    def add_tiles(self, collision_type, tiles):
+        """ Put tiles in, rebuilding only the patches they land in """
+        patches = set()
+        for tile in tiles:
+            cell = self._cell(tile)
+            patch = self._patch(cell)
+            self.patch_tiles.setdefault((collision_type, patch), {})[cell] = tile
+            patches.add(patch)
+        for patch in patches:
+            self._build_patch(collision_type, patch)
+
+    @classmethod
+    def plan(cls, tiles):
+        """
+        Work out the shapes for a list of tiles, to be reused for fresh tiles at the same places.
+
+        Returns the cell of each tile and, for each patch, its shapes as
+        (vertices, indices of the tiles merged into them).
+        """
+        cells = [cls._cell(tile) for tile in tiles]
+        patch_tiles = {}
+        for tile, cell in zip(tiles, cells):
+            patch_tiles.setdefault(cls._patch(cell), {})[cell] = tile
+        index_of = {id(tile): index for index, tile in enumerate(tiles)}
+        patch_specs = {
+            patch: [(vertices, [index_of[id(tile)] for tile in merged])
+                    for vertices, merged in cls._patch_specs(cell_tiles)]
+            for patch, cell_tiles in patch_tiles.items()
+        }
+        return cells, patch_specs
+
+    def add_planned(self, collision_type, tiles, cells, patch_specs):
+        """
+        Put tiles in with the shapes plan worked out for tiles at the same places.
+
+        tiles is in the order they were planned in, with None for any that
+        have gone since. Only the patches missing a tile, or that already had
+        tiles in them, are merged again.
+        """
+        existing = {patch for patch in patch_specs if (collision_type, patch) in self.patch_tiles}
+        for tile, cell in zip(tiles, cells):
+            if tile is not None:
+                self.patch_tiles.setdefault((collision_type, self._patch(cell)), {})[cell] = tile
+        for patch, specs in patch_specs.items():
+            if patch in existing or any(tiles[index] is None for _, indices in specs for index in indices):
+                self._build_patch(collision_type, patch)
+                continue
+            for vertices, indices in specs:
+                self._add_shape(collision_type, patch, vertices, [tiles[index] for index in indices])
+
+    @staticmethod
+    def _cell(tile):
+        return int(tile.center_y // GRID_PIXEL_SIZE), int(tile.center_x // GRID_PIXEL_SIZE)
+
+    @staticmethod
+    def _patch(cell):
+        return cell[0] // STATIC_PATCH_SIZE, cell[1] // STATIC_PATCH_SIZE
+
+    @staticmethod
+    def _fills_cell(tile):
+        """ Is the tile's hit box the whole of its cell? """
+        row, column = StaticGeometry._cell(tile)
+        left, bottom = column * GRID_PIXEL_SIZE, row * GRID_PIXEL_SIZE
+        return len(tile.get_hit_box()) == 4 and \
+            abs(tile.left - left) < 1 and abs(tile.right - left - GRID_PIXEL_SIZE) < 1 and \
+            abs(tile.bottom - bottom) < 1 and abs(tile.top - bottom - GRID_PIXEL_SIZE) < 1
+
+    def _type_id(self, collision_type):
+        collision_types = self.physics_engine.collision_types
+        if collision_type not in collision_types:
+            collision_types.append(collision_type)
+        return collision_types.index(collision_type)
+
+    @staticmethod
+    def _rectangles(cells):
+        """ Split a set of cells into maximal rectangles of (row, column, rows, columns) """
+        remaining = set(cells)
+        rectangles = []
+        for row, column in sorted(cells):
+            if (row, column) not in remaining:
+                continue
+            # Run right as far as we can, then grow the run up a row at a time
+            columns = 1
+            while (row, column + columns) in remaining:
+                columns += 1
+            rows = 1
+            while all((row + rows, column + i) in remaining for i in range(columns)):
+                rows += 1
+            for i in range(rows):
+                for j in range(columns):
+                    remaining.discard((row + i, column + j))
+            rectangles.append((row, column, rows, columns))
+        return rectangles
+
+    def _add_shape(self, collision_type, patch, vertices, tiles):
+        shape = pymunk.Poly(self.physics_engine.space.static_body, vertices)
+        shape.friction = self.frictions[collision_type]
+        shape.collision_type = self._type_id(collision_type)
+        self.physics_engine.space.add(shape)
+        self.patch_shapes.setdefault((collision_type, patch), []).append(shape)
+        self.shape_tiles[shape] = tiles
+
+    @classmethod
+    def _patch_specs(cls, tiles):
+        """ The (vertices, tiles) of every shape needed for the tiles of one patch """
+        full = {cell for cell, tile in tiles.items() if cls._fills_cell(tile)}
+        specs = []
+        for row, column, rows, columns in cls._rectangles(full):
+            left, bottom = column * GRID_PIXEL_SIZE, row * GRID_PIXEL_SIZE
+            right, top = left + columns * GRID_PIXEL_SIZE, bottom + rows * GRID_PIXEL_SIZE
+            merged = [tiles[row + i, column + j] for i in range(rows) for j in range(columns)]
+            specs.append(([(left, bottom), (right, bottom), (right, top), (left, top)], merged))
+
+        for cell, tile in tiles.items():
+            if cell not in full:
+                specs.append((tile.get_adjusted_hit_box(), [tile]))
+        return specs
+
+    def _build_patch(self, collision_type, patch):
+        """ Rebuild the shapes of one patch from the tiles still in it """
+        for shape in self.patch_shapes.pop((collision_type, patch), ()):
+            self.physics_engine.space.remove(shape)
+            del self.shape_tiles[shape]
+
+        tiles = self.patch_tiles.get((collision_type, patch))
+        if not tiles:
+            self.patch_tiles.pop((collision_type, patch), None)
+            return
+        for vertices, merged in self._patch_specs(tiles):
+            self._add_shape(collision_type, patch, vertices, merged)
+
+    def remove_tiles(self, collision_type, tiles):
+        """ Take destroyed or unloaded tiles out, rebuilding only their patches """
+        patches = set()
+        for tile in tiles:
+            cell = self._cell(tile)
+            patch = self._patch(cell)
+            patch_tiles = self.patch_tiles.get((collision_type, patch), {})
+            if patch_tiles.get(cell) is tile:
+                del patch_tiles[cell]
+                patches.add(patch)
+        for patch in patches:
+            self._build_patch(collision_type, patch)
+
+    def remove_tile(self, collision_type, tile):
+        """ Take a destroyed tile out, rebuilding only its patch """
+        self.remove_tiles(collision_type, [tile])
+
+    def tile_for_contact(self, shape, arbiter):
+        """ The tile of a merged shape nearest where the collision happened """
+        tiles = self.shape_tiles.get(shape)
+        if not tiles:
+            return None
+        points = arbiter.contact_point_set.points
+        if not points:
+            return tiles[0]
+        x, y = points[0].point_b
+        return min(tiles, key=lambda tile: (tile.center_x - x) ** 2 + (tile.center_y - y) ** 2)
+
+    def add_collision_handler(self, first_type, collision_type, post_handler):
+        """ Like PymunkPhysicsEngine.add_collision_handler, handing the tile that was hit to post_handler """
+        handler = self.physics_engine.space.add_collision_handler(self._type_id(first_type),
+                                                                  self._type_id(collision_type))
+
+        def post_solve(arbiter, space, data):
+            first_shape, tile_shape = arbiter.shapes
+            sprite = self.physics_engine.get_sprite_for_shape(first_shape)
+            tile = self.tile_for_contact(tile_shape, arbiter)
+            if sprite is not None and tile is not None:
+                post_handler(sprite, tile, arbiter, space, data)
+
+        handler.post_solve = post_solve
+
+    @property
+    def shape_count(self):
+        return len(self.shape_tiles)
+
+# Tile streaming
+
+# Streamed tiles are made and released a square chunk this many tiles across
+# at a time. A whole number of static geometry patches, so no patch is ever
+# split between a loaded and an unloaded chunk.
+CHUNK_TILES = STATIC_PATCH_SIZE * 2
+CHUNK_PIXEL_SIZE = CHUNK_TILES * GRID_PIXEL_SIZE
+
+# Chunks are loaded as far from the centre of the camera as any projectile
+# may get before it is culled, so nothing in flight can reach unloaded terrain
+CHUNK_STREAM_DISTANCE = max(policy.camera_distance for policy in PROJECTILE_CULL_POLICIES.values()
+                            if policy.camera_distance is not None)
+
+# and kept until a chunk further than that, so walking back and forth over a
+# chunk edge doesn't load and release the same tiles over and over
+CHUNK_RELEASE_DISTANCE = CHUNK_STREAM_DISTANCE + CHUNK_PIXEL_SIZE
+
+# Most chunks to load, and to release, in one tick. Loading the chunks a step
+# of the camera brings in all at once would be a stutter of its own, and the
+# stream distance leaves plenty of room to spread them out.
+CHUNK_CHANGES_PER_TICK = 1
+
+# Streamed layers that are solid, by their static geometry collision type
+STREAMED_SOLID_LAYERS = {
+    LAYER_NAME_PLATFORMS: "wall",
+    LAYER_NAME_DYNAMIC_TILES: "block",
+}
+
+# Set to False to make every tile when the level starts and keep them all
+USE_TILE_STREAMING = True
+
+# How one solid layer of a chunk goes into the terrain grid and static
+# geometry, by placement index: the terrain cells and geometry cell of each
+# tile, and the shapes of each patch, as StaticGeometry.plan makes them
+SolidChunkPlan = collections.namedtuple("SolidChunkPlan", ["terrain_cells", "geometry_cells", "patch_specs"])
+
+class TileChunks:
+    """ A level's streamed tiles as placements, bucketed into square chunks """
+    def __init__(self, placements, map_width, map_height):
+        self.rows = max(int(math.ceil(map_height / CHUNK_PIXEL_SIZE)), 1)
+        self.columns = max(int(math.ceil(map_width / CHUNK_PIXEL_SIZE)), 1)
+        self.chunks = {}
+        tile_types = {}
+        for layer, layer_placements in placements.items():
+            for placement in layer_placements:
+                chunk = self.chunk_of(placement.center_x, placement.center_y)
+                self.chunks.setdefault(chunk, {}).setdefault(layer, []).append(placement)
+                tile_types[id(placement.tile_type)] = placement.tile_type
+
+        # A tile belongs to the chunk its centre is in, but a big one can hang
+        # over into the next, this far at most
+        self.overhang = max((max(tile_type.texture.width, tile_type.texture.height) * tile_type.scale / 2
+                             for tile_type in tile_types.values()), default=0)
+
+        # (chunk, layer): SolidChunkPlan, worked out the first time a chunk is
+        # loaded and kept with the level, so loading it again isn't merging again
+        self.solid_plans = {}
+
+    @staticmethod
+    def chunk_of(x, y):
+        """ The (row, column) of the chunk a point is in """
+        return int(y // CHUNK_PIXEL_SIZE), int(x // CHUNK_PIXEL_SIZE)
+
+    def chunk_range(self, left, right, bottom, top):
+        """ First and last row and column of the chunks a box covers, clipped to the map """
+        row_0, column_0 = self.chunk_of(max(left, 0), max(bottom, 0))
+        row_1, column_1 = self.chunk_of(max(right, 0), max(top, 0))
+        return (min(row_0, self.rows - 1), min(row_1, self.rows - 1),
+                min(column_0, self.columns - 1), min(column_1, self.columns - 1))
+
+    def placements(self, chunk):
+        """ The placements of a chunk, by layer """
+        return self.chunks.get(chunk, {})
+
+    @property
+    def tile_count(self):
+        return sum(len(placements) for layers in self.chunks.values() for placements in layers.values())
+
+class TileStreamer:
+    """
+    Makes the streamed tiles near the camera, and releases them again once it moves away.
+
+    Loading a chunk makes the sprites of its tiles, in a sprite list per
+    layer, adds solid ones to the terrain grid and static geometry and
+    pickups, hazards and ladders to the sensors. Releasing it takes all that
+    out again and drops the sprite lists, remembering which tiles had been
+    collected or destroyed, so they stay gone if the chunk is loaded again.
+    Keeping each chunk's tiles in lists of their own makes releasing them
+    cheap, where taking them out of one big list per layer is not, and lets
+    the chunks the camera can't see be skipped when drawing.
+
+    The terrain cells and merged geometry of a chunk's solid tiles are
+    worked out the first time it loads and kept with the level's chunks, so
+    loading it again, in this attempt or the next, only adds them back. When
+    a new attempt starts, the chunks that were loaded are kept to load again
+    too, so a respawn doesn't make the tiles around the player all over.
+
+    Bodies of the parked layers, such as the dynamic items, are taken out of
+    the physics engine while the chunks around them are unloaded, so they
+    don't fall through missing terrain.
+    """
+    def __init__(self):
+        self.tile_chunks = None
+        self.scene = None
+        self.physics_engine = None
+        self.terrain = None
+        self.static_geometry = None
+        self.sensors = None
+        self.parked_layers = {}
+
+        # chunk: {layer: (sprite_list, [(index, sprite)])} for every loaded chunk
+        self.resident = {}
+
+        # (chunk, layer, index) of tiles collected or destroyed this attempt
+        self.removed = set()
+
+        # Sprites of the parked layers that are out of the physics engine
+        self.parked = set()
+
+        # {(chunk, layer): (sprite_list, tiles)} of the chunks loaded when the
+        # last attempt at the level ended, loaded again from these rather than afresh
+        self.spare = {}
+
+        # The chunk range loaded for, so nothing is done until the camera crosses a chunk
+        self.chunk_window = None
+
+        # Chunks waiting to be loaded, nearest the camera first, and released
+        self.to_load = []
+        self.to_release = []
+
+        # Counters, handy when profiling
+        self.loads = 0
+        self.releases = 0
+
+    def setup(self, tile_chunks, scene, physics_engine, terrain, static_geometry, sensors, parked_layers):
+        """ Start streaming a new attempt at a level, with nothing loaded yet """
+        # Tiles only ever get collected or destroyed, never changed, so the
+        # chunks of another attempt at the same level are as good as new
+        self.spare = self._spare_tiles() if tile_chunks is self.tile_chunks else {}
+        self.tile_chunks = tile_chunks
+        self.scene = scene
+        self.physics_engine = physics_engine
+        self.terrain = terrain
+        self.static_geometry = static_geometry
+        self.sensors = sensors
+        self.parked_layers = parked_layers
+        self.resident = {}
+        self.removed = set()
+        self.parked = set()
+        self.chunk_window = None
+        self.to_load = []
+        self.to_release = []
+        self.loads = 0
+        self.releases = 0
+
+    def _chunks_around(self, x, y, distance):
+        """ The chunk range within distance of a point, or the whole map if not streaming """
+        if not USE_TILE_STREAMING:
+            return 0, self.tile_chunks.rows - 1, 0, self.tile_chunks.columns - 1
+        return self.tile_chunks.chunk_range(x - distance, x + distance, y - distance, y + distance)
+
+    def update(self, centre_x, centre_y, changes=CHUNK_CHANGES_PER_TICK):
+        """
+        Load the chunks near the camera centre and release those far from it.
+
+        At most changes chunks are loaded and released, the rest are left
+        for later ticks. None does them all at once.
+        """
+        chunk_window = self._chunks_around(centre_x, centre_y, CHUNK_STREAM_DISTANCE)
+        if chunk_window != self.chunk_window:
+            self.chunk_window = chunk_window
+
+            row_0, row_1, column_0, column_1 = self._chunks_around(centre_x, centre_y, CHUNK_RELEASE_DISTANCE)
+            self.to_release = [chunk for chunk in self.resident
+                               if not (row_0 <= chunk[0] <= row_1 and column_0 <= chunk[1] <= column_1)]
+
+            row, column = self.tile_chunks.chunk_of(centre_x, centre_y)
+            row_0, row_1, column_0, column_1 = chunk_window
+            self.to_load = sorted(
+                ((chunk_row, chunk_column)
+                 for chunk_row in range(row_0, row_1 + 1)
+                 for chunk_column in range(column_0, column_1 + 1)
+                 if (chunk_row, chunk_column) not in self.resident),
+                key=lambda chunk: max(abs(chunk[0] - row), abs(chunk[1] - column)),
+                reverse=True,
+            )
+
+        if not self.to_load and not self.to_release:
+            return
+        done = 0
+        while (self.to_load or self.to_release) and (changes is None or done < changes):
+            if self.to_release:
+                self._release(self.to_release.pop())
+            if self.to_load:
+                self._load(self.to_load.pop())
+            done += 1
+        self._park()
+
+    def _load(self, chunk):
+        """ Make a chunk's tiles and add them to the level """
+        layers = {}
+        for layer, placements in self.tile_chunks.placements(chunk).items():
+            sprite_list, tiles = self.spare.pop((chunk, layer), (None, ()))
+            if sprite_list is None or not len(sprite_list) == len(tiles) == len(placements):
+                # Made afresh, keeping any sprites the last attempt had
+                made = dict(tiles)
+                for sprite in made.values():
+                    sprite.sprite_lists.clear()
+                tiles = [(index, made.get(index) or make_tile_sprite(placement))
+                         for index, placement in enumerate(placements)
+                         if (chunk, layer, index) not in self.removed]
+                # Lazy, so chunks that are never on screen never make OpenGL buffers
+                sprite_list = arcade.SpriteList(lazy=True)
+                sprite_list.extend([sprite for _, sprite in tiles])
+            sprites = [sprite for _, sprite in tiles]
+            collision_type = STREAMED_SOLID_LAYERS.get(layer)
+            if collision_type is not None:
+                plan = self._solid_plan(chunk, layer, placements, tiles)
+                planned = [None] * len(placements)
+                for index, sprite in tiles:
+                    self.terrain.add(sprite, plan.terrain_cells[index])
+                    planned[index] = sprite
+                self.static_geometry.add_planned(collision_type, planned, plan.geometry_cells, plan.patch_specs)
+            if layer in dict(SENSOR_LAYERS):
+                self.sensors.add(layer, sprites)
+            layers[layer] = (sprite_list, tiles)
+        self.resident[chunk] = layers
+        self.loads += 1
+
+    def _spare_tiles(self):
+        """ The sprite list and tiles of each layer of every loaded chunk, unhooked from the attempt that is ending """
+        spare = {}
+        for chunk, layers in self.resident.items():
+            for layer, (sprite_list, tiles) in layers.items():
+                if layer in dict(SENSOR_LAYERS):
+                    # The physics engine goes with the attempt
+                    for _, sprite in tiles:
+                        sprite.physics_engines.clear()
+                spare[(chunk, layer)] = sprite_list, tiles
+        return spare
+
+    def _solid_plan(self, chunk, layer, placements, tiles):
+        """ The SolidChunkPlan of a layer of a chunk, worked out the first time it is loaded in the level """
+        plan = self.tile_chunks.solid_plans.get((chunk, layer))
+        if plan is None:
+            # Tiles gone already still need their place in the plan
+            made = dict(tiles)
+            sprites = [made.get(index) or make_tile_sprite(placement)
+                       for index, placement in enumerate(placements)]
+            geometry_cells, patch_specs = StaticGeometry.plan(sprites)
+            plan = SolidChunkPlan([self.terrain.cells_under(sprite) for sprite in sprites],
+                                  geometry_cells, patch_specs)
+            self.tile_chunks.solid_plans[(chunk, layer)] = plan
+        return plan
+
+    def _release(self, chunk):
+        """ Take a chunk's tiles out of the level and drop them """
+        for layer, (sprite_list, tiles) in self.resident.pop(chunk).items():
+            collision_type = STREAMED_SOLID_LAYERS.get(layer)
+            for index, sprite in tiles:
+                if not sprite.sprite_lists:
+                    # Collected or destroyed while it was loaded
+                    self.removed.add((chunk, layer, index))
+                    continue
+                # Sensors
+                for physics_engine in sprite.physics_engines:
+                    physics_engine.remove_sprite(sprite)
+                sprite.physics_engines.clear()
+                # The chunk's sprite list is dropped with it, so only the
+                # sprite's side of the link needs breaking
+                sprite.sprite_lists.clear()
+                if collision_type is not None:
+                    self.terrain.remove(sprite)
+            if collision_type is not None:
+                self.static_geometry.remove_tiles(collision_type, [sprite for _, sprite in tiles])
+        self.releases += 1
+
+    def _active(self, x, y):
+        """ Are the chunks all around a point loaded? """
+        row, column = self.tile_chunks.chunk_of(x, y)
+        for neighbour_row in range(row - 1, row + 2):
+            for neighbour_column in range(column - 1, column + 2):
+                if 0 <= neighbour_row < self.tile_chunks.rows and \
+                        0 <= neighbour_column < self.tile_chunks.columns and \
+                        (neighbour_row, neighbour_column) not in self.resident:
+                    return False
+        return True
+
+    def _park(self):
+        """ Take bodies out of the physics engine where the terrain around them isn't loaded, and back """
+        for layer, physics_options in self.parked_layers.items():
+            for sprite in self.scene[layer]:
+                active = self._active(sprite.center_x, sprite.center_y)
+                if active and sprite in self.parked:
+                    self.parked.discard(sprite)
+                    self.physics_engine.add_sprite(sprite, **physics_options)
+                elif not active and sprite not in self.parked and self.physics_engine in sprite.physics_engines:
+                    self.parked.add(sprite)
+                    self.physics_engine.remove_sprite(sprite)
+                    sprite.physics_engines.remove(self.physics_engine)
+
+    def draw(self, layer, left, right, bottom, top):
+        """
+        Draw a streamed layer's tiles in the loaded chunks that overlap a view of the level.
+
+        Returns how many draw calls that took, one per chunk with tiles of
+        the layer left, and how many sprites they drew.
+        """
+        if not self.scene[layer].visible:
+            return 0, 0
+        draw_calls = 0
+        sprites = 0
+        overhang = self.tile_chunks.overhang
+        row_0, row_1, column_0, column_1 = self.tile_chunks.chunk_range(
+            left - overhang, right + overhang, bottom - overhang, top + overhang)
+        for row in range(row_0, row_1 + 1):
+            for column in range(column_0, column_1 + 1):
+                layers = self.resident.get((row, column))
+                if layers and layer in layers and len(layers[layer][0]):
+                    layers[layer][0].draw()
+                    draw_calls += 1
+                    sprites += len(layers[layer][0])
+        return draw_calls, sprites
+
+    @property
+    def sprite_count(self):
+        """ How many streamed tiles are made right now """
+        return sum(len(sprite_list) for layers in self.resident.values() for sprite_list, _ in layers.values())
+
+# Entity spawning
+
+# Enemies and allies are only made once the centre of the camera comes this
+# many pixels across from where they start, so they are already there and
+# walking about by the time they come into view
+ENTITY_SPAWN_DISTANCE = SCREEN_WIDTH
+
+# and go dormant again past this, a little further so one on the edge doesn't
+# spawn and despawn over and over as the camera moves to and fro
+ENTITY_DESPAWN_DISTANCE = ENTITY_SPAWN_DISTANCE + SCREEN_WIDTH / 2
+
+# Set to False to spawn every enemy and ally when the level starts and keep them
+USE_LAZY_SPAWNING = True
+
+class EntitySpawner:
+    """
+    Spawns a level's enemies or allies as the camera comes near where they start.
+
+    The spawn records are sorted by x, so the ones in range of the camera
+    are found with a pair of bisects however many the level has. Entities
+    the camera has left far behind go dormant, remembering their health for
+    when they next spawn, and ones that were killed stay dead for the rest
+    of the attempt.
+    """
+    def __init__(self):
+        self.records = []
+        self.record_xs = []
+        self.sprite_list = None
+
+        # Record index -> the entity spawned from it
+        self.live = {}
+
+        # Record index -> health when it went dormant
+        self.health = {}
+
+        # Record indexes that were killed
+        self.dead = set()
+
+        self.spawns = 0
+        self.despawns = 0
+
+    def setup(self, records, sprite_list):
+        """ Start an attempt at a level, with nothing spawned yet """
+        self.records = sorted(records, key=lambda record: record.center_x)
+        self.record_xs = [record.center_x for record in self.records]
+        self.sprite_list = sprite_list
+        self.live = {}
+        self.health = {}
+        self.dead = set()
+        self.spawns = 0
+        self.despawns = 0
+
+    def update(self, centre_x):
+        """ Spawn what the camera has come near and put to sleep what it has left behind """
+        if USE_LAZY_SPAWNING:
+            spawn_distance, despawn_distance = ENTITY_SPAWN_DISTANCE, ENTITY_DESPAWN_DISTANCE
+        else:
+            spawn_distance = despawn_distance = math.inf
+
+        for index, entity in list(self.live.items()):
+            if not entity.sprite_lists:
+                # Taken out of the game since the last update, so it was killed
+                del self.live[index]
+                self.dead.add(index)
+            elif abs(self.record_xs[index] - centre_x) > despawn_distance:
+                del self.live[index]
+                if hasattr(entity, "health"):
+                    self.health[index] = entity.health
+                entity.remove_from_sprite_lists()
+                self.despawns += 1
+
+        first = bisect.bisect_left(self.record_xs, centre_x - spawn_distance)
+        last = bisect.bisect_right(self.record_xs, centre_x + spawn_distance)
+        for index in range(first, last):
+            if index in self.live or index in self.dead:
+                continue
+            entity = spawn_entity(self.records[index])
+            if index in self.health:
+                entity.health = self.health[index]
+            self.sprite_list.append(entity)
+            self.live[index] = entity
+            self.spawns += 1
+
+    @property
+    def dormant_count(self):
+        """ How many are waiting for the camera to come near """
+        return len(self.records) - len(self.live) - len(self.dead)
+
+# Enemy level of detail
+
+# How often an enemy is updated depends on how far outside the camera's view it
+# is, in pixels along either axis. On screen it is updated every tick. Within
+# near_distance it is animated and patrols every near_interval ticks, moving
+# that many ticks' worth each time, and still fires in case its bullets come
+# into view. Further away it is frozen where it is and holds its fire.
+EnemyDetailPolicy = collections.namedtuple("EnemyDetailPolicy", ["near_distance", "near_interval"])
+ENEMY_DETAIL_POLICY = EnemyDetailPolicy(near_distance=SCREEN_WIDTH / 4, near_interval=4)
+
+# The tiers, most detailed first
+ENEMY_DETAIL_TIERS = ("full", "reduced", "frozen")
+
+# Set to False to update every enemy every tick
+USE_ENEMY_LEVEL_OF_DETAIL = True
+
+class EnemyLevelOfDetail:
+    """
+    Animates, patrols and picks the enemies that may fire, at a rate set by their distance from the view.
+
+    The reduced tier is staggered across ticks, so the enemies in it don't
+    all update on the same one. How many enemies were in each tier on the
+    last tick, and in total since the level started, are kept for profiling.
+    """
+    def __init__(self, policy=None):
+        self.policy = ENEMY_DETAIL_POLICY if policy is None else policy
+        self.tier_counts = dict.fromkeys(ENEMY_DETAIL_TIERS, 0)
+        self.tier_ticks = collections.Counter()
+
+    def setup(self):
+        """ Start counting afresh for a new level """
+        self.tier_counts = dict.fromkeys(ENEMY_DETAIL_TIERS, 0)
+        self.tier_ticks = collections.Counter()
+
+    def tier(self, enemy, left, right, bottom, top):
+        """ Which tier an enemy is in for a view of the level """
+        if not USE_ENEMY_LEVEL_OF_DETAIL:
+            return "full"
+        distance = max(left - enemy.right, enemy.left - right, bottom - enemy.top, enemy.bottom - top)
+        if distance <= 0:
+            return "full"
+        if distance <= self.policy.near_distance:
+            return "reduced"
+        return "frozen"
+
+    def update(self, enemies, left, right, bottom, top, frame_count, delta_time):
+        """ Update the enemies each as often as its tier says, and return the ones that may fire """
+        interval = self.policy.near_interval
+        counts = dict.fromkeys(ENEMY_DETAIL_TIERS, 0)
+        firing = []
+        for index, enemy in enumerate(enemies):
+            tier = self.tier(enemy, left, right, bottom, top)
+            counts[tier] += 1
+            if tier == "frozen":
+                continue
+            firing.append(enemy)
+
+            if tier == "full":
+                enemy.update_animation(delta_time)
+                enemy.update()
+            elif (frame_count + index) % interval == 0:
+                enemy.update_animation(delta_time * interval)
+                enemy.center_x += enemy.change_x * interval
+                enemy.center_y += enemy.change_y * interval
+                enemy.angle += enemy.change_angle * interval
+            else:
+                continue
+
+            # See if the enemy hit a boundary and needs to reverse direction
+            if enemy.boundary_right and enemy.right > enemy.boundary_right and enemy.change_x > 0:
+                enemy.change_x *= -1
+            if enemy.boundary_left and enemy.left < enemy.boundary_left and enemy.change_x < 0:
+                enemy.change_x *= -1
+
+        self.tier_counts = counts
+        self.tier_ticks.update(counts)
+        return firing
+
+# Fixed timestep
+
+# Simulation ticks per second. The game always advances in ticks of
+# 1 / SIMULATION_TICK_RATE seconds, however fast or slow frames are drawn.
+SIMULATION_TICK_RATE = 60
+
+# Most ticks to run for one drawn frame. If the machine can't keep up, the
+# rest of the time is dropped rather than falling further and further behind.
+SIMULATION_MAX_SUBSTEPS = 5
+
+# Set to False to step once per drawn frame by however long the frame took
+USE_FIXED_TIMESTEP = True
+
+class FixedTimestep:
+    """ Saves up frame time and hands it out as whole simulation ticks """
+    def __init__(self, tick_rate=SIMULATION_TICK_RATE, max_substeps=SIMULATION_MAX_SUBSTEPS):
+        self.tick = 1 / tick_rate
+        self.max_substeps = max_substeps
+        self.accumulator = 0.0
+        self.ticks = 0
+        self.dropped_ticks = 0
+
+    def reset(self):
+        """ Forget any time saved up, such as after loading a level """
+        self.accumulator = 0.0
+
+    def advance(self, delta_time):
+        """ Add a frame's time and return how many ticks to run for it """
+        self.accumulator += delta_time
+        # Allow a little floating point slack so a 1/60 frame is always one tick
+        ticks = int((self.accumulator + 1e-9) // self.tick)
+        if ticks > self.max_substeps:
+            self.dropped_ticks += ticks - self.max_substeps
+            ticks = self.max_substeps
+            self.accumulator = self.tick * ticks
+        self.accumulator = max(self.accumulator - ticks * self.tick, 0.0)
+        self.ticks += ticks
+        return ticks
+
+    @property
+    def alpha(self):
+        """ How far into the next tick we are, from 0 to 1 """
+        return min(self.accumulator / self.tick, 1.0)
+
+class RenderInterpolator:
+    """
+    Draws moving sprites part way between their last two ticks.
+
+    The positions from before the last tick are captured, and while drawing
+    each sprite is moved alpha of the way from there to where it is now,
+    then put back once the frame is drawn.
+    """
+    def __init__(self):
+        self.previous = {}
+        self._moved = []
+
+    def clear(self):
+        """ Forget captured positions, so nothing is blended across a level load """
+        self.previous = {}
+        self._moved = []
+
+    def capture(self, sprite_lists):
+        """ Remember where everything is before a tick """
+        self.previous = {sprite: sprite.position
+                         for sprite_list in sprite_lists
+                         for sprite in sprite_list}
+
+    def apply(self, sprite_lists, alpha):
+        """ Move sprites to their blended positions for drawing """
+        self._moved = []
+        for sprite_list in sprite_lists:
+            for sprite in sprite_list:
+                previous = self.previous.get(sprite)
+                if previous is None:
+                    continue
+                position = sprite.position
+                if previous == position:
+                    continue
+                self._moved.append((sprite, position))
+                sprite.position = (previous[0] + (position[0] - previous[0]) * alpha,
+                                   previous[1] + (position[1] - previous[1]) * alpha)
+
+    def restore(self):
+        """ Put everything back where the simulation left it """
+        for sprite, position in self._moved:
+            sprite.position = position
+        self._moved = []
+
+# Heads up display
+
+# One line of the HUD: the text before the value, the GameSimulation
+# attribute it shows, its colour and its height up the screen
+HudField = collections.namedtuple("HudField", "label attribute color y")
+
+HUD_FIELDS = (
+    HudField("Grenade Booster Remaining: ", "grenade_booster", arcade.csscolor.DARK_GREEN, 160),
+    HudField("Invincibility Shield Remaining: ", "invincibility_timer", arcade.csscolor.ORANGE_RED, 130),
+    HudField("Remaining Life Points: ", "lives", arcade.csscolor.LIGHT_GOLDENROD_YELLOW, 100),
+    HudField("Score: ", "score", arcade.csscolor.BLACK, 70),
+    HudField("Current Level: ", "level", arcade.csscolor.DARK_BLUE, 40),
+    HudField("Player Level Up: ", "level_up", arcade.csscolor.DARK_RED, 10),
+)
+HUD_X = 10
+HUD_FONT_SIZE = 18
+# The same fonts arcade.draw_text uses
+HUD_FONT_NAME = ("calibri", "arial")
+
+# Set to False to draw each line with arcade.draw_text every frame
+USE_BATCHED_HUD = True
+
+class Hud:
+    """
+    The HUD lines as labels in one pyglet batch, drawn together.
+
+    A line is only laid out again when the value it shows has changed, where
+    arcade.draw_text lays out every line every frame, as the lines all share
+    one cached label.
+    """
+    def __init__(self, fields=HUD_FIELDS):
+        self.fields = fields
+        self.batch = pyglet.graphics.Batch()
+        self.labels = [
+            pyglet.text.Label(
+                "",
+                x=HUD_X,
+                y=field.y,
+                font_name=HUD_FONT_NAME,
+                font_size=HUD_FONT_SIZE,
+                color=arcade.get_four_byte_color(field.color),
+                batch=self.batch,
+            )
+            for field in fields
+        ]
+        self.values = [None] * len(fields)
+        # How many times a line has been laid out, for profiling
+        self.layouts = 0
+
+    def update(self, simulation):
+        """ Lay out again only the lines whose values have changed """
+        for i, field in enumerate(self.fields):
+            value = getattr(simulation, field.attribute)
+            if value != self.values[i]:
+                self.values[i] = value
+                self.labels[i].text = f"{field.label}{value}"
+                self.layouts += 1
+
+    def draw(self):
+        """ Draw every line at once """
+        with arcade.get_window().ctx.pyglet_rendering():
+            self.batch.draw()
+
+def draw_hud_unbatched(simulation, fields=HUD_FIELDS):
+    """ Draw the HUD a line at a time, laying out every line afresh """
+    for field in fields:
+        arcade.draw_text(
+            f"{field.label}{getattr(simulation, field.attribute)}",
+            HUD_X,
+            field.y,
+            field.color,
+            HUD_FONT_SIZE,
+        )
+
+# Layered rendering
+
+# Every layer of a level, back to front, and whether it is streamed (see
+# TileStreamer). Foreground is the last tile layer of every map, so it goes
+# over the other tile layers and under the characters and projectiles. Streamed layers are drawn a chunk at a time, skipping the
+# chunks out of view. The rest are drawn whole in one draw call each, as
+# their sprites move about and culling them one by one in Python costs more
+# than letting the GPU clip them.
+RenderLayer = collections.namedtuple("RenderLayer", "name streamed")
+
+RENDER_ORDER = (
+    RenderLayer(LAYER_NAME_BACKGROUND, True),
+    RenderLayer(LAYER_NAME_PLATFORMS, True),
+    RenderLayer(LAYER_NAME_LADDERS, True),
+    RenderLayer(LAYER_NAME_DYNAMIC_ITEMS, False),
+    RenderLayer(LAYER_NAME_DYNAMIC_TILES, True),
+    RenderLayer(LAYER_NAME_COINS, True),
+    RenderLayer(LAYER_NAME_HEARTS, True),
+    RenderLayer(LAYER_NAME_POWER_UPS, True),
+    RenderLayer(LAYER_NAME_FOREGROUND, True),
+    RenderLayer(LAYER_NAME_ALLIES, False),
+    RenderLayer(LAYER_NAME_ENEMIES, False),
+    RenderLayer(LAYER_NAME_PLAYER_BULLETS, False),
+    RenderLayer(LAYER_NAME_ENEMY_BULLETS, False),
+    RenderLayer(LAYER_NAME_SHIELD, False),
+    RenderLayer(LAYER_NAME_MOVING_PLATFORMS, False),
+    RenderLayer(LAYER_NAME_DONT_TOUCH, True),
+    RenderLayer(LAYER_NAME_PLAYER_GRENADES, False),
+    RenderLayer(LAYER_NAME_PLAYER, False),
+)
+
+class LayeredRenderer:
+    """
+    Draws every layer of a level once, in RENDER_ORDER.
+
+    Scene.draw would draw each layer of the map in whatever order the map
+    has them, including ones already drawn on their own. Layers the scene
+    has that aren't in RENDER_ORDER are drawn last, but before the player,
+    so a new layer in a map is never lost.
+    """
+    def __init__(self, order=RENDER_ORDER):
+        self.order = order
+        self.tile_streamer = None
+        # (layer, streamed, sprite list) in the order they are drawn
+        self.layers = []
+        self.chunk_baker = ChunkBaker()
+        self.animated_sprites = AnimatedSpriteRenderer()
+        self.projectiles = ProjectileRenderer()
+        self.enemy_bullets = None
+        self.weapon_textures = None
+
+        # What the last frame drew, by layer, handy when profiling
+        self.draw_calls = collections.Counter()
+        self.sprites_drawn = collections.Counter()
+
+    def setup(self, simulation):
+        """ Find the sprite list of each layer of a level that has just been set up """
+        self.tile_streamer = simulation.tile_streamer
+        self.enemy_bullets = simulation.enemy_bullets
+        self.weapon_textures = simulation.enemy_weapons.weapon_textures
+        sprite_lists = dict(simulation.scene.name_mapping)
+        sprite_lists[LAYER_NAME_PLAYER] = simulation.player_list
+        ordered = {layer.name for layer in self.order}
+        self.layers = [(layer.name, layer.streamed, sprite_lists[layer.name])
+                       for layer in self.order[:-1] if layer.name in sprite_lists]
+        self.layers += [(layer, False, sprite_list) for layer, sprite_list in sprite_lists.items()
+                        if layer not in ordered]
+        last = self.order[-1]
+        if last.name in sprite_lists:
+            self.layers.append((last.name, last.streamed, sprite_lists[last.name]))
+
+        # The baked layers are drawn together, a texture per chunk
+        if USE_BAKED_CHUNKS:
+            self.chunk_baker.setup(simulation.tile_streamer)
+            self.layers = [(BAKED_CHUNKS_LAYER, True, None)] + [
+                entry for entry in self.layers if entry[0] not in self.chunk_baker.layers]
+
+    def draw(self, left, right, bottom, top, alpha=1.0):
+        """ Draw every layer for a view of the level, with enemy bullets alpha of the way through their last move """
+        self.draw_calls = collections.Counter()
+        self.sprites_drawn = collections.Counter()
+        for layer, streamed, sprite_list in self.layers:
+            if layer == BAKED_CHUNKS_LAYER:
+                draw_calls, sprites = self.chunk_baker.draw(left, right, bottom, top)
+            elif USE_GPU_ANIMATION and layer in GPU_ANIMATED_LAYERS:
+                draw_calls, sprites = self.animated_sprites.draw(sprite_list)
+            elif USE_INSTANCED_PROJECTILES and layer == LAYER_NAME_ENEMY_BULLETS:
+                draw_calls, sprites = self.projectiles.draw_bullets(self.enemy_bullets, self.weapon_textures, alpha)
+            elif USE_INSTANCED_PROJECTILES and layer in INSTANCED_PROJECTILE_LAYERS:
+                draw_calls, sprites = self.projectiles.draw_sprites(sprite_list)
+            elif streamed:
+                draw_calls, sprites = self.tile_streamer.draw(layer, left, right, bottom, top)
+            elif sprite_list.visible and len(sprite_list):
+                sprite_list.draw()
+                draw_calls, sprites = 1, len(sprite_list)
+            else:
+                continue
+            if draw_calls:
+                self.draw_calls[layer] = draw_calls
+                self.sprites_drawn[layer] = sprites
+
+# Baked chunks
+
+# Streamed layers that never change once a level is set up. They must be
+# the first layers of RENDER_ORDER, as each chunk of them is rendered once
+# over the background colour into a texture of its own, and drawn as a
+# single quad rather than a sprite per tile. Foreground never changes
+# either, but draws over the pickups, so it is drawn a chunk at a time.
+BAKED_LAYERS = (LAYER_NAME_BACKGROUND, LAYER_NAME_PLATFORMS, LAYER_NAME_LADDERS)
+
+# The name the baked layers are counted under when drawing
+BAKED_CHUNKS_LAYER = "Baked Chunks"
+
+# Set to False to draw the baked layers a tile at a time
+USE_BAKED_CHUNKS = True
+
+BAKED_CHUNK_VERTEX_SHADER = """
+#version 330
+
+uniform Projection {
+    uniform mat4 matrix;
+} proj;
+
+in vec2 in_vert;
+in vec2 in_uv;
+out vec2 v_uv;
+
+void main() {
+    gl_Position = proj.matrix * vec4(in_vert, 0.0, 1.0);
+    v_uv = in_uv;
+}
+"""
+
+# The texture was baked over the background, so is opaque. Its alpha is
+# whatever blending tiles over it left, which is of no use and is ignored.
+BAKED_CHUNK_FRAGMENT_SHADER = """
+#version 330
+
+uniform sampler2D chunk_texture;
+
+in vec2 v_uv;
+out vec4 f_color;
+
+void main() {
+    f_color = vec4(texture(chunk_texture, v_uv).rgb, 1.0);
+}
+"""
+
+# A chunk's baked texture. key says what it was baked from, so it can tell
+# when it is out of date, and sources keeps those alive so their ids in the
+# key stay theirs.
+BakedChunk = collections.namedtuple("BakedChunk", "key sources texture geometry tile_count")
+
+class ChunkBaker:
+    """
+    Draws the baked layers of the streamed chunks in view as a textured quad each.
+
+    A chunk is baked the first time it comes into view, and again whenever
+    what it was baked from changes: the chunk being streamed in afresh or
+    losing a tile, or the background colour changing. If the level has tiles
+    big enough to hang over a chunk's edge, the neighbours' tiles are baked
+    in too, so the chunks never need to overlap. Textures of chunks more
+    than a chunk out of view are dropped, to keep the memory they take down.
+    """
+    def __init__(self, layers=BAKED_LAYERS):
+        self.layers = layers
+        self.tile_streamer = None
+        self.program = None
+
+        # How many chunks around a chunk have tiles that may reach into it
+        self.reach = 0
+
+        # chunk: BakedChunk
+        self.baked = {}
+
+        # How many chunks have been baked, handy when profiling
+        self.bakes = 0
+
+    def setup(self, tile_streamer):
+        """ Start baking a new attempt at a level """
+        self.tile_streamer = tile_streamer
+        # Tiles on the grid are at least half a cell inside their chunk
+        self.reach = 1 if tile_streamer.tile_chunks.overhang > GRID_PIXEL_SIZE / 2 else 0
+        self.baked = {}
+        self.bakes = 0
+
+    def _sources(self, chunk):
+        """ The layers of the loaded chunks with baked tiles that reach into a chunk """
+        row, column = chunk
+        sources = []
+        for neighbour_row in range(row - self.reach, row + self.reach + 1):
+            for neighbour_column in range(column - self.reach, column + self.reach + 1):
+                layers = self.tile_streamer.resident.get((neighbour_row, neighbour_column))
+                if layers and any(len(layers[layer][0]) for layer in self.layers if layer in layers):
+                    sources.append(layers)
+        return sources
+
+    def _key(self, sources, background_color):
+        """ Everything that would change how a chunk bakes """
+        return tuple(background_color), tuple(
+            (id(layers), tuple(len(layers[layer][0]) if layer in layers else 0 for layer in self.layers))
+            for layers in sources)
+
+    def _bake(self, chunk, key, sources, background_color):
+        """ Render the baked layers reaching into a chunk into a texture the size of the chunk """
+        ctx = arcade.get_window().ctx
+        if self.program is None:
+            self.program = ctx.program(vertex_shader=BAKED_CHUNK_VERTEX_SHADER,
+                                       fragment_shader=BAKED_CHUNK_FRAGMENT_SHADER)
+            self.program["chunk_texture"] = 0
+
+        # Whole pixels, so the texture is drawn a texel to a pixel
+        row, column = chunk
+        left = math.floor(column * CHUNK_PIXEL_SIZE)
+        bottom = math.floor(row * CHUNK_PIXEL_SIZE)
+        width = math.ceil((column + 1) * CHUNK_PIXEL_SIZE) - left
+        height = math.ceil((row + 1) * CHUNK_PIXEL_SIZE) - bottom
+
+        # Clamped and unfiltered, so the camera's fractional positions never
+        # blend a chunk's edge with its opposite edge or a neighbouring texel
+        texture = ctx.texture((width, height), components=4,
+                              wrap_x=ctx.CLAMP_TO_EDGE, wrap_y=ctx.CLAMP_TO_EDGE,
+                              filter=(ctx.NEAREST, ctx.NEAREST))
+        framebuffer = ctx.framebuffer(color_attachments=[texture])
+        projection = ctx.projection_2d_matrix
+        with framebuffer.activate():
+            framebuffer.clear(background_color)
+            ctx.projection_2d = (left, left + width, bottom, bottom + height)
+            # A layer at a time, so overlapping tiles stack as they would unbaked
+            for layer in self.layers:
+                for layers in sources:
+                    if layer in layers:
+                        layers[layer][0].draw()
+        ctx.projection_2d_matrix = projection
+
+        layers = self.tile_streamer.resident.get(chunk, {})
+        tile_count = sum(len(layers[layer][0]) for layer in self.layers if layer in layers)
+        self.bakes += 1
+        return BakedChunk(key, sources, texture,
+                          arcade.gl.geometry.screen_rectangle(left, bottom, width, height), tile_count)
+
+    def draw(self, left, right, bottom, top):
+        """
+        Draw the chunks that overlap a view of the level, baking any that need it.
+
+        Returns how many draw calls that took, one per chunk, and how many
+        tiles they stood in for.
+        """
+        background_color = arcade.get_window().background_color
+        row_0, row_1, column_0, column_1 = self.tile_streamer.tile_chunks.chunk_range(left, right, bottom, top)
+
+        # Drop the textures of chunks that have gone well out of view
+        self.baked = {chunk: baked for chunk, baked in self.baked.items()
+                      if row_0 - 1 <= chunk[0] <= row_1 + 1 and column_0 - 1 <= chunk[1] <= column_1 + 1}
+
+        draw_calls = 0
+        tiles = 0
+        for row in range(row_0, row_1 + 1):
+            for column in range(column_0, column_1 + 1):
+                chunk = row, column
+                sources = self._sources(chunk)
+                if not sources:
+                    self.baked.pop(chunk, None)
+                    continue
+                key = self._key(sources, background_color)
+                baked = self.baked.get(chunk)
+                if baked is None or baked.key != key:
+                    baked = self.baked[chunk] = self._bake(chunk, key, sources, background_color)
+                baked.texture.use(0)
+                baked.geometry.render(self.program)
+                draw_calls += 1
+                tiles += baked.tile_count
+        return draw_calls, tiles
+
+# Instanced quads
+
+# The corners of a quad a pixel across, centred on the origin, as a triangle strip
+UNIT_QUAD = np.array([-0.5, -0.5, 0.5, -0.5, -0.5, 0.5, 0.5, 0.5], dtype="f4")
+
+class InstancedQuads:
+    """
+    Draws a quad per row of a NumPy array, in one instanced draw call.
+
+    Each key, such as a texture, gets an instance buffer of its own that is
+    kept from frame to frame and only grows, so drawing is one buffer write
+    and one draw call.
+    """
+    def __init__(self, formats, attributes, normalized=()):
+        self.formats = formats
+        self.attributes = attributes
+        self.normalized = set(normalized)
+        self.quad = None
+
+        # key: (buffer, geometry, capacity)
+        self.instances = {}
+
+    def render(self, ctx, key, program, data):
+        """ Draw a quad for each row of data, laid out as formats says """
+        count = len(data)
+        if not count:
+            return
+        if self.quad is None:
+            self.quad = ctx.buffer(data=UNIT_QUAD.tobytes())
+        buffer, geometry, capacity = self.instances.get(key, (None, None, 0))
+        if capacity < count:
+            capacity = max(count, capacity * 2, 16)
+            buffer = ctx.buffer(reserve=capacity * (data.nbytes // count))
+            geometry = ctx.geometry([
+                arcade.gl.BufferDescription(self.quad, "2f", ["in_vert"]),
+                arcade.gl.BufferDescription(buffer, self.formats, self.attributes,
+                                            normalized=self.normalized, instanced=True),
+            ], mode=ctx.TRIANGLE_STRIP)
+            self.instances[key] = buffer, geometry, capacity
+        buffer.write(data.tobytes())
+        geometry.render(program, instances=count)
+
+# GPU animation
+
+# Layers of AnimatedSprites, drawn with AnimatedSpriteRenderer when
+# USE_GPU_ANIMATION is on
+GPU_ANIMATED_LAYERS = (LAYER_NAME_ALLIES, LAYER_NAME_ENEMIES, LAYER_NAME_PLAYER)
+
+# Transparent pixels between frames in a sheet, so they don't bleed into each other
+ANIMATION_SHEET_PADDING = 2
+
+ANIMATED_SPRITE_VERTEX_SHADER = """
+#version 330
+
+// Set from ANIMATION_FRAME_COUNT when the program is made
+#define ANIMATION_FRAME_COUNT 1
+
+uniform Projection {
+    uniform mat4 matrix;
+} proj;
+
+// Where each frame of the sheet is, as (left, bottom, right, top) texture
+// coordinates, and its size in pixels
+uniform vec4 frame_uv[ANIMATION_FRAME_COUNT];
+uniform vec2 frame_size[ANIMATION_FRAME_COUNT];
+
+// A corner of the quad, from -0.5 to 0.5
+in vec2 in_vert;
+
+// Per sprite
+in vec2 in_pos;
+in vec2 in_frame;
+in float in_scale;
+
+out vec2 v_uv;
+
+void main() {
+    int frame = int(in_frame.x);
+    gl_Position = proj.matrix * vec4(in_pos + in_vert * frame_size[frame] * in_scale, 0.0, 1.0);
+
+    // Facing left mirrors the frame
+    vec2 corner = in_vert + 0.5;
+    if (in_frame.y > 0.5) {
+        corner.x = 1.0 - corner.x;
+    }
+    v_uv = mix(frame_uv[frame].xy, frame_uv[frame].zw, corner);
+}
+"""
+
+ANIMATED_SPRITE_FRAGMENT_SHADER = """
+#version 330
+
+uniform sampler2D sheet;
+
+in vec2 v_uv;
+out vec4 f_color;
+
+void main() {
+    vec4 color = texture(sheet, v_uv);
+    if (color.a == 0.0) {
+        discard;
+    }
+    f_color = color;
+}
+"""
+
+class AnimationSheet:
+    """ Every frame of an AnimationSet side by side in one texture, facing right """
+    def __init__(self, ctx, animation_set):
+        # Kept so its id can't be reused while the sheet is around
+        self.animation_set = animation_set
+
+        images = [pair[RIGHT_FACING].image.convert("RGBA") for pair in animation_set.frames]
+        padding = ANIMATION_SHEET_PADDING
+        width = sum(image.width + padding for image in images) + padding
+        height = max(image.height for image in images) + padding * 2
+        sheet = PIL.Image.new("RGBA", (width, height), (0, 0, 0, 0))
+
+        # Texture rows go bottom up, so the sheet is flipped when it is
+        # uploaded and y is measured down from the top here
+        self.frame_uv = []
+        self.frame_size = []
+        x = padding
+        for image in images:
+            sheet.paste(image, (x, padding))
+            self.frame_uv += [x / width, 1 - (padding + image.height) / height,
+                              (x + image.width) / width, 1 - padding / height]
+            self.frame_size += [image.width, image.height]
+            x += image.width + padding
+
+        self.texture = ctx.texture((width, height), components=4,
+                                   data=sheet.transpose(PIL.Image.FLIP_TOP_BOTTOM).tobytes())
+
+class AnimatedSpriteRenderer:
+    """
+    Draws AnimatedSprites with their frames picked on the GPU.
+
+    Each character's frames are packed once into an AnimationSheet. Every
+    frame, each character's sprites are written to one buffer as position,
+    frame, facing and scale, and drawn in one instanced draw call, so no
+    texture is ever changed as they animate. Sprites of different characters
+    in the same list are drawn a character at a time, rather than strictly
+    in list order.
+    """
+    def __init__(self):
+        self.program = None
+
+        # id(animation_set): AnimationSheet
+        self.sheets = {}
+
+        # Position, frame and facing, and scale of each sprite
+        self.quads = InstancedQuads("2f 2f 1f", ["in_pos", "in_frame", "in_scale"])
+
+    def draw(self, sprite_list):
+        """
+        Draw a list of animated sprites.
+
+        Returns how many draw calls that took, one per character, and how
+        many sprites they drew.
+        """
+        if not sprite_list.visible or not len(sprite_list):
+            return 0, 0
+        ctx = arcade.get_window().ctx
+        if self.program is None:
+            self.program = ctx.program(vertex_shader=ANIMATED_SPRITE_VERTEX_SHADER,
+                                       fragment_shader=ANIMATED_SPRITE_FRAGMENT_SHADER,
+                                       defines={"ANIMATION_FRAME_COUNT": str(ANIMATION_FRAME_COUNT)})
+            self.program["sheet"] = 0
+
+        characters = {}
+        for sprite in sprite_list:
+            characters.setdefault(id(sprite.animation_set), []).append(sprite)
+
+        for key, sprites in characters.items():
+            sheet = self.sheets.get(key)
+            if sheet is None:
+                sheet = self.sheets[key] = AnimationSheet(ctx, sprites[0].animation_set)
+            self.program["frame_uv"] = sheet.frame_uv
+            self.program["frame_size"] = sheet.frame_size
+            sheet.texture.use(0)
+            self.quads.render(ctx, key, self.program,
+                              np.array([(sprite.center_x, sprite.center_y,
+                                         sprite.animation_frame, sprite.animation_facing, sprite.scale)
+                                        for sprite in sprites], dtype="f4"))
+        return len(characters), len(sprite_list)
+
+# Instanced projectiles
+
+# Layers of projectile sprites drawn with ProjectileRenderer when
+# USE_INSTANCED_PROJECTILES is on. The enemy bullets are drawn straight
+# from the arrays of the EnemyBulletEngine.
+INSTANCED_PROJECTILE_LAYERS = (LAYER_NAME_PLAYER_BULLETS, LAYER_NAME_SHIELD, LAYER_NAME_PLAYER_GRENADES)
+
+# Set to False to draw projectiles through their sprite lists
+USE_INSTANCED_PROJECTILES = True
+
+# How each projectile is drawn: where, its size in pixels, its angle in
+# degrees and its colour
+PROJECTILE_INSTANCE_DTYPE = np.dtype([
+    ("position", "f4", 2),
+    ("size", "f4", 2),
+    ("angle", "f4"),
+    ("color", "u1", 4),
+])
+
+PROJECTILE_VERTEX_SHADER = """
+#version 330
+
+uniform Projection {
+    uniform mat4 matrix;
+} proj;
+
+// A corner of the quad, from -0.5 to 0.5
+in vec2 in_vert;
+
+// Per projectile
+in vec2 in_pos;
+in vec2 in_size;
+in float in_angle;
+in vec4 in_color;
+
+out vec2 v_uv;
+out vec4 v_color;
+
+void main() {
+    float angle = radians(in_angle);
+    mat2 rotate = mat2(
+        cos(angle), sin(angle),
+        -sin(angle), cos(angle)
+    );
+    gl_Position = proj.matrix * vec4(in_pos + rotate * (in_vert * in_size), 0.0, 1.0);
+    v_uv = in_vert + 0.5;
+    v_color = in_color;
+}
+"""
+
+PROJECTILE_FRAGMENT_SHADER = """
+#version 330
+
+uniform sampler2D projectile_texture;
+
+in vec2 v_uv;
+in vec4 v_color;
+out vec4 f_color;
+
+void main() {
+    vec4 color = texture(projectile_texture, v_uv) * v_color;
+    if (color.a == 0.0) {
+        discard;
+    }
+    f_color = color;
+}
+"""
+
+class ProjectileRenderer:
+    """
+    Draws projectiles in one instanced draw call per texture.
+
+    Projectile sprites are written a row each into a buffer per texture.
+    Enemy bullets need no sprites at all: their rows are filled straight
+    from the EnemyBulletEngine's arrays, a weapon at a time.
+    """
+    def __init__(self):
+        self.program = None
+        self.quads = InstancedQuads("2f 2f 1f 4f1", ["in_pos", "in_size", "in_angle", "in_color"],
+                                    normalized=["in_color"])
+
+        # id(texture): (texture, the texture's image on the GPU)
+        self.textures = {}
+
+    def _draw(self, ctx, texture, data):
+        """ Draw rows of PROJECTILE_INSTANCE_DTYPE with an arcade texture """
+        if self.program is None:
+            self.program = ctx.program(vertex_shader=PROJECTILE_VERTEX_SHADER,
+                                       fragment_shader=PROJECTILE_FRAGMENT_SHADER)
+            self.program["projectile_texture"] = 0
+        entry = self.textures.get(id(texture))
+        if entry is None:
+            # Texture rows go bottom up. Clamped, so filtering at the quad's
+            # edges never pulls in the opposite edge of the image
+            image = texture.image.convert("RGBA").transpose(PIL.Image.FLIP_TOP_BOTTOM)
+            entry = self.textures[id(texture)] = texture, ctx.texture(
+                image.size, components=4, data=image.tobytes(),
+                wrap_x=ctx.CLAMP_TO_EDGE, wrap_y=ctx.CLAMP_TO_EDGE)
+        entry[1].use(0)
+        self.quads.render(ctx, id(texture), self.program, data)
+
+    def draw_sprites(self, sprite_list):
+        """
+        Draw a list of projectile sprites.
+
+        Returns how many draw calls that took, one per texture, and how many
+        projectiles they drew.
+        """
+        if not sprite_list.visible or not len(sprite_list):
+            return 0, 0
+        ctx = arcade.get_window().ctx
+        textures = {}
+        for sprite in sprite_list:
+            textures.setdefault(id(sprite.texture), []).append(sprite)
+        for sprites in textures.values():
+            data = np.array([((sprite.center_x, sprite.center_y), (sprite.width, sprite.height),
+                              sprite.angle, (*sprite.color[:3], sprite.alpha))
+                             for sprite in sprites], dtype=PROJECTILE_INSTANCE_DTYPE)
+            self._draw(ctx, sprites[0].texture, data)
+        return len(textures), len(sprite_list)
+
+    def draw_bullets(self, engine, weapon_textures, alpha=1.0):
+        """
+        Draw the enemy bullets alpha of the way through their last move.
+
+        Returns how many draw calls that took, one per weapon, and how many
+        bullets they drew.
+        """
+        n = engine.count
+        if not n or not engine.sprite_list.visible:
+            return 0, 0
+        ctx = arcade.get_window().ctx
+        x, y = engine.draw_positions(alpha)
+        weapons = engine.weapon[:n]
+        draw_calls = 0
+        for weapon_id in np.unique(weapons):
+            rows = np.flatnonzero(weapons == weapon_id)
+            if weapon_id < 0:
+                # Bullets fired without a weapon, drawn with their own textures
+                groups = {}
+                for i in rows:
+                    groups.setdefault(id(engine.sprites[i].texture), []).append(i)
+                groups = [(engine.sprites[rows[0]].texture, np.array(rows)) for rows in groups.values()]
+            else:
+                groups = [(weapon_textures[weapon_id], rows)]
+            for texture, rows in groups:
+                scale = engine.sprites[rows[0]].scale
+                data = np.zeros(len(rows), dtype=PROJECTILE_INSTANCE_DTYPE)
+                data["position"][:, 0] = x[rows]
+                data["position"][:, 1] = y[rows]
+                data["size"] = texture.width * scale, texture.height * scale
+                data["angle"] = engine.angle[rows]
+                data["color"] = 255
+                self._draw(ctx, texture, data)
+                draw_calls += 1
+        return draw_calls, n
+
+# Level cache
+
+# Layer Specific Options for the Tilemap
+LEVEL_LAYER_OPTIONS = {
+    LAYER_NAME_PLATFORMS: {
+        "use_spatial_hash": True,
+    },
+    LAYER_NAME_ENEMIES: {
+        "use_spatial_hash": False,
+    },
+    LAYER_NAME_ALLIES: {
+        "use_spatial_hash": False,
+    },
+    LAYER_NAME_MOVING_PLATFORMS: {
+        "use_spatial_hash": False,
+    },
+    LAYER_NAME_SHIELD: {
+        "use_spatial_hash": True,
+    },
+    LAYER_NAME_LADDERS: {
+        "use_spatial_hash": True,
+    },
+    LAYER_NAME_COINS: {
+        "use_spatial_hash": True,
+    },
+    LAYER_NAME_DONT_TOUCH: {
+        "use_spatial_hash": True,
+    },
+}
+
+# Compiled levels
+
+# Each Tiled map can be compiled offline (see compile_levels.py) into a binary
+# file next to it. The file is a header, then a zlib-compressed JSON chunk
+# describing the map, its tile types, layers and objects, and a binary chunk
+# holding every tile layer as sparse runs of tile type ids. The header carries
+# a hash of the JSON map it was compiled from, so stale files are ignored.
+LEVEL_FILE_MAGIC = b"JXLV"
+LEVEL_FILE_VERSION = 1
+LEVEL_FILE_EXTENSION = ".jxlevel"
+
+# magic, version, reserved, source hash, scaling, JSON chunk length, binary chunk length
+LEVEL_FILE_HEADER = struct.Struct("<4sHH32sdII")
+
+# A run of occupied cells along a row: row, first column, length
+LEVEL_RUN_DTYPE = np.dtype([("row", "<i4"), ("column", "<i4"), ("length", "<i4")])
+
+class CompiledTileMap:
+    """ A level read from its compiled file, standing in for an arcade.TileMap """
+    def __init__(self, width, height, tile_width, tile_height, scaling, properties):
+        self.width = width
+        self.height = height
+        self.tile_width = tile_width
+        self.tile_height = tile_height
+        self.scaling = scaling
+        self.properties = properties
+        self.sprite_lists = collections.OrderedDict()
+        self.object_lists = collections.OrderedDict()
+        self.tile_placements = {}
+
+    def get_cartesian(self, x, y):
+        """ Pixel coordinates to tile coordinates, as arcade.TileMap does """
+        x = math.floor(x / (self.tile_width * self.scaling))
+        y = math.floor(y / (self.tile_height * self.scaling))
+        return x, y
+
+# How to make the sprite of a tile, shared by every tile of the same kind in a layer
+TileType = collections.namedtuple("TileType", ["texture", "scale", "hit_box", "properties", "alpha", "color"])
+
+# Where one tile goes, for tiles whose sprites are made when they are needed
+TilePlacement = collections.namedtuple("TilePlacement", ["tile_type", "center_x", "center_y"])
+
+def make_tile_sprite(placement):
+    """ The sprite for a tile placement """
+    tile_type = placement.tile_type
+    sprite = arcade.Sprite(texture=tile_type.texture, scale=tile_type.scale)
+    sprite.hit_box = tile_type.hit_box
+    sprite.properties.update(tile_type.properties)
+    if tile_type.color:
+        sprite.color = tile_type.color
+    if tile_type.alpha:
+        sprite.alpha = tile_type.alpha
+    sprite.center_x = placement.center_x
+    sprite.center_y = placement.center_y
+    return sprite
+
+def take_tile_placements(tile_map, layers):
+    """
+    Take the tiles of some tile layers out of a tile map, leaving their sprite lists empty.
+
+    A compiled level can be read straight into placements, so only the
+    sprites of a level loaded from JSON have to be turned back into them.
+    """
+    placements = {}
+    for layer in layers:
+        if layer in getattr(tile_map, "tile_placements", {}):
+            placements[layer] = tile_map.tile_placements.pop(layer)
+            continue
+        sprite_list = tile_map.sprite_lists[layer]
+        tile_types = {}
+        layer_placements = []
+        for sprite in sprite_list:
+            hit_box = tuple(tuple(point) for point in sprite.get_hit_box())
+            key = (sprite.texture, sprite.scale, hit_box, sprite.alpha, sprite.color)
+            if key not in tile_types:
+                tile_types[key] = TileType(sprite.texture, sprite.scale, hit_box,
+                                           dict(sprite.properties), sprite.alpha, sprite.color)
+            layer_placements.append(TilePlacement(tile_types[key], sprite.center_x, sprite.center_y))
+        sprite_list.clear()
+        placements[layer] = layer_placements
+    return placements
+
+def level_map_paths(level):
+    """ The JSON map and compiled file for a level """
+    json_path = file_path + f"/src/resources/images/tiled_maps/level_{level}.json"
+    return json_path, os.path.splitext(json_path)[0] + LEVEL_FILE_EXTENSION
+
+def _tile_type(tile_map, gid, map_directory):
+    """ The texture of one tile gid, to which tile layers add their sprite size, hit box and properties """
+    tile = tile_map._get_tile_by_gid(gid)
+    if tile.animation:
+        raise ValueError(f"Animated tile {tile.id} can't be compiled")
+    image = tile.image or tile.tileset.image
+    if not os.path.exists(image):
+        image = os.path.join(map_directory, image)
+    if tile.tileset.image is not None:
+        margin = tile.tileset.margin or 0
+        spacing = tile.tileset.spacing or 0
+        image_x = margin + (tile.id % tile.tileset.columns) * (tile.tileset.tile_width + spacing)
+        image_y = margin + (tile.id // tile.tileset.columns) * (tile.tileset.tile_height + spacing)
+        image_width, image_height = tile.tileset.tile_width, tile.tileset.tile_height
+    else:
+        image_x = image_y = 0
+        image_width, image_height = tile.image_width, tile.image_height
+    return {
+        "image": os.path.relpath(os.path.abspath(image), map_directory),
+        "rect": [image_x, image_y, image_width, image_height],
+        "flipped": [tile.flipped_horizontally, tile.flipped_vertically, tile.flipped_diagonally],
+    }
+
+def compile_level(json_path, compiled_path, scaling=SPRITE_SCALING_TILES):
+    """ Compile a Tiled JSON map into a binary level file, returning its size in bytes """
+    with open(json_path, "rb") as source:
+        source_hash = hashlib.sha256(source.read()).digest()
+    tile_map = arcade.load_tilemap(json_path, scaling, LEVEL_LAYER_OPTIONS)
+    map_directory = os.path.dirname(os.path.abspath(json_path))
+
+    type_ids = {}
+    tile_types = []
+    binary = bytearray()
+
+    def type_id(gid, sprite=None):
+        if gid not in type_ids:
+            type_ids[gid] = len(tile_types)
+            tile_types.append(_tile_type(tile_map, gid, map_directory))
+        tile_type = tile_types[type_ids[gid]]
+        # Object tiles carry their own size, hit box and properties, so only
+        # tile layer sprites describe the type
+        if sprite is not None and "size" not in tile_type:
+            tile_type["size"] = [sprite.width, sprite.height]
+            tile_type["hit_box"] = [list(point) for point in sprite.get_hit_box()]
+            tile_type["properties"] = dict(sprite.properties)
+        return type_ids[gid]
+
+    def chunk(array):
+        offset = len(binary)
+        binary.extend(array.tobytes())
+        return [offset, len(array)]
+
+    def flatten(layers):
+        for layer in layers:
+            if isinstance(layer, pytiled_parser.LayerGroup):
+                yield from flatten(layer.layers)
+            else:
+                yield layer
+
+    layers = []
+    for layer in flatten(tile_map.tiled_map.layers):
+        entry = {
+            "name": layer.name,
+            "visible": layer.visible,
+            "alpha": int(layer.opacity * 255) if layer.opacity else None,
+            "tint": list(layer.tint_color) if layer.tint_color else None,
+            "properties": layer.properties or {},
+        }
+        if isinstance(layer, pytiled_parser.TileLayer):
+            sprites = iter(tile_map.sprite_lists[layer.name])
+            runs, cells = [], []
+            for row, gids in enumerate(layer.data):
+                column = 0
+                while column < len(gids):
+                    if not gids[column]:
+                        column += 1
+                        continue
+                    start = column
+                    while column < len(gids) and gids[column]:
+                        cells.append(type_id(gids[column], next(sprites)))
+                        column += 1
+                    runs.append((row, start, column - start))
+            entry["kind"] = "tiles"
+            entry["runs"] = chunk(np.array(runs, dtype=LEVEL_RUN_DTYPE))
+            entry["cells"] = chunk(np.array(cells, dtype="<u2"))
+        elif isinstance(layer, pytiled_parser.ObjectLayer):
+            sprites = iter(tile_map.sprite_lists.get(layer.name, ()))
+            tile_objects = []
+            for tiled_object in layer.tiled_objects:
+                if isinstance(tiled_object, pytiled_parser.tiled_object.Tile):
+                    sprite = next(sprites)
+                    tile_objects.append({
+                        "type": type_id(tiled_object.gid),
+                        "position": list(sprite.position),
+                        "size": [sprite.width, sprite.height],
+                        "angle": sprite.angle,
+                        "change": [sprite.change_x, sprite.change_y],
+                        "boundaries": [sprite.boundary_left, sprite.boundary_right,
+                                       sprite.boundary_bottom, sprite.boundary_top],
+                        "hit_box": [list(point) for point in sprite.get_hit_box()],
+                        "properties": dict(sprite.properties),
+                    })
+            entry["kind"] = "objects"
+            entry["tile_objects"] = tile_objects
+            entry["objects"] = [
+                {"shape": tiled_object.shape, "properties": tiled_object.properties or {},
+                 "name": tiled_object.name, "type": tiled_object.type}
+                for tiled_object in tile_map.object_lists.get(layer.name, ())
+            ]
+        else:
+            raise ValueError(f"Layer {layer.name} can't be compiled")
+        layers.append(entry)
+
+    meta = json.dumps({
+        "width": tile_map.width,
+        "height": tile_map.height,
+        "tile_width": tile_map.tile_width,
+        "tile_height": tile_map.tile_height,
+        "properties": tile_map.properties or {},
+        "tile_types": tile_types,
+        "layers": layers,
+    }, separators=(",", ":")).encode("utf-8")
+
+    header = LEVEL_FILE_HEADER.pack(LEVEL_FILE_MAGIC, LEVEL_FILE_VERSION, 0, source_hash,
+                                    scaling, len(meta), len(binary))
+    data = header + zlib.compress(meta + bytes(binary), 9)
+    with open(compiled_path, "wb") as compiled:
+        compiled.write(data)
+    return len(data)
+
+def compiled_level_is_fresh(json_path, compiled_path, scaling=SPRITE_SCALING_TILES):
+    """ Was the compiled file made from this JSON map, at this scaling, by this version? """
+    return _read_level_header(json_path, compiled_path, scaling) is not None
+
+def _read_level_header(json_path, compiled_path, scaling):
+    """ The header and compressed body of a compiled level, or None if it is missing or stale """
+    if not os.path.exists(compiled_path):
+        return None
+    with open(compiled_path, "rb") as compiled:
+        data = compiled.read()
+    if len(data) < LEVEL_FILE_HEADER.size:
+        return None
+    magic, version, _, source_hash, compiled_scaling, meta_length, binary_length = \
+        LEVEL_FILE_HEADER.unpack_from(data)
+    if magic != LEVEL_FILE_MAGIC or version != LEVEL_FILE_VERSION or compiled_scaling != scaling:
+        return None
+    with open(json_path, "rb") as source:
+        if hashlib.sha256(source.read()).digest() != source_hash:
+            return None
+    return meta_length, binary_length, data[LEVEL_FILE_HEADER.size:]
+
+def read_compiled_level(json_path, compiled_path, scaling=SPRITE_SCALING_TILES, lazy=False, progress=None,
+                        streamed_layers=()):
+    """
+    Build a level from its compiled file, or return None if the file is missing or stale.
+
+    With lazy set the sprite lists make no OpenGL resources until they are
+    first drawn, so the level can be read on a thread other than the main one.
+    progress, if given, is called with the fraction of layers built so far.
+    The tiles of streamed_layers are left as tile placements, with empty
+    sprite lists, so no sprites are made for them up front.
+    """
+    header = _read_level_header(json_path, compiled_path, scaling)
+    if header is None:
+        return None
+    meta_length, binary_length, body = header
+    body = zlib.decompress(body)
+    meta = json.loads(body[:meta_length].decode("utf-8"))
+    binary = body[meta_length:meta_length + binary_length]
+    map_directory = os.path.dirname(os.path.abspath(json_path))
+
+    tile_map = CompiledTileMap(meta["width"], meta["height"], meta["tile_width"],
+                               meta["tile_height"], scaling, meta["properties"])
+
+    # One texture per tile type, with no hit box work since the hit boxes are stored
+    textures = []
+    for tile_type in meta["tile_types"]:
+        image_x, image_y, image_width, image_height = tile_type["rect"]
+        flipped_horizontally, flipped_vertically, flipped_diagonally = tile_type["flipped"]
+        textures.append(arcade.load_texture(os.path.join(map_directory, tile_type["image"]),
+                                            image_x, image_y, image_width, image_height,
+                                            flipped_horizontally=flipped_horizontally,
+                                            flipped_vertically=flipped_vertically,
+                                            flipped_diagonally=flipped_diagonally,
+                                            hit_box_algorithm="None"))
+
+    def make_sprite(type_id, hit_box, properties):
+        sprite = arcade.Sprite(texture=textures[type_id], scale=scaling)
+        sprite.hit_box = hit_box
+        sprite.properties.update(properties)
+        return sprite
+
+    def read_chunk(view, dtype):
+        offset, count = view
+        return np.frombuffer(binary, dtype=dtype, count=count, offset=offset)
+
+    cell_width = tile_map.tile_width * scaling
+    cell_height = tile_map.tile_height * scaling
+    tile_types = meta["tile_types"]
+    for layer_number, layer in enumerate(meta["layers"]):
+        options = LEVEL_LAYER_OPTIONS.get(layer["name"], {})
+        sprite_list = arcade.SpriteList(use_spatial_hash=options.get("use_spatial_hash"), lazy=lazy)
+
+        if layer["kind"] == "tiles":
+            cells = read_chunk(layer["cells"], "<u2").tolist()
+            placements = [] if layer["name"] in streamed_layers else None
+            layer_types = {}
+            i = 0
+            for row, column, length in read_chunk(layer["runs"], LEVEL_RUN_DTYPE).tolist():
+                for column in range(column, column + length):
+                    tile_type = tile_types[cells[i]]
+                    width, height = tile_type["size"]
+                    center_x = column * cell_width + width / 2
+                    center_y = (tile_map.height - row - 1) * cell_height + height / 2
+                    if placements is not None:
+                        if cells[i] not in layer_types:
+                            layer_types[cells[i]] = TileType(
+                                textures[cells[i]], scaling, tile_type["hit_box"], tile_type["properties"],
+                                layer["alpha"], tuple(layer["tint"][:3]) if layer["tint"] else None)
+                        placements.append(TilePlacement(layer_types[cells[i]], center_x, center_y))
+                    else:
+                        sprite = make_sprite(cells[i], tile_type["hit_box"], tile_type["properties"])
+                        sprite.center_x = center_x
+                        sprite.center_y = center_y
+                        sprite_list.append(sprite)
+                    i += 1
+            tile_map.sprite_lists[layer["name"]] = sprite_list
+            if placements is not None:
+                tile_map.tile_placements[layer["name"]] = placements
+        else:
+            for tile_object in layer["tile_objects"]:
+                sprite = make_sprite(tile_object["type"], tile_object["hit_box"], tile_object["properties"])
+                sprite.width, sprite.height = tile_object["size"]
+                sprite.hit_box = tile_object["hit_box"]
+                sprite.position = tile_object["position"]
+                sprite.angle = tile_object["angle"]
+                sprite.change_x, sprite.change_y = tile_object["change"]
+                (sprite.boundary_left, sprite.boundary_right,
+                 sprite.boundary_bottom, sprite.boundary_top) = tile_object["boundaries"]
+                sprite_list.append(sprite)
+            if layer["tile_objects"]:
+                tile_map.sprite_lists[layer["name"]] = sprite_list
+            if layer["objects"]:
+                tile_map.object_lists[layer["name"]] = [
+                    TiledObject(tiled_object["shape"], tiled_object["properties"],
+                                tiled_object["name"], tiled_object["type"])
+                    for tiled_object in layer["objects"]
+                ]
+
+        for sprite in sprite_list:
+            if layer["tint"]:
+                sprite.color = layer["tint"]
+            if layer["alpha"]:
+                sprite.alpha = layer["alpha"]
+        sprite_list.visible = layer["visible"]
+        if layer["properties"]:
+            sprite_list.properties = layer["properties"]
+
+        if progress is not None:
+            progress((layer_number + 1) / len(meta["layers"]))
+
+    return tile_map
+
+def load_level_map(level, streamed_layers=()):
+    """ Load a level's map, from its compiled file if that is up to date, otherwise from JSON """
+    json_path, compiled_path = level_map_paths(level)
+    tile_map = read_compiled_level(json_path, compiled_path, streamed_layers=streamed_layers)
+    if tile_map is None:
+        tile_map = arcade.load_tilemap(json_path, SPRITE_SCALING_TILES, LEVEL_LAYER_OPTIONS)
+    return tile_map
+
+# Enemy and ally classes by the "type" property of their map objects
+ENEMY_TYPES = {
+    "wormGreen": GreenWorm,
+    "slimeBlue": BlueSlime,
+    "snakeLava": LavaSnake,
+    "slimeGreen": GreenSlime,
+    "slimePurple": PurpleSlime,
+    "slimeSilver": SilverSlime,
+    "slimeBlueBoss": BlueSlimeBoss,
+    "primaryslime": PrimarySlime,
+    "secondaryslime": SecondarySlime,
+    "thunderer": Thunderer,
+    "superthunderer": SuperThunderer,
+    "chomper": Chomper,
+    "diamondshooter": DiamondShooter,
+    "robot": RobotEnemy,
+    "rolypolybot": RolyPolyBot,
+    "masterverse": MasterVerse,
+    "flufflepop": FlufflePop,
+}
+ALLY_TYPES = {
+    "hooboo": Hooboo,
+    "flufflepop": FlufflePopAlly,
+    "pumbean": Pumbean,
+    "excalibur": Excalibur,
+    "masterverse": MasterVerseAlly,
+    "rolypolybot": RolyPolyBotAlly,
+    "secondaryslime": SecondarySlimeAlly,
+}
+
+# Tile layers whose sprites are only made while the camera is near them
+# (see TileStreamer). Each attempt at a level streams them in afresh.
+LEVEL_STREAMED_LAYERS = (
+    LAYER_NAME_BACKGROUND,
+    LAYER_NAME_PLATFORMS,
+    LAYER_NAME_DYNAMIC_TILES,
+    LAYER_NAME_DONT_TOUCH,
+    LAYER_NAME_LADDERS,
+    LAYER_NAME_COINS,
+    LAYER_NAME_HEARTS,
+    LAYER_NAME_POWER_UPS,
+    LAYER_NAME_FOREGROUND,
+)
+
+# Layers whose sprites move about or get destroyed during play, and are
+# always loaded, so are put back how they started whenever a level is restored
+LEVEL_RESTORED_LAYERS = (
+    LAYER_NAME_DYNAMIC_ITEMS,
+    LAYER_NAME_MOVING_PLATFORMS,
+)
+
+# Where an enemy or ally starts, and the map properties it starts with
+SpawnRecord = collections.namedtuple("SpawnRecord", ["entity_class", "center_x", "center_y", "properties"])
+
+# How a tile sprite started the level
+TileState = collections.namedtuple("TileState", ["sprite", "position", "angle", "change_x", "change_y"])
+
+def spawn_records(tile_map, object_list, types, kind, scaling, image_size):
+    """ Spawn records for the enemies or allies of an object layer """
+    records = []
+    for my_object in object_list:
+        cartesian = tile_map.get_cartesian(
+            my_object.shape[0], my_object.shape[1]
+        )
+        entity_type = my_object.properties["type"]
+        if entity_type not in types:
+            raise Exception(f"Unknown {kind} type {entity_type}.")
+        records.append(SpawnRecord(
+            types[entity_type],
+            math.floor(cartesian[0] * scaling * image_size),
+            math.floor((cartesian[1] + 1) * (scaling * image_size)),
+            dict(my_object.properties),
+        ))
+    return records
+
+def spawn_entity(record):
+    """ A fresh enemy or ally from its spawn record """
+    entity = record.entity_class()
+    entity.center_x = record.center_x
+    entity.center_y = record.center_y
+    if "boundary_left" in record.properties:
+        entity.boundary_left = record.properties["boundary_left"]
+    if "boundary_right" in record.properties:
+        entity.boundary_right = record.properties["boundary_right"]
+    if "change_x" in record.properties:
+        entity.change_x = record.properties["change_x"]
+    return entity
+
+class LevelTemplate:
+    """
+    Everything about a level that stays the same from one attempt to the next.
+
+    The parsed tile map, where every enemy and ally spawns, how each movable
+    tile started, the streamed tiles by chunk with the terrain cells and
+    merged geometry of each chunk loaded so far and, once the level has been
+    set up once, the speech text. Restoring the level puts the tiles back,
+    and enemies and allies spawn afresh from their records, without touching
+    the level file again.
+
+    Nothing here needs OpenGL apart from the speech, so a template can be
+    made on the prefetch thread from a tile map with lazy sprite lists.
+    """
+    def __init__(self, level, tile_map=None):
+        self.level = level
+        self.tile_map = tile_map if tile_map is not None else load_level_map(level, LEVEL_STREAMED_LAYERS)
+
+        self.enemy_spawns = spawn_records(self.tile_map,
+                                          self.tile_map.object_lists[LAYER_NAME_ENEMIES],
+                                          ENEMY_TYPES, "enemy",
+                                          SPRITE_SCALING_ENEMIES, ENEMY_SPRITE_IMAGE_SIZE)
+        self.ally_spawns = spawn_records(self.tile_map,
+                                         self.tile_map.object_lists[LAYER_NAME_ALLIES],
+                                         ALLY_TYPES, "ally",
+                                         SPRITE_SCALING_ALLIES, ALLY_SPRITE_IMAGE_SIZE)
+
+        self.tile_states = {
+            layer: [TileState(sprite, sprite.position, sprite.angle, sprite.change_x, sprite.change_y)
+                    for sprite in self.tile_map.sprite_lists[layer]]
+            for layer in LEVEL_RESTORED_LAYERS
+        }
+
+        # The streamed layers, as placements bucketed by chunk
+        self.tile_chunks = TileChunks(take_tile_placements(self.tile_map, LEVEL_STREAMED_LAYERS),
+                                      self.tile_map.width * GRID_PIXEL_SIZE,
+                                      self.tile_map.height * GRID_PIXEL_SIZE)
+
+        # Load the frames of every character in the level now, rather than
+        # when the first one spawns
+        for entity_class in {record.entity_class for record in self.enemy_spawns + self.ally_spawns}:
+            entity_class()
+
+        # Made the first time the level is set up, as arcade.Text needs OpenGL
+        self.speech = None
+
+    def restore_tiles(self):
+        """ Put every movable and destructible tile back how it started """
+        for layer, states in self.tile_states.items():
+            sprite_list = self.tile_map.sprite_lists[layer]
+            sprite_list.clear()
+            for sprite, position, angle, change_x, change_y in states:
+                # The physics engine they were in has gone
+                sprite.physics_engines.clear()
+                sprite.position = position
+                sprite.angle = angle
+                sprite.change_x = change_x
+                sprite.change_y = change_y
+                sprite_list.append(sprite)
+
+    @staticmethod
+    def spawn(records):
+        """ Fresh enemies or allies from spawn records """
+        return [spawn_entity(record) for record in records]
+
+# Reading the map is most of a prefetch, the rest is building the template
+PREFETCH_READ_SHARE = 0.8
+
+# How long the prefetch thread sleeps after each layer, so the game keeps its frame rate
+PREFETCH_YIELD_SECONDS = 0.005
+
+def upload_sprite_lists(sprite_lists):
+    """ Make the OpenGL resources of lazy sprite lists now, rather than on their first draw """
+    try:
+        arcade.get_window()
+    except RuntimeError:
+        # Nothing to upload to without a window
+        return
+    for sprite_list in sprite_lists:
+        sprite_list.initialize()
+
+class LevelLoad:
+    """
+    A level being loaded on the prefetch thread.
+
+    The thread does everything that doesn't need OpenGL. A compiled level
+    comes back as a whole template with lazy sprite lists, so finishing it
+    on the main thread is just uploading those. A level without an up to
+    date compiled file only gets its JSON parsed ahead of time, and the
+    sprites are made when it is finished.
+    """
+    def __init__(self, level):
+        self.level = level
+        self.progress = 0.0
+        self.template = None
+        self.tiled_map = None
+        self.error = None
+        self.done = threading.Event()
+
+    def run(self):
+        """ The prefetch thread """
+        try:
+            json_path, compiled_path = level_map_paths(self.level)
+            tile_map = read_compiled_level(json_path, compiled_path, lazy=True, progress=self._reading,
+                                           streamed_layers=LEVEL_STREAMED_LAYERS)
+            if tile_map is None:
+                self.tiled_map = pytiled_parser.parse_map(pathlib.Path(json_path))
+            else:
+                self.template = LevelTemplate(self.level, tile_map)
+            self.progress = 1.0
+        except Exception as error:
+            self.error = error
+        finally:
+            self.done.set()
+
+    def _reading(self, fraction):
+        self.progress = fraction * PREFETCH_READ_SHARE
+        # Give the game the interpreter back between layers
+        time.sleep(PREFETCH_YIELD_SECONDS)
+
+    def finish(self):
+        """ The level template, finished off on the main thread """
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+        if self.template is None:
+            tile_map = arcade.TileMap(tiled_map=self.tiled_map,
+                                      scaling=SPRITE_SCALING_TILES,
+                                      layer_options=LEVEL_LAYER_OPTIONS)
+            self.template = LevelTemplate(self.level, tile_map)
+        else:
+            upload_sprite_lists(self.template.tile_map.sprite_lists.values())
+        return self.template
+
+class LevelCache:
+    """
+    Level templates, loaded the first time a level is played and kept from then on.
+
+    The next level can be prefetched on a worker thread while the current
+    one is played, so getting it later costs no more than a restart.
+    """
+    def __init__(self):
+        self._templates = {}
+        self._loads = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.prefetched = 0
+
+    def get(self, level):
+        """ The template for a level, with its tiles put back how they started """
+        with self._lock:
+            template = self._templates.get(level)
+            load = self._loads.pop(level, None)
+        if template is None:
+            if load is not None:
+                self.prefetched += 1
+                template = load.finish()
+            else:
+                self.misses += 1
+                template = LevelTemplate(level)
+            with self._lock:
+                self._templates[level] = template
+        else:
+            self.hits += 1
+            template.restore_tiles()
+        return template
+
+    def prefetch(self, level):
+        """ Start loading a level on a worker thread, if it exists and isn't loaded or loading """
+        with self._lock:
+            if level in self._templates or level in self._loads:
+                return
+            if not os.path.exists(level_map_paths(level)[0]):
+                return
+            load = LevelLoad(level)
+            self._loads[level] = load
+        threading.Thread(target=load.run, name=f"level-prefetch-{level}", daemon=True).start()
+
+    def loading(self, level):
+        """ Is the level still being prefetched? """
+        with self._lock:
+            load = self._loads.get(level)
+        return load is not None and not load.done.is_set()
+
+    def progress(self, level):
+        """ How far along the level's prefetch is, from 0 to 1 """
+        with self._lock:
+            if level in self._templates:
+                return 1.0
+            load = self._loads.get(level)
+        return load.progress if load is not None else 0.0
+
+    def clear(self):
+        with self._lock:
+            self._templates.clear()
+            self._loads.clear()
+
+    def __contains__(self, level):
+        with self._lock:
+            return level in self._templates
+
+# Level templates are shared by every game, so a restart doesn't reload anything
+level_cache = LevelCache()
 
 class MenuView(arcade.View):
     def on_show_view(self):
@@ -647,37 +4045,59 @@ class GameOverView(arcade.View):
         game_view.setup()
         self.window.show_view(game_view)
 
-class GameView(arcade.View):
-    """ Main Window """
+class LoadingView(arcade.View):
+    """ View to show while the next level finishes prefetching """
 
-    def __init__(self):
-        """ Create the variables """
-
-        # Init the parent class
+    def __init__(self, game_view):
         super().__init__()
+        self.game_view = game_view
 
-        # Don't show the mouse cursor
-        self.window.set_mouse_visible(True)
+    def on_show_view(self):
+        arcade.set_background_color(arcade.color.BLACK)
+        arcade.set_viewport(0, self.window.width, 0, self.window.height)
 
-        # Add width and height
-        self.width = SCREEN_WIDTH
-        self.height = SCREEN_HEIGHT
+    def on_update(self, delta_time):
+        """ Go back to the game as soon as the level is ready """
+        if not level_cache.loading(self.game_view.simulation.level):
+            self.game_view.setup()
+            self.window.show_view(self.game_view)
 
-        # Initialise Frame Count
-        self.frame_count = 0
+    def on_draw(self):
+        """ Draw this view """
+        self.clear()
+        level = self.game_view.simulation.level
+        progress = level_cache.progress(level)
+        arcade.draw_text(f"Loading level {level}... {progress:.0%}",
+                         self.window.width / 2, self.window.height / 2,
+                         arcade.color.WHITE, font_size=30, anchor_x="center")
 
-        # Add the screen title
-        # If wanted later on can be added here
+# Game simulation
+
+class GameSimulation:
+    """
+    The game itself: the level, physics, enemies, collisions and scoring.
+
+    Nothing here draws, plays a sound or needs a window, so the game can be
+    run headless and as fast as the machine allows. Input comes in through
+    the pressed flags, jump and aim. Sounds to play and levels starting go
+    out as events, and level_complete and game_over say when whoever is
+    running the game needs to move it on.
+    """
 
-        # Sprite lists we need
-        self.wall_list: Optional[arcade.SpriteList] = None
-        self.grenade_list: Optional[arcade.SpriteList] = None
+    def __init__(self, viewport_width=SCREEN_WIDTH, viewport_height=SCREEN_HEIGHT, seed=None):
+        """ Create the variables. Seed the enemy weapons to have them fire the same way every run. """
+
+        # How much of the level the camera shows
+        self.viewport_width = viewport_width
+        self.viewport_height = viewport_height
+        self.player_centered = 0, 0
+
+        # Initialise Frame Count, which counts simulation ticks
+        self.frame_count = 0
+
+        # Sprite lists we need. The streamed tile layers are kept by the tile streamer.
         self.item_list: Optional[arcade.SpriteList] = None
-        self.block_list: Optional[arcade.SpriteList] = None
         self.moving_sprites_list: Optional[arcade.SpriteList] = None
-        self.ladder_list: Optional[arcade.SpriteList] = None
-        self.coin_list: Optional[arcade.SpriteList] = None
-        self.heart_list: Optional[arcade.SpriteList] = None
         self.enemies_list: Optional[Enemy] = None
         self.allies_list: Optional[Enemy] = None
         self.player_bullets: Optional[arcade.SpriteList] = None
@@ -698,13 +4118,8 @@ class GameView(arcade.View):
         # Physics engine
         self.physics_engine: Optional[arcade.PymunkPhysicsEngine] = None
 
-        # Add camera
-        self.camera = None
-
-        # A Camera that can be used to draw GUI elements
-        self.gui_camera = None
-
-        # Our TileMap Object
+        # The level's template, and our TileMap Object from it
+        self.template = None
         self.tile_map = None
 
         # Our Scene Object
@@ -726,19 +4141,50 @@ class GameView(arcade.View):
         # Super bullet mode
         self.grenade_booster = 0
 
+        # Projectiles are recycled, and the pool is kept between levels
+        self.projectile_pool = ProjectilePool()
+
+        # Enemy weapons, compiled once and kept between levels
+        self.enemy_weapons = EnemyWeaponEngine(seed=seed, pool=self.projectile_pool)
+
+        # Enemy bullets are moved and collided as arrays
+        self.enemy_bullets = EnemyBulletEngine()
+
+        # One broadphase answers every collision query in a frame
+        self.collisions = CollisionManager()
+
+        # Pickups, hazards and ladders are reported by the physics step
+        self.sensors = SensorEvents()
+
+        # Static tiles, merged into physics shapes
+        self.static_geometry = StaticGeometry()
+
+        # Which cells of the level hold solid tiles
+        self.terrain = TileOccupancyGrid()
+
+        # Tiles are made around the camera as it moves through the level
+        self.tile_streamer = TileStreamer()
+
+        # and so are the enemies and allies
+        self.enemy_spawner = EntitySpawner()
+        self.ally_spawner = EntitySpawner()
+
+        # Enemies far from the view are updated less often, or not at all
+        self.enemy_detail = EnemyLevelOfDetail()
+
+        # Projectiles that outlive their welcome are culled, and counted
+        self.projectile_culler = ProjectileCuller()
+
         # Keep track of the score
         self.score = 0
 
         # Do we need to reset the score?
         self.reset_score = True
 
-        # Set background color
-        arcade.set_background_color(arcade.color.BLEU_DE_FRANCE)
-
         # Where is the right edge of the map?
         self.end_of_map = 0
 
-        # Selfs
+        # Where grenades are thrown at
         self.x = 0
         self.y = 0
 
@@ -751,53 +4197,15 @@ class GameView(arcade.View):
         # Lives
         self.lives = 3
 
-        # Load sounds
-        self.game_over = arcade.load_sound(file_path+"/src/resources/sounds/gameover2.wav")
-        self.collect_coin_sound = arcade.load_sound(file_path+"/src/resources/sounds/coin1.wav")
-        self.jump_sound = arcade.load_sound(file_path+"/src/resources/sounds/jump3.wav")
-        self.hit_sound = arcade.load_sound(file_path+"/src/resources/sounds/hit2.wav")
-        self.shoot_sound = arcade.load_sound(file_path+"/src/resources/sounds/hurt3.wav")
+        # Has the player reached the end of the level, or run out of lives?
+        self.level_complete = False
+        self.game_over = False
 
-        # Add messages
-        self.message1 = None
-        self.message2 = None
-        self.message3 = None
-        self.message4 = None
-        self.message5 = None
+        # What happened since the events were last drained, oldest first
+        self.events = []
 
     def setup(self):
-        """ Set up everything with the game """
-
-        # Layer Specific Options for the Tilemap
-        layer_options = {
-            LAYER_NAME_PLATFORMS: {
-                "use_spatial_hash": True,
-            },
-            LAYER_NAME_ENEMIES: {
-                "use_spatial_hash": False,
-            },
-            LAYER_NAME_ALLIES: {
-                "use_spatial_hash": False,
-            },
-            LAYER_NAME_MOVING_PLATFORMS: {
-                "use_spatial_hash": False,
-            },
-            LAYER_NAME_SHIELD: {
-                "use_spatial_hash": True,
-            },
-            LAYER_NAME_LADDERS: {
-                "use_spatial_hash": True,
-            },
-            LAYER_NAME_COINS: {
-                "use_spatial_hash": True,
-            },
-            LAYER_NAME_DONT_TOUCH: {
-                "use_spatial_hash": True,
-            },
-        }
-
-        # Set up the GUI Camera
-        self.gui_camera = arcade.Camera(self.width, self.height)
+        """ Set up the level, or set it up again after the player loses a life """
 
         # Keep track of the score
         self.score = self.score
@@ -832,37 +4240,34 @@ class GameView(arcade.View):
             self.score = 0
         self.reset_score = False
 
-        # Set up the Camera
-        self.camera = arcade.Camera(self.width, self.height)
+        # Playing the level again, or the next one
+        self.level_complete = False
+
+        # Recycle any projectiles left over from the last attempt
+        self.enemy_bullets.clear()
+        self.projectile_pool.release_all()
 
         # Create the sprite lists
         self.player_list = arcade.SpriteList()
-        self.grenade_list = arcade.SpriteList()
 
-        # Map name
-        map_name = file_path + f"/src/resources/images/tiled_maps/level_{self.level}.json"
+        # Get the level from the cache, loading it the first time it is played
+        template = level_cache.get(self.level)
+        self.template = template
+        self.tile_map = template.tile_map
 
-        # Load in TileMap
-        self.tile_map = arcade.load_tilemap(map_name, SPRITE_SCALING_TILES, layer_options)
-        
         # Initiate New Scene with our TileMap, this will automatically add all layers
         # from the map as SpriteLists in the scene in the proper order.
         self.scene = arcade.Scene.from_tilemap(self.tile_map)
 
-        # Pull the sprite layers out of the tile map
-        self.background_list = self.tile_map.sprite_lists[LAYER_NAME_BACKGROUND]
-        self.wall_list = self.tile_map.sprite_lists[LAYER_NAME_PLATFORMS]
-        self.coin_list = self.tile_map.sprite_lists[LAYER_NAME_COINS]
-        self.heart_list = self.tile_map.sprite_lists[LAYER_NAME_HEARTS]
-        self.dont_touch_list = self.tile_map.sprite_lists[LAYER_NAME_DONT_TOUCH]
+        # Pull the sprite layers that aren't streamed out of the tile map
         self.item_list = self.tile_map.sprite_lists[LAYER_NAME_DYNAMIC_ITEMS]
-        self.block_list = self.tile_map.sprite_lists[LAYER_NAME_DYNAMIC_TILES]
-        self.ladder_list = self.tile_map.sprite_lists[LAYER_NAME_LADDERS]
         self.moving_sprites_list = self.tile_map.sprite_lists[LAYER_NAME_MOVING_PLATFORMS]
-        self.power_ups_list = self.tile_map.sprite_lists[LAYER_NAME_POWER_UPS]
 
-        # Create player sprite
-        self.player_sprite = PlayerSprite(self.ladder_list, hit_box_algorithm="Detailed")
+        # Create player sprite. Ladders are streamed, so the player finds them
+        # through the sensors rather than the ladder layer.
+        self.player_sprite = PlayerSprite(self.tile_map.sprite_lists[LAYER_NAME_LADDERS],
+                                          hit_box_algorithm="Detailed",
+                                          sensors=self.sensors)
 
         # Set player start location
         self.player_sprite.center_x = SPRITE_SIZE * start_grid_x + SPRITE_SIZE / 2
@@ -871,9 +4276,6 @@ class GameView(arcade.View):
         # Add to player sprite list
         self.player_list.append(self.player_sprite)
 
-        # Make sure that forground is added afterwards
-        self.foreground_list = self.tile_map.sprite_lists[LAYER_NAME_FOREGROUND]
-
         # Calculate the right edge of the my_map in pixels
         self.end_of_map = self.tile_map.width * GRID_PIXEL_SIZE
 
@@ -881,115 +4283,12 @@ class GameView(arcade.View):
         self.enemies_list = self.tile_map.object_lists[LAYER_NAME_ENEMIES]
         self.allies_list = self.tile_map.object_lists[LAYER_NAME_ALLIES]
 
-        # Speech
-        speech_list = []
-
-        # Map Allies
-        for my_object in self.allies_list:
-            cartesian = self.tile_map.get_cartesian(
-                my_object.shape[0], my_object.shape[1]
-            )
-            ally_type = my_object.properties["type"]
-            if ally_type == "hooboo":
-                ally = Hooboo()
-            elif ally_type == "flufflepop":
-                ally = FlufflePop()
-            elif ally_type == "pumbean":
-                ally = Pumbean()
-            elif ally_type == "excalibur":
-                ally = Excalibur()
-            elif ally_type == "masterverse":
-                ally = MasterVerse()
-            elif ally_type == "rolypolybot":
-                ally = RolyPolyBot()
-            elif ally_type == "secondaryslime":
-                ally = SecondarySlime()
-            else:
-                raise Exception(f"Unknown ally type {ally_type}.")
-            ally.center_x = math.floor(
-                cartesian[0] * SPRITE_SCALING_ALLIES * ALLY_SPRITE_IMAGE_SIZE
-            )
-            ally.center_y = math.floor(
-                (cartesian[1] + 1) * (SPRITE_SCALING_ALLIES * ALLY_SPRITE_IMAGE_SIZE)
-            )
-            if "boundary_left" in my_object.properties:
-                ally.boundary_left = my_object.properties["boundary_left"]
-            if "boundary_right" in my_object.properties:
-                ally.boundary_right = my_object.properties["boundary_right"]
-            if "change_x" in my_object.properties:
-                ally.change_x = my_object.properties["change_x"]
-            if "speech" in my_object.properties:
-                self.speech = arcade.Text(
-                text = my_object.properties["speech"],
-                start_x=ally.center_x,
-                start_y=ally.top,
-                color = arcade.color.BLACK,
-                font_size = DEFAULT_FONT_SIZE)
-                speech_list.append(self.speech)
-            self.scene.add_sprite(LAYER_NAME_ALLIES, ally)
-        
-        # Assign speech objects
-        self.message1 = speech_list[0]
-        self.message2 = speech_list[1]
-        self.message3 = speech_list[2]
-        self.message4 = speech_list[3]
-        self.message5 = speech_list[4]
-
-        # Map Enemy Objects
-        for my_object in self.enemies_list:
-            cartesian = self.tile_map.get_cartesian(
-                my_object.shape[0], my_object.shape[1]
-            )
-            enemy_type = my_object.properties["type"]
-            if enemy_type == "wormGreen":
-                enemy = GreenWorm()
-            elif enemy_type == "slimeBlue":
-                enemy = BlueSlime()
-            elif enemy_type == "snakeLava":
-                enemy = LavaSnake()  
-            elif enemy_type == "slimeGreen":
-                enemy = GreenSlime() 
-            elif enemy_type == "slimePurple":
-                enemy = PurpleSlime() 
-            elif enemy_type == "slimeSilver":
-                enemy = SilverSlime()   
-            elif enemy_type == "slimeBlueBoss":
-                enemy = BlueSlimeBoss()  
-            elif enemy_type == "primaryslime":
-                enemy = PrimarySlime() 
-            elif enemy_type == "secondaryslime":
-                enemy = SecondarySlime()     
-            elif enemy_type == "thunderer":
-                enemy = Thunderer()
-            elif enemy_type == "superthunderer":
-                enemy = SuperThunderer()
-            elif enemy_type == "chomper":
-                enemy = Chomper()
-            elif enemy_type == "diamondshooter":
-                enemy = DiamondShooter()
-            elif enemy_type == "robot":
-                enemy = RobotEnemy()
-            elif enemy_type == "rolypolybot":
-                enemy = RolyPolyBot()
-            elif enemy_type == "masterverse":
-                enemy = MasterVerse()
-            elif enemy_type == "flufflepop":
-                enemy = FlufflePop()
-            else:
-                raise Exception(f"Unknown enemy type {enemy_type}.")
-            enemy.center_x = math.floor(
-                cartesian[0] * SPRITE_SCALING_ENEMIES * ENEMY_SPRITE_IMAGE_SIZE
-            )
-            enemy.center_y = math.floor(
-                (cartesian[1] + 1) * (SPRITE_SCALING_ENEMIES * ENEMY_SPRITE_IMAGE_SIZE)
-            )
-            if "boundary_left" in my_object.properties:
-                enemy.boundary_left = my_object.properties["boundary_left"]
-            if "boundary_right" in my_object.properties:
-                enemy.boundary_right = my_object.properties["boundary_right"]
-            if "change_x" in my_object.properties:
-                enemy.change_x = my_object.properties["change_x"]
-            self.scene.add_sprite(LAYER_NAME_ENEMIES, enemy)
+        # Allies and enemies are spawned as the camera comes near them
+        self.scene.add_sprite_list(LAYER_NAME_ALLIES)
+        self.scene.add_sprite_list(LAYER_NAME_ENEMIES)
+        self.ally_spawner.setup(template.ally_spawns, self.scene[LAYER_NAME_ALLIES])
+        self.enemy_spawner.setup(template.enemy_spawns, self.scene[LAYER_NAME_ENEMIES])
+        self.enemy_detail.setup()
 
         # Add bullet spritelist to Scene
         self.scene.add_sprite_list(LAYER_NAME_PLAYER_BULLETS)
@@ -998,9 +4297,26 @@ class GameView(arcade.View):
         self.scene.add_sprite_list(LAYER_NAME_ENEMY_BULLETS)
         self.scene.add_sprite_list(LAYER_NAME_SHIELD)
 
+        # Solid tiles go in the occupancy grid so projectiles can test terrain by cell.
+        # It starts empty, and is filled as the tiles are streamed in.
+        self.terrain.setup(self.end_of_map, self.tile_map.height * GRID_PIXEL_SIZE, [])
+
+        # Enemy bullets are drawn from their layer but moved by the bullet engine
+        self.enemy_bullets.setup(self.scene[LAYER_NAME_ENEMY_BULLETS], self.terrain)
+        self.projectile_culler.setup(self.end_of_map, self.tile_map.height * GRID_PIXEL_SIZE)
+
+        # Index the layers the collision manager answers queries for
+        self.collisions.setup(self.scene, engines={LAYER_NAME_ENEMY_BULLETS: self.enemy_bullets})
+
         # Add grenade spritelist to Scene
         self.scene.add_sprite_list(LAYER_NAME_PLAYER_GRENADES)
 
+        # Have projectiles ready before the first shot is fired
+        for weapons in (PLAYER_BULLET_WEAPONS, PLAYER_SHIELD_WEAPONS):
+            for _, weapon, scale in weapons:
+                self.projectile_pool.prewarm_sprite(weapon, scale)
+        self.enemy_weapons.prewarm({record.entity_class for record in template.enemy_spawns})
+
         # --- Pymunk Physics Engine Setup ---
 
         # The default damping for every object controls the percent of velocity
@@ -1018,18 +4334,35 @@ class GameView(arcade.View):
         self.physics_engine = arcade.PymunkPhysicsEngine(damping=damping,
                                                          gravity=gravity)
 
+        # Create the walls.
+        # By setting the body type to PymunkPhysicsEngine.STATIC the walls can't
+        # move.
+        # Movable objects that respond to forces are PymunkPhysicsEngine.DYNAMIC
+        # PymunkPhysicsEngine.KINEMATIC objects will move, but are assumed to be
+        # repositioned by code and don't respond to physics forces.
+        # Dynamic is default.
+        # Walls and blocks are merged into as few static shapes as possible
+        # rather than getting a shape per tile.
+        # Their shapes are added as the tiles are streamed in.
+        self.static_geometry.setup(self.physics_engine, {
+            "wall": WALL_FRICTION,
+            "block": DYNAMIC_ITEM_FRICTION,
+        })
+
         def wall_hit_handler(grenade_sprite, _wall_sprite, _arbiter, _space, _data):
             """ Called for grenade/wall collision """
-            grenade_sprite.remove_from_sprite_lists()
+            retire_projectile(grenade_sprite)
 
-        self.physics_engine.add_collision_handler("grenade", "wall", post_handler=wall_hit_handler)
+        self.static_geometry.add_collision_handler("grenade", "wall", post_handler=wall_hit_handler)
 
         def block_hit_handler(grenade_sprite, block_sprite, _arbiter, _space, _data):
             """ Called for bullet/wall collision """
-            grenade_sprite.remove_from_sprite_lists()
+            retire_projectile(grenade_sprite)
             block_sprite.remove_from_sprite_lists()
+            self.terrain.remove(block_sprite)
+            self.static_geometry.remove_tile("block", block_sprite)
 
-        self.physics_engine.add_collision_handler("grenade", "block", post_handler=block_hit_handler)
+        self.static_geometry.add_collision_handler("grenade", "block", post_handler=block_hit_handler)
 
         # Add the player.
         # For the player, we set the damping to a lower value, which increases
@@ -1044,48 +4377,23 @@ class GameView(arcade.View):
         self.physics_engine.add_sprite(self.player_sprite,
                                        friction=PLAYER_FRICTION,
                                        mass=PLAYER_MASS,
-                                       moment=arcade.PymunkPhysicsEngine.MOMENT_INF,
-                                       collision_type="player",
-                                       max_horizontal_velocity=PLAYER_MAX_HORIZONTAL_SPEED,
-                                       max_vertical_velocity=PLAYER_MAX_VERTICAL_SPEED)
-
-        # Create the walls.
-        # By setting the body type to PymunkPhysicsEngine.STATIC the walls can't
-        # move.
-        # Movable objects that respond to forces are PymunkPhysicsEngine.DYNAMIC
-        # PymunkPhysicsEngine.KINEMATIC objects will move, but are assumed to be
-        # repositioned by code and don't respond to physics forces.
-        # Dynamic is default.
-        self.physics_engine.add_sprite_list(self.wall_list,
-                                            friction=WALL_FRICTION,
-                                            collision_type="wall",
-                                            body_type=arcade.PymunkPhysicsEngine.STATIC)
-
-        # Add Coins
-        self.physics_engine.add_sprite_list(self.coin_list,
-                                            friction=DYNAMIC_ITEM_FRICTION,
-                                            collision_type="coin")
-
-        # Add Hearts
-        self.physics_engine.add_sprite_list(self.heart_list,
-                                            friction=DYNAMIC_ITEM_FRICTION,
-                                            collision_type="heart")
-
-        # Add Power Ups
-        self.physics_engine.add_sprite_list(self.power_ups_list,
-                                            friction=DYNAMIC_ITEM_FRICTION,
-                                            collision_type="power_up")
+                                       moment=arcade.PymunkPhysicsEngine.MOMENT_INF,
+                                       collision_type="player",
+                                       max_horizontal_velocity=PLAYER_MAX_HORIZONTAL_SPEED,
+                                       max_vertical_velocity=PLAYER_MAX_VERTICAL_SPEED)
 
-        # Create the items
-        self.physics_engine.add_sprite_list(self.item_list,
-                                            friction=DYNAMIC_ITEM_FRICTION,
-                                            collision_type="item")
+        # Stream the tile layers in around the camera. Items are taken out of
+        # the physics engine while the terrain around them isn't loaded.
+        item_physics = {"friction": DYNAMIC_ITEM_FRICTION, "collision_type": "item"}
+        self.tile_streamer.setup(template.tile_chunks, self.scene, self.physics_engine,
+                                 self.terrain, self.static_geometry, self.sensors,
+                                 {LAYER_NAME_DYNAMIC_ITEMS: item_physics})
+
+        # Add coins, hearts, power ups, hazards and ladders as sensors
+        self.sensors.register(self.physics_engine, self.scene)
 
-        # Create the blocks
-        self.physics_engine.add_sprite_list(self.block_list,
-                                            friction=DYNAMIC_ITEM_FRICTION,
-                                            collision_type="block",
-                                            body_type=arcade.PymunkPhysicsEngine.STATIC)
+        # Create the items
+        self.physics_engine.add_sprite_list(self.item_list, **item_physics)
 
         # Add kinematic sprites
         self.physics_engine.add_sprite_list(self.moving_sprites_list,
@@ -1097,152 +4405,88 @@ class GameView(arcade.View):
         # self.physics_engine.add_sprite_list(self.allies_list,
         #                                     body_type=arcade.PymunkPhysicsEngine.KINEMATIC)
 
-        # Set background color
-        if self.level == 0:
-            arcade.set_background_color(arcade.color.BLEU_DE_FRANCE)
-        elif self.level == 1:
-            arcade.set_background_color(arcade.color.DARK_BLUE)
-        elif self.level == 2:
-            arcade.set_background_color(arcade.color.ASH_GREY)
-        elif self.level == 3:
-            arcade.set_background_color(arcade.color.PURPLE_MOUNTAIN_MAJESTY)
-        elif self.level == 4:
-            arcade.set_background_color(arcade.color.DARK_BROWN)
-        elif self.level == 5:
-            arcade.set_background_color(arcade.color.ORANGE_PEEL)
-        elif self.level == 6:
-            arcade.set_background_color(arcade.color.YELLOW_GREEN)
-        elif self.level == 7:
-            arcade.set_background_color(arcade.color.VANILLA)
-        elif self.level == 8:
-            arcade.set_background_color(arcade.color.PINK)
-        elif self.level == 9:
-            arcade.set_background_color(arcade.color.DARK_PINK)
-        elif self.level == 10:
-            arcade.set_background_color(arcade.color.GRAY_BLUE)
-        elif self.level == 11:
-            arcade.set_background_color(arcade.color.CADET_GREY)
-        elif self.level == 12:
-            arcade.set_background_color(arcade.color.DAVY_GREY)
-        elif self.level == 13:
-            arcade.set_background_color(arcade.color.BLACK_OLIVE)
-        elif self.level == 14:
-            arcade.set_background_color(arcade.color.CARROT_ORANGE)
-        elif self.level == 15:
-            arcade.set_background_color(arcade.color.ORIOLES_ORANGE)
-        elif self.level == 16:
-            arcade.set_background_color(arcade.color.DARK_BLUE)
-        elif self.level == 17:
-            arcade.set_background_color(arcade.color.RED_DEVIL)
-        else:
-            arcade.set_background_color(arcade.color.BLEU_DE_FRANCE)
-
-
-    def on_key_press(self, key, modifiers):
-        """Called whenever a key is pressed. """
-
-        if key == arcade.key.LEFT or key == arcade.key.A:
-            self.left_pressed = True
-        elif key == arcade.key.RIGHT or key == arcade.key.D:
-            self.right_pressed = True
-        elif key == arcade.key.UP or key == arcade.key.W:
-            self.up_pressed = True
-            arcade.play_sound(self.jump_sound)
-            # find out if player is standing on ground, and not on a ladder
-            if self.physics_engine.is_on_ground(self.player_sprite) \
-                    and not self.player_sprite.is_on_ladder:
-                # if on ground use control flow to filter jump speed based on player level
-                if self.level_up <= 0:
-                    # Go ahead and jump
-                    impulse = (0, PLAYER_JUMP_IMPULSE//2)
-                    self.physics_engine.apply_impulse(self.player_sprite, impulse)
-                elif self.level_up <= 1:
-                    # Go ahead and jump
-                    impulse = (0, PLAYER_JUMP_IMPULSE//1.75)
-                    self.physics_engine.apply_impulse(self.player_sprite, impulse)
-                elif self.level_up <= 2:
-                    # Go ahead and jump
-                    impulse = (0, PLAYER_JUMP_IMPULSE//1.5)
-                    self.physics_engine.apply_impulse(self.player_sprite, impulse)
-                elif self.level_up <= 3:
-                    # Go ahead and jump
-                    impulse = (0, PLAYER_JUMP_IMPULSE//1.25)
-                    self.physics_engine.apply_impulse(self.player_sprite, impulse)
-                elif self.level_up <= 4:
-                    # Go ahead and jump
-                    impulse = (0, PLAYER_JUMP_IMPULSE)
-                    self.physics_engine.apply_impulse(self.player_sprite, impulse)
-                elif self.level_up <= 5:
-                    # Go ahead and jump
-                    impulse = (0, PLAYER_JUMP_IMPULSE*1.25)
-                    self.physics_engine.apply_impulse(self.player_sprite, impulse)
-                elif self.level_up <= 6:
-                    # Go ahead and jump
-                    impulse = (0, PLAYER_JUMP_IMPULSE*1.5)
-                    self.physics_engine.apply_impulse(self.player_sprite, impulse)
-                elif self.level_up <= 7:
-                    # Go ahead and jump
-                    impulse = (0, PLAYER_JUMP_IMPULSE*1.75)
-                    self.physics_engine.apply_impulse(self.player_sprite, impulse)
-                elif self.level_up <= 8:
-                    # Go ahead and jump
-                    impulse = (0, PLAYER_JUMP_IMPULSE*2)
-                    self.physics_engine.apply_impulse(self.player_sprite, impulse)
-                elif self.level_up <= 9:
-                    # Go ahead and jump
-                    impulse = (0, PLAYER_JUMP_IMPULSE*2.25)
-                    self.physics_engine.apply_impulse(self.player_sprite, impulse)
-                elif self.level_up <= 10:
-                    # Go ahead and jump
-                    impulse = (0, PLAYER_JUMP_IMPULSE*2.5)
-                    self.physics_engine.apply_impulse(self.player_sprite, impulse)
-
-        elif key == arcade.key.DOWN or key == arcade.key.S:
-            self.down_pressed = True
-        
-        # Adding shoot button
-        if key == arcade.key.Q or key == arcade.key.N:
-            self.shoot_pressed = True
-
-        # Adding shield button
-        if key == arcade.key.E or key == arcade.key.M:
-            self.shield_pressed = True
-
-    def on_key_release(self, key, modifiers):
-        """Called when the user releases a key. """
-
-        if key == arcade.key.LEFT or key == arcade.key.A:
-            self.left_pressed = False
-        elif key == arcade.key.RIGHT or key == arcade.key.D:
-            self.right_pressed = False
-        elif key == arcade.key.UP or key == arcade.key.W:
-            self.up_pressed = False
-        elif key == arcade.key.DOWN or key == arcade.key.S:
-            self.down_pressed = False
+        # Load the tiles and spawn the characters around where the player starts,
+        # all of them before the first frame
+        self.center_camera_to_player()
+        self.tile_streamer.update(*self.camera_centre(), changes=None)
+        self.spawn_entities()
 
-        # Adding shoot button
-        if key == arcade.key.Q or key == arcade.key.N:
-            self.shoot_pressed = False
+        # Start loading the next level while this one is played
+        level_cache.prefetch(self.level + 1)
 
-        # Adding shield button
-        if key == arcade.key.E or key == arcade.key.M:
-            self.shield_pressed = False
+        self.events.append("level_started")
 
+    def next_level(self):
+        """ Move on to the next level. It still needs setting up. """
+        self.level += 1
+        self.level_complete = False
 
-    def on_mouse_press(self, x, y, button, modifiers):
-        """ Called whenever the mouse button is clicked. """
+        # Make sure to keep the score from this level when setting up the next level
+        self.reset_score = False
 
+    def jump(self):
+        """ Jump, if the player is standing on the ground """
+        self.events.append("jump")
+        # find out if player is standing on ground, and not on a ladder
+        if self.physics_engine.is_on_ground(self.player_sprite) \
+                and not self.player_sprite.is_on_ladder:
+            # if on ground use control flow to filter jump speed based on player level
+            if self.level_up <= 0:
+                # Go ahead and jump
+                impulse = (0, PLAYER_JUMP_IMPULSE//2)
+                self.physics_engine.apply_impulse(self.player_sprite, impulse)
+            elif self.level_up <= 1:
+                # Go ahead and jump
+                impulse = (0, PLAYER_JUMP_IMPULSE//1.75)
+                self.physics_engine.apply_impulse(self.player_sprite, impulse)
+            elif self.level_up <= 2:
+                # Go ahead and jump
+                impulse = (0, PLAYER_JUMP_IMPULSE//1.5)
+                self.physics_engine.apply_impulse(self.player_sprite, impulse)
+            elif self.level_up <= 3:
+                # Go ahead and jump
+                impulse = (0, PLAYER_JUMP_IMPULSE//1.25)
+                self.physics_engine.apply_impulse(self.player_sprite, impulse)
+            elif self.level_up <= 4:
+                # Go ahead and jump
+                impulse = (0, PLAYER_JUMP_IMPULSE)
+                self.physics_engine.apply_impulse(self.player_sprite, impulse)
+            elif self.level_up <= 5:
+                # Go ahead and jump
+                impulse = (0, PLAYER_JUMP_IMPULSE*1.25)
+                self.physics_engine.apply_impulse(self.player_sprite, impulse)
+            elif self.level_up <= 6:
+                # Go ahead and jump
+                impulse = (0, PLAYER_JUMP_IMPULSE*1.5)
+                self.physics_engine.apply_impulse(self.player_sprite, impulse)
+            elif self.level_up <= 7:
+                # Go ahead and jump
+                impulse = (0, PLAYER_JUMP_IMPULSE*1.75)
+                self.physics_engine.apply_impulse(self.player_sprite, impulse)
+            elif self.level_up <= 8:
+                # Go ahead and jump
+                impulse = (0, PLAYER_JUMP_IMPULSE*2)
+                self.physics_engine.apply_impulse(self.player_sprite, impulse)
+            elif self.level_up <= 9:
+                # Go ahead and jump
+                impulse = (0, PLAYER_JUMP_IMPULSE*2.25)
+                self.physics_engine.apply_impulse(self.player_sprite, impulse)
+            elif self.level_up <= 10:
+                # Go ahead and jump
+                impulse = (0, PLAYER_JUMP_IMPULSE*2.5)
+                self.physics_engine.apply_impulse(self.player_sprite, impulse)
+
+    def aim(self, x, y):
+        """ Throw grenades at a point in the level """
         self.mouse_pressed = True
-        try:
-            self.x = self.player_centered[0] + x
-            self.y = self.player_centered[1] + y
-        except:
-            print("An mouse exception occurred")
+        self.x = x
+        self.y = y
 
     def center_camera_to_player(self):
-        screen_center_x = self.player_sprite.center_x - (self.camera.viewport_width / 2)
+        """ Move the camera to follow the player """
+        screen_center_x = self.player_sprite.center_x - (self.viewport_width / 2)
         screen_center_y = self.player_sprite.center_y - (
-            self.camera.viewport_height / 2
+            self.viewport_height / 2
         )
 
         # Don't let camera travel past 0
@@ -1251,13 +4495,30 @@ class GameView(arcade.View):
         if screen_center_y < 0:
             screen_center_y = 0
         self.player_centered = screen_center_x, screen_center_y
-        self.camera.move_to(self.player_centered)
 
-    def on_update(self, delta_time):
-        """ Movement and game logic """
+    def camera_view(self):
+        """ The left, right, bottom and top of the part of the level the camera shows """
+        left, bottom = self.player_centered
+        return left, left + self.viewport_width, bottom, bottom + self.viewport_height
+
+    def camera_centre(self):
+        """ Where in the level the middle of the camera is """
+        return (self.player_centered[0] + self.viewport_width / 2,
+                self.player_centered[1] + self.viewport_height / 2)
+
+    def spawn_entities(self):
+        """ Spawn the enemies and allies the camera has come near, and put to sleep the ones it has left """
+        centre_x, _ = self.camera_centre()
+        self.enemy_spawner.update(centre_x)
+        self.ally_spawner.update(centre_x)
 
-        # Position the camera
+    def tick(self, delta_time):
+        """ Movement and game logic for one tick """
+
+        # Position the camera, and stream in the tiles and characters around it
         self.center_camera_to_player()
+        self.tile_streamer.update(*self.camera_centre())
+        self.spawn_entities()
 
         # Add Frame Counter
         self.frame_count += 1
@@ -1336,7 +4597,7 @@ class GameView(arcade.View):
             self.physics_engine.set_friction(self.player_sprite, 1.0)
 
         # Move items in the physics engine
-        self.physics_engine.step()
+        self.physics_engine.step(delta_time=delta_time)
 
         # For each moving sprite, see if we've reached a boundary and need to
         # reverse course.
@@ -1366,33 +4627,9 @@ class GameView(arcade.View):
 
         if self.can_shoot:
             if self.shoot_pressed:
-                arcade.play_sound(self.shoot_sound)
-                if self.level_up <= 3:
-                    player_bullet = arcade.Sprite(
-                        file_path + "/src/resources/images/weapons/swordBronze.png",
-                        SPRITE_SCALING_PROJECTILES/1.5,
-                    )
-                    
-                elif self.level_up <= 6:
-                    arcade.play_sound(self.shoot_sound)
-                    player_bullet = arcade.Sprite(
-                        file_path + "/src/resources/images/weapons/swordSilver.png", 
-                        SPRITE_SCALING_PROJECTILES/1.25,
-                    )
-                
-                elif self.level_up <= 8:
-                    arcade.play_sound(self.shoot_sound)
-                    player_bullet = arcade.Sprite(
-                        file_path + "/src/resources/images/weapons/swordGold.png", 
-                        SPRITE_SCALING_PROJECTILES,
-                    )
-                
-                elif self.level_up <= 10:
-                    arcade.play_sound(self.shoot_sound)
-                    player_bullet = arcade.Sprite(
-                        file_path + "/src/resources/images/weapons/laserGreenHorizontal.png", 
-                        SPRITE_SCALING_PROJECTILES,
-                    )
+                self.events.append("shoot")
+                weapon, scale = player_weapon(PLAYER_BULLET_WEAPONS, self.level_up)
+                player_bullet = self.projectile_pool.acquire_sprite(weapon, scale)
 
                 if self.player_sprite.character_face_direction == RIGHT_FACING:
                     player_bullet.change_x = round(BULLET_SPEED*(self.level_up+1),0)
@@ -1419,22 +4656,8 @@ class GameView(arcade.View):
         # Add shielding
         if self.can_shield:
             if self.shield_pressed:
-                if self.level_up <=3:
-                    shield = arcade.Sprite(file_path + "/src/resources/images/weapons/shieldBronze.png", 
-                        SPRITE_SCALING_PROJECTILES/1.25,
-                        )
-                elif self.level_up <=6:
-                    shield = arcade.Sprite(file_path + "/src/resources/images/weapons/shieldSilver.png", 
-                        SPRITE_SCALING_PROJECTILES,
-                        )
-                elif self.level_up <=9:
-                    shield = arcade.Sprite(file_path + "/src/resources/images/weapons/shieldGold.png", 
-                        SPRITE_SCALING_PROJECTILES*1.25,
-                        )
-                elif self.level_up <=10:
-                    shield = arcade.Sprite(file_path + "/src/resources/images/weapons/chomper_bullet.png", 
-                        SPRITE_SCALING_PROJECTILES*1.25,
-                        )
+                weapon, scale = player_weapon(PLAYER_SHIELD_WEAPONS, self.level_up)
+                shield = self.projectile_pool.acquire_sprite(weapon, scale)
 
                 if self.player_sprite.character_face_direction == RIGHT_FACING:
                     shield.change_x = 1
@@ -1461,8 +4684,7 @@ class GameView(arcade.View):
             if self.grenade_booster >=1:
                 self.grenade_booster -=1
                 for x in range(0,self.level_up):
-                    grenade = GrenadeSprite((5+self.level_up), self.level_up, arcade.color.PURPLE_HEART)
-                    self.grenade_list.append(grenade)
+                    grenade = self.projectile_pool.acquire_grenade(self.level_up)
 
                     # Position the grenade at the player's current location
                     start_x = self.player_sprite.center_x
@@ -1518,8 +4740,7 @@ class GameView(arcade.View):
 
             elif self.level_up>=1:
                 for x in range(0,self.level_up):
-                    grenade = GrenadeSprite((5+self.level_up), self.level_up, arcade.color.PURPLE_HEART)
-                    self.grenade_list.append(grenade)
+                    grenade = self.projectile_pool.acquire_grenade(self.level_up)
 
                     # Position the grenade at the player's current location
                     start_x = self.player_sprite.center_x
@@ -1573,43 +4794,28 @@ class GameView(arcade.View):
                     # Reset
                     self.mouse_pressed = False
 
-        # Check lives. If it is zero, flip to the game over view.
+        # Check lives. If it is zero, the game is over.
         if self.lives == 0:
-            view = GameOverView()
-            self.window.show_view(view)
+            self.game_over = True
 
         # Update Animations
         self.scene.update_animation(
             delta_time,
-            [
-                LAYER_NAME_ENEMIES,
-                LAYER_NAME_ALLIES],
+            [LAYER_NAME_ALLIES],
         )
 
-        # Update enemies and bullets
+        # Update allies and bullets
         self.scene.update(
-            [LAYER_NAME_ENEMIES, 
-            LAYER_NAME_ENEMY_BULLETS, 
-            LAYER_NAME_PLAYER_BULLETS, 
+            [LAYER_NAME_PLAYER_BULLETS, 
             LAYER_NAME_PLAYER_GRENADES,
             LAYER_NAME_ALLIES]
         )
 
-        # See if the enemy hit a boundary and needs to reverse direction.
-        for enemy in self.scene[LAYER_NAME_ENEMIES]:
-            if (
-                enemy.boundary_right
-                and enemy.right > enemy.boundary_right
-                and enemy.change_x > 0
-            ):
-                enemy.change_x *= -1
-
-            if (
-                enemy.boundary_left
-                and enemy.left < enemy.boundary_left
-                and enemy.change_x < 0
-            ):
-                enemy.change_x *= -1
+        # Animate and patrol the enemies, as often as their distance from the view calls for
+        firing_enemies = self.enemy_detail.update(self.scene[LAYER_NAME_ENEMIES],
+                                                  *self.camera_view(),
+                                                  self.frame_count,
+                                                  delta_time)
 
         # See if the ally hit a boundary and needs to reverse direction.
         for ally in self.scene[LAYER_NAME_ALLIES]:
@@ -1627,21 +4833,32 @@ class GameView(arcade.View):
             ):
                 ally.change_x *= -1
 
+        # Everything has moved, so build this frame's broadphase
+        self.collisions.rebuild()
+
+        # Cull projectiles that are too old, off the map or far from the camera
+        self.projectile_culler.cull(
+            self.scene,
+            *self.camera_centre(),
+            {LAYER_NAME_ENEMY_BULLETS: self.enemy_bullets},
+        )
+
         for projectile in self.scene[LAYER_NAME_PLAYER_BULLETS] or self.scene[LAYER_NAME_PLAYER_GRENADES]:
-            hit_list = arcade.check_for_collision_with_lists(
+            contacts = self.collisions.query(
                 projectile,
                 [
-                    self.scene[LAYER_NAME_ENEMIES],
-                    self.scene[LAYER_NAME_PLATFORMS],
-                    self.scene[LAYER_NAME_MOVING_PLATFORMS],
-                    self.scene[LAYER_NAME_DYNAMIC_ITEMS],
-                    self.scene[LAYER_NAME_SHIELD],
-                    self.scene[LAYER_NAME_DYNAMIC_TILES],
+                    LAYER_NAME_ENEMIES,
+                    LAYER_NAME_MOVING_PLATFORMS,
+                    LAYER_NAME_DYNAMIC_ITEMS,
+                    LAYER_NAME_SHIELD,
                 ],
             )
+            hit_list = [sprite for layer_hits in contacts.values() for sprite in layer_hits]
+            # Platforms and dynamic tiles come from the occupancy grid
+            hit_list.extend(self.terrain.hits(projectile))
 
             if hit_list:
-                projectile.remove_from_sprite_lists()
+                retire_projectile(projectile)
 
                 for collision in hit_list:
                     if (
@@ -1674,279 +4891,48 @@ class GameView(arcade.View):
 
                         if collision.health <= 0:
                             collision.remove_from_sprite_lists()
-                            if type(enemy) == type(GreenWorm()):
-                                self.score += int(getattr(GreenWorm(),"health"))
-                            elif type(enemy) == type(BlueSlime()):
-                                self.score += int(getattr(BlueSlime(),"health"))
-                            elif type(enemy) == type(GreenSlime()):
-                                self.score += int(getattr(GreenSlime(),"health"))
-                            elif type(enemy) == type(PurpleSlime()):
-                                self.score += int(getattr(PurpleSlime(),"health"))
-                            elif type(enemy) == type(SilverSlime()):
-                                self.score += int(getattr(SilverSlime(),"health"))
-                            elif type(enemy) == type(LavaSnake()):
-                                self.score += int(getattr(LavaSnake(),"health"))
-                            elif type(enemy) == type(BlueSlimeBoss()):
-                                self.score += int(getattr(BlueSlimeBoss(),"health"))
-                            elif type(enemy) == type(RobotEnemy()):
-                                self.score += int(getattr(RobotEnemy(),"health"))
-                            elif type(enemy) == type(Chomper()):
-                                self.score += int(getattr(Chomper(),"health"))
-                            elif type(enemy) == type(DiamondShooter()):
-                                self.score += int(getattr(DiamondShooter(),"health"))
-                            elif type(enemy) == type(PrimarySlime()):
-                                self.score += int(getattr(PrimarySlime(),"health"))
-                            elif type(enemy) == type(SecondarySlime()):
-                                 self.score += int(getattr(SecondarySlime(),"health"))
-                            elif type(enemy) == type(Thunderer()):
-                                self.score += int(getattr(Thunderer(),"health"))
-                            elif type(enemy) == type(SuperThunderer()):
-                                self.score += int(getattr(SuperThunderer(),"health"))
-                            elif type(enemy) == type(RolyPolyBot()):
-                                self.score += int(getattr(RolyPolyBot(),"health"))
-                            elif type(enemy) == type(MasterVerse()):
-                                self.score += int(getattr(MasterVerse(),"health"))
-                            elif type(enemy) == type(FlufflePop()):
-                                self.score += int(getattr(FlufflePop(),"health"))
+                            # Score the kill from the behaviour table of the enemy we hit
+                            self.score += int(type(collision).behaviour.kill_score)
 
                         # Hit sound
-                        arcade.play_sound(self.hit_sound)
+                        self.events.append("hit")
 
                 return
 
-            if (projectile.right < 0) or (
-                projectile.left
-                > (self.tile_map.width * self.tile_map.tile_width) * SPRITE_SCALING_TILES
-            ):
-                projectile.remove_from_sprite_lists()     
-
-        # Randfire function
-        def randfire(odds, x, y, angle, origin_x, origin_top, weapon = "meteorGrey_tiny2.png"):
-            odds = 2000
-            adj_odds = int(odds * (1 / 60) / delta_time)
-            if random.randrange(adj_odds) == 0:
-                bullet2 = arcade.Sprite(file_path + f"/src/resources/images/weapons/{weapon}")
-                bullet2.center_x = origin_x
-                bullet2.angle = angle
-                bullet2.top = origin_top
-                bullet2.change_x = x
-                bullet2.change_y = y
-                return self.scene.add_sprite(LAYER_NAME_ENEMY_BULLETS, bullet2) 
-
-        # Aimingfire function
-        def aimingfire(rate, bullet_speed, origin_x, origin_y, aim_x, aim_y, weapon = "laserRed02.png"):
-            start_x = origin_x
-            start_y = origin_y
-
-            # Get the destination location for the bullet
-            dest_x = aim_x
-            dest_y = aim_y
-
-            # Do math to calculate how to get the bullet to the destination.
-            # Calculation the angle in radians between the start points
-            # and end points. This is the angle the bullet will travel.
-            x_diff = dest_x - start_x
-            y_diff = dest_y - start_y
-            angle = math.atan2(y_diff, x_diff)
-
-            # Set the enemy to face the player. Not Required Presently
-            # enemy.angle = math.degrees(angle) - 0
-            
-            # Shoot every 60 frames change of shooting each frame
-            if self.frame_count % rate == 0:
-                bullet2 = arcade.Sprite(file_path + f"/src/resources/images/weapons/{weapon}")
-                bullet2.center_x = start_x
-                bullet2.center_y = start_y
-
-                # Angle the bullet sprite
-                bullet2.angle = math.degrees(angle)
-
-                # Taking into account the angle, calculate our change_x
-                # and change_y. Velocity is how fast the bullet travels.
-                bullet2.change_x = math.cos(angle) * bullet_speed
-                bullet2.change_y = math.sin(angle) * bullet_speed
-
-                self.scene.add_sprite(LAYER_NAME_ENEMY_BULLETS, bullet2)  
-
-        # Loop through each enemy that we have to work out shooting mechanics
-        for enemy in self.scene[LAYER_NAME_ENEMIES]:
-            if type(enemy) == type(GreenWorm()):
-                randfire(odds =2000, x=-1, y=0, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "meteorGrey_tiny1.png")
-                randfire(odds =2000, x=1, y=0, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "meteorGrey_tiny1.png")
-
-            elif type(enemy) == type(BlueSlime()):
-                randfire(odds =1000, x=-2, y=0, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "candyBlue.png")
-                randfire(odds =1000, x=2, y=0, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "candyBlue.png")
-
-            elif type(enemy) == type(LavaSnake()):
-                randfire(odds =500, x=-4, y=0, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "lava_ball_small.png")
-                randfire(odds =500, x=4, y=0, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "lava_ball_small.png")
-                randfire(odds =500, x=-4, y=-1, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "lava_ball_small.png")
-                randfire(odds =500, x=4, y=-1, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "lava_ball_small.png")
-                randfire(odds =500, x=-4, y=1, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "lava_ball_small.png")
-                randfire(odds =500, x=4, y=1, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "lava_ball_small.png")
-
-            elif type(enemy) == type(GreenSlime()):
-                randfire(odds =500, x=-3, y=0, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "candyGreen.png")
-                randfire(odds =500, x=-3, y=1, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "candyGreen.png")
-                randfire(odds =500, x=3, y=0, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "candyGreen.png")
-                randfire(odds =500, x=3, y=1, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "candyGreen.png")
-
-
-            elif type(enemy) == type(PurpleSlime()):
-                randfire(odds =250, x=-4, y=0, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "candyRed.png")
-                randfire(odds =250, x=4, y=0, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "candyRed.png")
-                randfire(odds =250, x=-4, y=1, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "candyRed.png")
-                randfire(odds =250, x=4, y=1, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "candyRed.png")
-            
-            elif type(enemy) == type(SilverSlime()):    
-                aimingfire(rate = 120, bullet_speed=8, origin_x=enemy.center_x, origin_y=enemy.center_y, aim_x=self.player_sprite.center_x, aim_y=self.player_sprite.center_y, weapon = "spinner.png")
-
-            elif type(enemy) == type(Thunderer()):
-                randfire(odds =500, x=1, y=-3, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "thunderbullet1.png")
-                randfire(odds =500, x=-1, y=-3, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "thunderbullet1.png")
-                randfire(odds =500, x=-2, y=-6, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "thunderbullet2.png")
-                randfire(odds =500, x=2, y=-6, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "thunderbullet2.png")
-                randfire(odds =500, x=0, y=-10, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "sparky.png")
-                aimingfire(rate = 360, bullet_speed=6, origin_x=enemy.center_x, origin_y=enemy.center_y, aim_x=self.player_sprite.center_x, aim_y=self.player_sprite.center_y, weapon = "thunderbullet.png")
-
-            elif type(enemy) == type(SuperThunderer()):
-                randfire(odds =100, x=1, y=-3, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "thunderbullet1.png")
-                randfire(odds =100, x=-1, y=-3, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "thunderbullet1.png")
-                randfire(odds =100, x=-2, y=-6, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "thunderbullet2.png")
-                randfire(odds =100, x=2, y=-6, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "thunderbullet2.png")
-                randfire(odds =100, x=0, y=-10, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "sparky.png")
-                aimingfire(rate = 30, bullet_speed=12, origin_x=enemy.center_x, origin_y=enemy.center_y, aim_x=self.player_sprite.center_x, aim_y=self.player_sprite.center_y, weapon = "thunderbullet.png")
-
-            elif type(enemy) == type(Chomper()):    
-                aimingfire(rate = 100, bullet_speed=8, origin_x=enemy.center_x, origin_y=enemy.center_y, aim_x=self.player_sprite.center_x, aim_y=self.player_sprite.center_y, weapon = "chomper_bullet.png")
-
-            elif type(enemy) == type(PrimarySlime()):   
-                aimingfire(rate = 360, bullet_speed=12, origin_x=enemy.center_x, origin_y=enemy.center_y, aim_x=self.player_sprite.center_x, aim_y=self.player_sprite.center_y, weapon = "mupBiggest.png")
-                aimingfire(rate = 120, bullet_speed=8, origin_x=enemy.center_x, origin_y=enemy.center_y, aim_x=self.player_sprite.center_x, aim_y=self.player_sprite.center_y, weapon = "mupBig.png")
-                aimingfire(rate = 60, bullet_speed=4, origin_x=enemy.center_x, origin_y=enemy.center_y, aim_x=self.player_sprite.center_x, aim_y=self.player_sprite.center_y, weapon = "mupSmall.png")
-
-            elif type(enemy) == type(SecondarySlime()):   
-                aimingfire(rate = 120, bullet_speed=12, origin_x=enemy.center_x, origin_y=enemy.center_y, aim_x=self.player_sprite.center_x, aim_y=self.player_sprite.center_y, weapon = "mupBiggest2.png")
-                aimingfire(rate = 60, bullet_speed=8, origin_x=enemy.center_x, origin_y=enemy.center_y, aim_x=self.player_sprite.center_x, aim_y=self.player_sprite.center_y, weapon = "mupBig2.png")
-                aimingfire(rate = 30, bullet_speed=4, origin_x=enemy.center_x, origin_y=enemy.center_y, aim_x=self.player_sprite.center_x, aim_y=self.player_sprite.center_y, weapon = "mupSmall2.png")
-
-            elif type(enemy) == type(DiamondShooter()):
-                randfire(odds =1000, x=-10, y=2, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "gemYellow.png")
-                randfire(odds =1000, x=-20, y=-1, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "gemGreen.png")
-                randfire(odds =1000, x=-30, y=1, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "gemBlue.png")
-                randfire(odds =1000, x=-20, y=-2, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "gemGreen.png")
-                randfire(odds =1000, x=-30, y=2, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "gemBlue.png")
-                randfire(odds =1000, x=-40, y=0, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "gemRed.png")
-                randfire(odds =1000, x=10, y=2, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "gemYellow.png")
-                randfire(odds =1000, x=20, y=-1, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "gemGreen.png")
-                randfire(odds =1000, x=30, y=1, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "gemBlue.png")
-                randfire(odds =1000, x=20, y=-2, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "gemGreen.png")
-                randfire(odds =1000, x=30, y=2, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "gemBlue.png")
-                randfire(odds =1000, x=40, y=0, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "gemRed.png")
-                randfire(odds =1000, x=0, y=10, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "gemYellow.png")
-
-            elif type(enemy) == type(BlueSlimeBoss()):    
-                aimingfire(rate = 60, bullet_speed=6, origin_x=enemy.center_x, origin_y=enemy.center_y, aim_x=self.player_sprite.center_x, aim_y=self.player_sprite.center_y, weapon = "spinner.png")
-                randfire(odds =1000, x=-10, y=0, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "spinner.png")
-                randfire(odds =1000, x=-10, y=1, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "spinner.png")
-                randfire(odds =1000, x=-10, y=2, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "spinner.png")
-                randfire(odds =1000, x=-10, y=3, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "spinner.png")
-                randfire(odds =1000, x=-10, y=4, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "spinner.png")
-                randfire(odds =1000, x=-10, y=-1, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "spinner.png")
-                randfire(odds =1000, x=-10, y=-2, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "spinner.png")
-                randfire(odds =1000, x=-10, y=-3, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "spinner.png")
-                randfire(odds =1000, x=-10, y=-4, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "spinner.png")
-                randfire(odds =1000, x=10, y=0, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "spinner.png")
-                randfire(odds =1000, x=10, y=1, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "spinner.png")
-                randfire(odds =1000, x=10, y=2, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "spinner.png")
-                randfire(odds =1000, x=10, y=3, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "spinner.png")
-                randfire(odds =1000, x=10, y=4, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "spinner.png")
-                randfire(odds =1000, x=10, y=-1, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "spinner.png")
-                randfire(odds =1000, x=10, y=-2, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "spinner.png")
-                randfire(odds =1000, x=10, y=-3, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "spinner.png")
-                randfire(odds =1000, x=10, y=-4, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "spinner.png")
-    
-            elif type(enemy) == type(RobotEnemy()):    
-                aimingfire(rate = 60, bullet_speed=5, origin_x=enemy.center_x, origin_y=enemy.center_y, aim_x=self.player_sprite.center_x, aim_y=self.player_sprite.center_y, weapon = "laserRed02.png")
-                aimingfire(rate = 20, bullet_speed=2, origin_x=enemy.center_x, origin_y=enemy.center_y, aim_x=self.player_sprite.center_x, aim_y=self.player_sprite.center_y, weapon = "laserBlue01.png")
-               
-            elif type(enemy) == type(RolyPolyBot()):    
-                aimingfire(rate = 40, bullet_speed=10, origin_x=enemy.center_x, origin_y=enemy.center_y, aim_x=self.player_sprite.center_x, aim_y=self.player_sprite.center_y, weapon = "laserGreenHorizontal.png")
-                aimingfire(rate = 30, bullet_speed=5, origin_x=enemy.center_x, origin_y=enemy.center_y, aim_x=self.player_sprite.center_x, aim_y=self.player_sprite.center_y, weapon = "laserRed02.png")
-                aimingfire(rate = 20, bullet_speed=2, origin_x=enemy.center_x, origin_y=enemy.center_y, aim_x=self.player_sprite.center_x, aim_y=self.player_sprite.center_y, weapon = "laserBlue01.png")
- 
-            elif type(enemy) == type(MasterVerse()): 
-                aimingfire(rate = 60, bullet_speed=20, origin_x=enemy.center_x, origin_y=enemy.center_y, aim_x=self.player_sprite.center_x, aim_y=self.player_sprite.center_y, weapon = "laserPurple.png") 
-                aimingfire(rate = 30, bullet_speed=10, origin_x=enemy.center_x, origin_y=enemy.center_y, aim_x=self.player_sprite.center_x, aim_y=self.player_sprite.center_y, weapon = "laserGreenHorizontal.png")
-                aimingfire(rate = 20, bullet_speed=5, origin_x=enemy.center_x, origin_y=enemy.center_y, aim_x=self.player_sprite.center_x, aim_y=self.player_sprite.center_y, weapon = "laserRed02.png")
-                aimingfire(rate = 10, bullet_speed=2, origin_x=enemy.center_x, origin_y=enemy.center_y, aim_x=self.player_sprite.center_x, aim_y=self.player_sprite.center_y, weapon = "laserBlue01.png")
-
-            elif type(enemy) == type(FlufflePop()): 
-                aimingfire(rate = 20, bullet_speed=20, origin_x=enemy.center_x, origin_y=enemy.center_y, aim_x=self.player_sprite.center_x, aim_y=self.player_sprite.center_y, weapon = "laserPurple.png") 
-                aimingfire(rate = 10, bullet_speed=10, origin_x=enemy.center_x, origin_y=enemy.center_y, aim_x=self.player_sprite.center_x, aim_y=self.player_sprite.center_y, weapon = "laserGreenHorizontal.png")
-                aimingfire(rate = 5, bullet_speed=5, origin_x=enemy.center_x, origin_y=enemy.center_y, aim_x=self.player_sprite.center_x, aim_y=self.player_sprite.center_y, weapon = "laserRed02.png")
-                randfire(odds =1000, x=-10, y=0, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "spinner.png")
-                randfire(odds =1000, x=-10, y=1, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "spinner.png")
-                randfire(odds =1000, x=-10, y=2, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "spinner.png")
-                randfire(odds =1000, x=-10, y=3, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "spinner.png")
-                randfire(odds =1000, x=-10, y=4, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "spinner.png")
-                randfire(odds =1000, x=-10, y=-1, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "spinner.png")
-                randfire(odds =1000, x=-10, y=-2, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "spinner.png")
-                randfire(odds =1000, x=-10, y=-3, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "spinner.png")
-                randfire(odds =1000, x=-10, y=-4, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "spinner.png")
-                randfire(odds =1000, x=10, y=0, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "spinner.png")
-                randfire(odds =1000, x=10, y=1, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "spinner.png")
-                randfire(odds =1000, x=10, y=2, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "spinner.png")
-                randfire(odds =1000, x=10, y=3, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "spinner.png")
-                randfire(odds =1000, x=10, y=4, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "spinner.png")
-                randfire(odds =1000, x=10, y=-1, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "spinner.png")
-                randfire(odds =1000, x=10, y=-2, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "spinner.png")
-                randfire(odds =1000, x=10, y=-3, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "spinner.png")
-                randfire(odds =1000, x=10, y=-4, angle=0, origin_x = enemy.center_x, origin_top = enemy.top, weapon = "spinner.png")
-  
-                 
-        # See if we hit any coins
-        coin_hit_list = arcade.check_for_collision_with_list(
-            self.player_sprite, self.coin_list
-        )
+        # Fire every enemy's weapons in one batched pass
+        for bullet in self.enemy_weapons.fire(firing_enemies,
+                                              self.player_sprite.center_x,
+                                              self.player_sprite.center_y,
+                                              self.frame_count,
+                                              delta_time):
+            self.enemy_bullets.add(bullet)
 
-        # See if we hit any hearts
-        heart_hit_list = arcade.check_for_collision_with_list(
-            self.player_sprite, self.heart_list
+        # Move the enemy bullets and cull the ones that hit terrain or an obstacle
+        self.enemy_bullets.update(
+            [
+                self.scene[LAYER_NAME_DYNAMIC_ITEMS],
+                self.scene[LAYER_NAME_MOVING_PLATFORMS],
+                self.scene[LAYER_NAME_SHIELD],
+                self.scene[LAYER_NAME_ALLIES],
+            ]
         )
 
-        # See if we hit any power ups
-        power_up_hit_list = arcade.check_for_collision_with_list(
-            self.player_sprite, self.power_ups_list
-        )
+        # Pickups the physics step saw us touch
+        coin_hit_list = self.sensors.drain(LAYER_NAME_COINS)
+        heart_hit_list = self.sensors.drain(LAYER_NAME_HEARTS)
+        power_up_hit_list = self.sensors.drain(LAYER_NAME_POWER_UPS)
 
-        # See if we hit any enemies
-        enemy_collision_list = arcade.check_for_collision_with_lists(
+        # Enemies and their bullets we are touching
+        player_contacts = self.collisions.query(
             self.player_sprite,
             [
-                self.scene[LAYER_NAME_ENEMIES],
-                self.scene[LAYER_NAME_ENEMY_BULLETS],
+                LAYER_NAME_ENEMIES,
+                LAYER_NAME_ENEMY_BULLETS,
             ],
         )
 
-        # Loop Through Enemy Bullets and check for collisions
-
-        for bullet2 in self.scene[LAYER_NAME_ENEMY_BULLETS]:
-            hit_list = arcade.check_for_collision_with_lists(
-                bullet2,
-                [
-                    self.scene[LAYER_NAME_DYNAMIC_ITEMS],
-                    self.scene[LAYER_NAME_PLATFORMS],
-                    self.scene[LAYER_NAME_MOVING_PLATFORMS],
-                    self.scene[LAYER_NAME_SHIELD],
-                    self.scene[LAYER_NAME_ALLIES],
-                    self.scene[LAYER_NAME_DYNAMIC_TILES],
-                ],
-            )
-
-            if hit_list:
-                bullet2.remove_from_sprite_lists()
+        # See if we hit any enemies or their bullets
+        enemy_collision_list = player_contacts[LAYER_NAME_ENEMIES] + player_contacts[LAYER_NAME_ENEMY_BULLETS]
 
         # Loop through each coin we hit (if any) and remove it
         
@@ -1960,7 +4946,7 @@ class GameView(arcade.View):
             # Remove the coin
             coin.remove_from_sprite_lists()
             # Play a sound
-            arcade.play_sound(self.collect_coin_sound)
+            self.events.append("collect")
 
         for heart in heart_hit_list:
             # Figure out how many lives this heart is worth
@@ -1972,7 +4958,7 @@ class GameView(arcade.View):
             # Remove the coin
             heart.remove_from_sprite_lists()
             # Play a sound
-            arcade.play_sound(self.collect_coin_sound)
+            self.events.append("collect")
 
         for power_up in power_up_hit_list:
             # Figure out the attributes of this power up
@@ -1993,19 +4979,19 @@ class GameView(arcade.View):
             # Remove the coin
             power_up.remove_from_sprite_lists()
             # Play a sound
-            arcade.play_sound(self.collect_coin_sound)
+            self.events.append("collect")
 
         # Look through the enemies to see if we hit any:
         for collision in enemy_collision_list:
             if self.can_die:
                 if self.scene[LAYER_NAME_ENEMIES] in collision.sprite_lists:
                 # If we collide with an enemy then we lose a life
-                    arcade.play_sound(self.game_over)
+                    self.events.append("lose_life")
                     self.lives -=1
                     self.can_die = False
                     return
                 elif self.scene[LAYER_NAME_ENEMY_BULLETS] in collision.sprite_lists:
-                    arcade.play_sound(self.game_over)
+                    self.events.append("lose_life")
                     self.lives -=1
                     self.can_die = False
                     return
@@ -2025,28 +5011,20 @@ class GameView(arcade.View):
 
         # Did the player fall off the map?
         if self.player_sprite.center_y < -100:
-            arcade.play_sound(self.game_over)
+            self.events.append("lose_life")
             self.lives -=1
             self.setup()
 
         # Did the player touch something they should not?
-        if arcade.check_for_collision_with_list(
-            self.player_sprite, self.dont_touch_list
-        ):
-            arcade.play_sound(self.game_over)
+        elif self.sensors.drain(LAYER_NAME_DONT_TOUCH):
+            self.events.append("lose_life")
             self.lives -=1
             self.setup()
 
         # See if the user got to the end of the level
         if self.player_sprite.center_x >= self.end_of_map:
-            # Advance to the next level
-            self.level += 1
-
-            # Make sure to keep the score from this level when setting up the next level
-            self.reset_score = False
-
-            # Load the next level
-            self.setup()
+            # Done, the next level is set up by whoever is running the game
+            self.level_complete = True
 
         # # Allies Text Talk - this bit is a bit dodgy atm
         # if type(ally) in self.scene[LAYER_NAME_ALLIES] == type(Hooboo()):
@@ -2067,89 +5045,297 @@ class GameView(arcade.View):
         #     font_size = DEFAULT_FONT_SIZE    
         #     )
         #     return self.pumbean_message
-            
+
+    def drain_events(self):
+        """ What has happened since the last drain, oldest first """
+        events = self.events
+        self.events = []
+        return events
+
+class GameView(arcade.View):
+    """ Main Window, drawing the game simulation and passing it the player's input """
+
+    def __init__(self):
+        """ Create the variables """
+
+        # Init the parent class
+        super().__init__()
+
+        # Don't show the mouse cursor
+        self.window.set_mouse_visible(True)
+
+        # Add width and height
+        self.width = SCREEN_WIDTH
+        self.height = SCREEN_HEIGHT
+
+        # The game itself
+        self.simulation = GameSimulation(self.width, self.height)
+
+        # The simulation runs in fixed ticks, and is drawn blended between them
+        self.timestep = FixedTimestep()
+        self.interpolator = RenderInterpolator()
+        self.render_alpha = 1.0
+
+        # Add the screen title
+        # If wanted later on can be added here
+
+        # Add camera
+        self.camera = None
+
+        # A Camera that can be used to draw GUI elements
+        self.gui_camera = None
+
+        # The HUD text, drawn with the GUI camera
+        self.hud = None
+
+        # Draws the level's layers in order
+        self.renderer = LayeredRenderer()
+
+        # Set background color
+        arcade.set_background_color(arcade.color.BLEU_DE_FRANCE)
+
+        # Load sounds, by the simulation event they are played for
+        self.sounds = {
+            "lose_life": arcade.load_sound(file_path+"/src/resources/sounds/gameover2.wav"),
+            "collect": arcade.load_sound(file_path+"/src/resources/sounds/coin1.wav"),
+            "jump": arcade.load_sound(file_path+"/src/resources/sounds/jump3.wav"),
+            "hit": arcade.load_sound(file_path+"/src/resources/sounds/hit2.wav"),
+            "shoot": arcade.load_sound(file_path+"/src/resources/sounds/hurt3.wav"),
+        }
+
+        # Add messages
+        self.message1 = None
+        self.message2 = None
+        self.message3 = None
+        self.message4 = None
+        self.message5 = None
+
+    def setup(self):
+        """ Set up everything with the game """
+
+        # Set up the GUI Camera
+        self.gui_camera = arcade.Camera(self.width, self.height)
+
+        # Set up the Camera
+        self.camera = arcade.Camera(self.width, self.height)
+
+        # Made afresh each setup so nothing shows from the last game
+        self.hud = Hud()
+
+        self.simulation.setup()
+        self.play_events()
+
+    def level_started(self):
+        """ Get ready to draw a level the simulation has just set up """
+
+        # Start the level without any saved up time or blending from the last one
+        self.timestep.reset()
+        self.interpolator.clear()
+
+        # The scene is new, so find its layers again
+        self.renderer.setup(self.simulation)
+
+        # Speech, made once per level from where the allies start
+        template = self.simulation.template
+        if template.speech is None:
+            allies = template.spawn(template.ally_spawns)
+            template.speech = [
+                arcade.Text(
+                text = record.properties["speech"],
+                start_x=ally.center_x,
+                start_y=ally.top,
+                color = arcade.color.BLACK,
+                font_size = DEFAULT_FONT_SIZE)
+                for record, ally in zip(template.ally_spawns, allies)
+                if "speech" in record.properties
+            ]
+        speech_list = template.speech
+
+        # Assign speech objects
+        self.message1 = speech_list[0]
+        self.message2 = speech_list[1]
+        self.message3 = speech_list[2]
+        self.message4 = speech_list[3]
+        self.message5 = speech_list[4]
+
+        # Set background color
+        if self.simulation.level == 0:
+            arcade.set_background_color(arcade.color.BLEU_DE_FRANCE)
+        elif self.simulation.level == 1:
+            arcade.set_background_color(arcade.color.DARK_BLUE)
+        elif self.simulation.level == 2:
+            arcade.set_background_color(arcade.color.ASH_GREY)
+        elif self.simulation.level == 3:
+            arcade.set_background_color(arcade.color.PURPLE_MOUNTAIN_MAJESTY)
+        elif self.simulation.level == 4:
+            arcade.set_background_color(arcade.color.DARK_BROWN)
+        elif self.simulation.level == 5:
+            arcade.set_background_color(arcade.color.ORANGE_PEEL)
+        elif self.simulation.level == 6:
+            arcade.set_background_color(arcade.color.YELLOW_GREEN)
+        elif self.simulation.level == 7:
+            arcade.set_background_color(arcade.color.VANILLA)
+        elif self.simulation.level == 8:
+            arcade.set_background_color(arcade.color.PINK)
+        elif self.simulation.level == 9:
+            arcade.set_background_color(arcade.color.DARK_PINK)
+        elif self.simulation.level == 10:
+            arcade.set_background_color(arcade.color.GRAY_BLUE)
+        elif self.simulation.level == 11:
+            arcade.set_background_color(arcade.color.CADET_GREY)
+        elif self.simulation.level == 12:
+            arcade.set_background_color(arcade.color.DAVY_GREY)
+        elif self.simulation.level == 13:
+            arcade.set_background_color(arcade.color.BLACK_OLIVE)
+        elif self.simulation.level == 14:
+            arcade.set_background_color(arcade.color.CARROT_ORANGE)
+        elif self.simulation.level == 15:
+            arcade.set_background_color(arcade.color.ORIOLES_ORANGE)
+        elif self.simulation.level == 16:
+            arcade.set_background_color(arcade.color.DARK_BLUE)
+        elif self.simulation.level == 17:
+            arcade.set_background_color(arcade.color.RED_DEVIL)
+        else:
+            arcade.set_background_color(arcade.color.BLEU_DE_FRANCE)
+
+    def play_events(self):
+        """ Play the sounds for what has happened in the simulation, and catch levels starting """
+        for event in self.simulation.drain_events():
+            if event == "level_started":
+                self.level_started()
+            else:
+                arcade.play_sound(self.sounds[event])
+
+    def next_level(self):
+        """ Move on to the next level, waiting on a loading screen if it isn't prefetched yet """
+        self.simulation.next_level()
+
+        if level_cache.loading(self.simulation.level):
+            self.window.show_view(LoadingView(self))
+        else:
+            self.setup()
+
+    def on_key_press(self, key, modifiers):
+        """Called whenever a key is pressed. """
+        simulation = self.simulation
+
+        if key == arcade.key.LEFT or key == arcade.key.A:
+            simulation.left_pressed = True
+        elif key == arcade.key.RIGHT or key == arcade.key.D:
+            simulation.right_pressed = True
+        elif key == arcade.key.UP or key == arcade.key.W:
+            simulation.up_pressed = True
+            simulation.jump()
+            self.play_events()
+        elif key == arcade.key.DOWN or key == arcade.key.S:
+            simulation.down_pressed = True
+        
+        # Adding shoot button
+        if key == arcade.key.Q or key == arcade.key.N:
+            simulation.shoot_pressed = True
+
+        # Adding shield button
+        if key == arcade.key.E or key == arcade.key.M:
+            simulation.shield_pressed = True
+
+    def on_key_release(self, key, modifiers):
+        """Called when the user releases a key. """
+        simulation = self.simulation
+
+        if key == arcade.key.LEFT or key == arcade.key.A:
+            simulation.left_pressed = False
+        elif key == arcade.key.RIGHT or key == arcade.key.D:
+            simulation.right_pressed = False
+        elif key == arcade.key.UP or key == arcade.key.W:
+            simulation.up_pressed = False
+        elif key == arcade.key.DOWN or key == arcade.key.S:
+            simulation.down_pressed = False
+
+        # Adding shoot button
+        if key == arcade.key.Q or key == arcade.key.N:
+            simulation.shoot_pressed = False
+
+        # Adding shield button
+        if key == arcade.key.E or key == arcade.key.M:
+            simulation.shield_pressed = False
+
+
+    def on_mouse_press(self, x, y, button, modifiers):
+        """ Called whenever the mouse button is clicked. """
+        left, bottom = self.simulation.player_centered
+        self.simulation.aim(left + x, bottom + y)
+
+    def interpolated_sprite_lists(self):
+        """ The sprite lists drawn blended between simulation ticks """
+        simulation = self.simulation
+        return [
+            simulation.player_list,
+            simulation.scene[LAYER_NAME_ENEMIES],
+            simulation.scene[LAYER_NAME_ALLIES],
+            simulation.moving_sprites_list,
+            simulation.item_list,
+            simulation.scene[LAYER_NAME_PLAYER_BULLETS],
+            simulation.scene[LAYER_NAME_PLAYER_GRENADES],
+        ]
+
+    def on_update(self, delta_time):
+        """ Run the simulation for the time since the last frame """
+        if not USE_FIXED_TIMESTEP:
+            self.interpolator.clear()
+            self.render_alpha = 1.0
+            self.simulation_tick(delta_time)
+            return
+
+        ticks = self.timestep.advance(delta_time)
+        for tick in range(ticks):
+            # Draw between the last two ticks, so remember where things were before the last
+            if tick == ticks - 1:
+                self.interpolator.capture(self.interpolated_sprite_lists())
+            self.simulation_tick(self.timestep.tick)
+            if self.window.current_view is not self:
+                # Game over
+                return
+        self.render_alpha = self.timestep.alpha
+
+
+    def simulation_tick(self, delta_time):
+        """ Run the simulation for one tick, and act on what happened in it """
+        self.simulation.tick(delta_time)
+        self.play_events()
+
+        if self.simulation.game_over:
+            # Flip to the game over view
+            view = GameOverView()
+            self.window.show_view(view)
+        elif self.simulation.level_complete:
+            # Advance to the next level
+            self.next_level()
+
     def on_draw(self):
         """ Draw everything """
         self.clear()
 
-        # Behind items
-        self.background_list.draw()
-        self.foreground_list.draw()
-        self.wall_list.draw()
-        self.ladder_list.draw()
-        self.item_list.draw()
-        self.block_list.draw()
-        self.coin_list.draw()
-        self.heart_list.draw()
-        self.power_ups_list.draw()
-        # This variable contains the enemies and bullets
-        self.scene.draw()
-
-        self.moving_sprites_list.draw()
-        self.dont_touch_list.draw()
-        self.grenade_list.draw()
-        self.player_list.draw()
-        # self.enemies_list.draw()
+        # Draw moving things blended between the last two ticks, with the camera following
+        self.interpolator.apply(self.interpolated_sprite_lists(), self.render_alpha)
+        simulation = self.simulation
+        if not USE_INSTANCED_PROJECTILES:
+            simulation.enemy_bullets.interpolate(self.render_alpha)
+        simulation.center_camera_to_player()
+        self.camera.move_to(simulation.player_centered)
+        self.camera.use()
+
+        # Every layer once, back to front
+        self.renderer.draw(*simulation.camera_view(), self.render_alpha)
 
         # Activate the GUI camera before drawing GUI elements
         self.gui_camera.use()
 
-        # Draw grenade booster count on the screen, scrolling it with the viewport
-        score_text = f"Grenade Booster Remaining: {self.grenade_booster}"
-        arcade.draw_text(
-            score_text,
-            10,
-            160,
-            arcade.csscolor.DARK_GREEN,
-            18,
-        )
-        # Draw invincibility on the screen, scrolling it with the viewport
-        score_text = f"Invincibility Shield Remaining: {self.invincibility_timer}"
-        arcade.draw_text(
-            score_text,
-            10,
-            130,
-            arcade.csscolor.ORANGE_RED,
-            18,
-        )
-        # Draw lives on the screen, scrolling it with the viewport
-        score_text = f"Remaining Life Points: {self.lives}"
-        arcade.draw_text(
-            score_text,
-            10,
-            100,
-            arcade.csscolor.LIGHT_GOLDENROD_YELLOW,
-            18,
-        )
-        # Draw our score on the screen, scrolling it with the viewport
-        score_text = f"Score: {self.score}"
-        arcade.draw_text(
-            score_text,
-            10,
-            70,
-            arcade.csscolor.BLACK,
-            18,
-        )
-
-        # Draw our score on the screen, scrolling it with the viewport
-        level_text = f"Current Level: {self.level}"
-        arcade.draw_text(
-            level_text,
-            10,
-            40,
-            arcade.csscolor.DARK_BLUE,
-            18,
-        )
-
-        # Draw our score on the screen, scrolling it with the viewport
-        levelup_text = f"Player Level Up: {self.level_up}"
-        arcade.draw_text(
-            levelup_text,
-            10,
-            10,
-            arcade.csscolor.DARK_RED,
-            18,
-        )
+        # Draw the grenade booster, invincibility, lives, score, level and level up
+        if USE_BATCHED_HUD:
+            self.hud.update(simulation)
+            self.hud.draw()
+        else:
+            draw_hud_unbatched(simulation)
 
         # Activate our Camera
         self.camera.use()
@@ -2161,6 +5347,9 @@ class GameView(arcade.View):
         self.message4.draw()
         self.message5.draw()
 
+        # Back to where the simulation left things
+        self.interpolator.restore()
+
 def main():
     """ Main function """
     window = arcade.Window(SCREEN_WIDTH, SCREEN_HEIGHT, SCREEN_TITLE)
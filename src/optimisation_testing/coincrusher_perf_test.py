@@ -7,15 +7,29 @@ Artwork from https://kenney.nl
 
 If Python and Arcade are installed, this example can be run from the command line with:
 python -m arcade.examples.stress_test_draw_moving
+
+It has since grown a collision sweep, which needs no window. It times ten
+players checking for hits against a crowd of sprites, for every combination
+of sprite count, how many of the sprites move, hit box detail and collision
+backend, and writes one tidy CSV row of ms/frame percentiles per combination:
+
+python coincrusher_perf_test.py                  # the full sweep
+python coincrusher_perf_test.py --quick          # a small sweep to check it runs
+python coincrusher_perf_test.py --backends spatial_hash numpy_grid --counts 5000 20000
+python coincrusher_perf_test.py --window         # the original windowed test
 """
 
+import argparse
 import arcade
+import csv
+import numpy as np
 import random
 import os
 import timeit
 import time
 import collections
 import pyglet
+import pymunk
 
 # --- Constants ---
 SPRITE_SCALING_COIN = 0.09
@@ -221,12 +235,326 @@ class MyGame(arcade.Window):
                     self.add_coins()
 
 
+# --- Collision sweep ---
+
+# Every combination of these is run
+SWEEP_SPRITE_COUNTS = (1000, 5000, 20000, 50000)
+SWEEP_MOVING_FRACTIONS = (0.0, 0.1, 0.5)
+SWEEP_HIT_BOXES = ("None", "Simple", "Detailed")
+SWEEP_BACKENDS = ("spatial_hash", "brute_force", "numpy_grid", "pymunk")
+
+# The small sweep for --quick
+QUICK_SPRITE_COUNTS = (1000, 5000)
+QUICK_MOVING_FRACTIONS = (0.0, 0.5)
+QUICK_HIT_BOXES = ("None", "Detailed")
+
+# Frames timed for each combination, after some untimed ones to warm up
+SWEEP_FRAMES = 120
+SWEEP_WARMUP_FRAMES = 10
+
+# Checking every sprite for every player is too slow to sweep past this many
+BRUTE_FORCE_MAX_SPRITES = 20000
+
+# How many sprites check for hits each frame, like the bullets or enemies in a level
+PLAYER_COUNT = 10
+
+# Fastest a moving sprite goes, in pixels per frame
+SWEEP_MAX_SPEED = 2
+
+SWEEP_SEED = 1
+SWEEP_RESULTS_FILE = "stress_test_collision_sweep.csv"
+
+SWEEP_COIN_IMAGE = ":resources:images/animated_characters/male_person/malePerson_idle.png"
+SWEEP_PLAYER_IMAGE = ":resources:images/items/coinGold.png"
+
+
+class SweepWorld:
+    """
+    The sprites of one sweep combination, as arrays every backend copies from.
+
+    Everything random comes from a seeded generator, including where a hit
+    sprite is moved to, so backends that find the same hits see exactly the
+    same frames.
+    """
+    def __init__(self, count, moving_fraction, hit_box, seed=SWEEP_SEED):
+        self.rng = np.random.default_rng(seed)
+        self.relocations = np.random.default_rng(seed + 1)
+        self.count = count
+
+        self.texture = arcade.load_texture(SWEEP_COIN_IMAGE, hit_box_algorithm=hit_box)
+        self.scale = SPRITE_SCALING_COIN
+        self.half_width = self.texture.width * self.scale / 2
+        self.half_height = self.texture.height * self.scale / 2
+
+        self.x = self.rng.uniform(SPRITE_SIZE, SCREEN_WIDTH - SPRITE_SIZE, count)
+        self.y = self.rng.uniform(SPRITE_SIZE, SCREEN_HEIGHT - SPRITE_SIZE, count)
+        self.moving = np.arange(int(count * moving_fraction))
+        self.change_x = self.rng.uniform(-SWEEP_MAX_SPEED, SWEEP_MAX_SPEED, len(self.moving))
+        self.change_y = self.rng.uniform(-SWEEP_MAX_SPEED, SWEEP_MAX_SPEED, len(self.moving))
+
+        self.players = []
+        for i in range(PLAYER_COUNT):
+            player = arcade.Sprite(SWEEP_PLAYER_IMAGE, SPRITE_SCALING_PLAYER)
+            player.center_x = self.rng.uniform(0, SCREEN_WIDTH)
+            player.center_y = self.rng.uniform(0, SCREEN_HEIGHT)
+            player.change_x = 3
+            player.change_y = 5
+            self.players.append(player)
+
+    def move(self):
+        """ Move the moving sprites and the players, bouncing off the edges """
+        moving = self.moving
+        x = self.x[moving] + self.change_x
+        y = self.y[moving] + self.change_y
+        self.change_x[(x < 0) | (x > SCREEN_WIDTH)] *= -1
+        self.change_y[(y < 0) | (y > SCREEN_HEIGHT)] *= -1
+        self.x[moving] = x
+        self.y[moving] = y
+
+        for player in self.players:
+            player.update()
+            if player.center_x < 0 and player.change_x < 0 or player.center_x > SCREEN_WIDTH and player.change_x > 0:
+                player.change_x *= -1
+            if player.center_y < 0 and player.change_y < 0 or player.center_y > SCREEN_HEIGHT and player.change_y > 0:
+                player.change_y *= -1
+
+    def relocate(self, index):
+        """ Send a hit sprite somewhere else """
+        self.x[index] = self.relocations.uniform(0, SCREEN_WIDTH)
+        self.y[index] = self.relocations.uniform(0, SCREEN_HEIGHT)
+        return self.x[index], self.y[index]
+
+
+class SpriteListBackend:
+    """ Hits from arcade's own collision checks, with the spatial hash or checking every sprite """
+    def __init__(self, world, use_spatial_hash, method):
+        self.method = method
+        self.sprites = arcade.SpriteList(use_spatial_hash=use_spatial_hash, lazy=True)
+        for index in range(world.count):
+            sprite = arcade.Sprite(texture=world.texture, scale=world.scale)
+            sprite.position = world.x[index], world.y[index]
+            sprite.index = index
+            self.sprites.append(sprite)
+
+    def move(self, world):
+        sprites = self.sprites
+        for index in world.moving:
+            sprites[index].position = world.x[index], world.y[index]
+
+    def relocate(self, index, x, y):
+        self.sprites[index].position = x, y
+
+    def hits(self, player):
+        return sorted(sprite.index for sprite in
+                      arcade.check_for_collision_with_list(player, self.sprites, method=self.method))
+
+
+class NumpyGridBackend(SpriteListBackend):
+    """
+    Hits from a uniform grid over the sprites' centres, kept as NumPy arrays.
+
+    The grid is rebuilt with one sort whenever anything has moved. A query
+    looks up the cells under the player, culls the sprites there by bounding
+    box in one vectorised test and only checks the rest polygon by polygon.
+    """
+    def __init__(self, world):
+        super().__init__(world, use_spatial_hash=False, method=3)
+        self.world = world
+        self.cell_size = 2 * max(world.half_width, world.half_height)
+        self.columns = int(SCREEN_WIDTH // self.cell_size) + 3
+        self.order = None
+        self.sorted_cells = None
+        self.dirty = True
+
+    def _cells(self, x, y):
+        # Pad by a column and row, so sprites bounced a little off the screen still fit
+        column = np.clip((x // self.cell_size).astype(np.int64) + 1, 0, self.columns - 1)
+        row = np.maximum((y // self.cell_size).astype(np.int64) + 1, 0)
+        return row * self.columns + column
+
+    def _index(self):
+        cells = self._cells(self.world.x, self.world.y)
+        self.order = np.argsort(cells, kind="stable")
+        self.sorted_cells = cells[self.order]
+        self.dirty = False
+
+    def move(self, world):
+        super().move(world)
+        self.dirty = True
+
+    def relocate(self, index, x, y):
+        super().relocate(index, x, y)
+        self.dirty = True
+
+    def hits(self, player):
+        if self.dirty:
+            self._index()
+        world = self.world
+        half_width = world.half_width + player.width / 2
+        half_height = world.half_height + player.height / 2
+
+        # Each row of cells under the player is one run of the sorted cells
+        first = self._cells(np.array([player.center_x - half_width]), np.array([player.center_y - half_height]))[0]
+        last = self._cells(np.array([player.center_x + half_width]), np.array([player.center_y + half_height]))[0]
+        first_row, first_column = divmod(first, self.columns)
+        last_row, last_column = divmod(last, self.columns)
+        runs = []
+        for row in range(first_row, last_row + 1):
+            start = np.searchsorted(self.sorted_cells, row * self.columns + first_column, "left")
+            end = np.searchsorted(self.sorted_cells, row * self.columns + last_column, "right")
+            runs.append(self.order[start:end])
+        candidates = np.concatenate(runs)
+
+        near = candidates[(np.abs(world.x[candidates] - player.center_x) <= half_width) &
+                          (np.abs(world.y[candidates] - player.center_y) <= half_height)]
+        return sorted(int(index) for index in near
+                      if arcade.check_for_collision(player, self.sprites[index]))
+
+
+class PymunkBackend:
+    """ Hits from shape queries against a pymunk space, with the sprites as static or kinematic bodies """
+    def __init__(self, world):
+        self.space = pymunk.Space()
+        self.bodies = []
+        vertices = [(x * world.scale, y * world.scale) for x, y in world.texture.hit_box_points]
+        moving = set(world.moving.tolist())
+        for index in range(world.count):
+            body_type = pymunk.Body.KINEMATIC if index in moving else pymunk.Body.STATIC
+            body = pymunk.Body(body_type=body_type)
+            body.position = world.x[index], world.y[index]
+            shape = pymunk.Poly(body, vertices)
+            shape.index = index
+            self.space.add(body, shape)
+            self.bodies.append(body)
+
+        # Each player queries with a shape of its own, not in the space
+        self.player_shapes = {}
+        for player in world.players:
+            body = pymunk.Body(body_type=pymunk.Body.KINEMATIC)
+            points = [(x * player.scale, y * player.scale) for x, y in player.texture.hit_box_points]
+            self.player_shapes[player] = pymunk.Poly(body, points)
+
+    def move(self, world):
+        for index in world.moving:
+            body = self.bodies[index]
+            body.position = world.x[index], world.y[index]
+            self.space.reindex_shapes_for_body(body)
+
+    def relocate(self, index, x, y):
+        body = self.bodies[index]
+        body.position = x, y
+        self.space.reindex_shapes_for_body(body)
+
+    def hits(self, player):
+        shape = self.player_shapes[player]
+        shape.body.position = player.position
+        return sorted(info.shape.index for info in self.space.shape_query(shape))
+
+
+def make_backend(name, world):
+    """ Build a collision backend over a world's sprites """
+    if name == "spatial_hash":
+        return SpriteListBackend(world, use_spatial_hash=True, method=1)
+    if name == "brute_force":
+        return SpriteListBackend(world, use_spatial_hash=False, method=3)
+    if name == "numpy_grid":
+        return NumpyGridBackend(world)
+    if name == "pymunk":
+        return PymunkBackend(world)
+    raise ValueError(f"Unknown collision backend {name}")
+
+
+def run_combination(backend_name, count, moving_fraction, hit_box, frames=SWEEP_FRAMES,
+                    warmup_frames=SWEEP_WARMUP_FRAMES, seed=SWEEP_SEED):
+    """ Time one combination, returning a tidy result row """
+    world = SweepWorld(count, moving_fraction, hit_box, seed)
+    start_time = time.perf_counter()
+    backend = make_backend(backend_name, world)
+    build_time = time.perf_counter() - start_time
+
+    frame_times = []
+    hits = 0
+    for frame in range(warmup_frames + frames):
+        world.move()
+
+        # Only the backend's work is timed: catching up with what moved, and the queries
+        start_time = time.perf_counter()
+        backend.move(world)
+        frame_hits = 0
+        for player in world.players:
+            for index in backend.hits(player):
+                backend.relocate(index, *world.relocate(index))
+                frame_hits += 1
+        frame_time = time.perf_counter() - start_time
+
+        if frame >= warmup_frames:
+            frame_times.append(frame_time)
+            hits += frame_hits
+
+    milliseconds = np.array(frame_times) * 1000
+    return {
+        "backend": backend_name,
+        "sprite_count": count,
+        "moving_fraction": moving_fraction,
+        "hit_box": hit_box,
+        "hit_box_points": len(world.texture.hit_box_points),
+        "players": PLAYER_COUNT,
+        "frames": frames,
+        "build_ms": round(build_time * 1000, 3),
+        "mean_ms": round(float(milliseconds.mean()), 4),
+        "p50_ms": round(float(np.percentile(milliseconds, 50)), 4),
+        "p95_ms": round(float(np.percentile(milliseconds, 95)), 4),
+        "p99_ms": round(float(np.percentile(milliseconds, 99)), 4),
+        "max_ms": round(float(milliseconds.max()), 4),
+        "hits": hits,
+    }
+
+
+def sweep(backends, counts, moving_fractions, hit_boxes, frames, results_file):
+    """ Run every combination, writing each row as soon as it is done """
+    writer = None
+    with open(results_file, "w", newline="") as output:
+        for count in counts:
+            for moving_fraction in moving_fractions:
+                for hit_box in hit_boxes:
+                    for backend_name in backends:
+                        if backend_name == "brute_force" and count > BRUTE_FORCE_MAX_SPRITES:
+                            continue
+                        row = run_combination(backend_name, count, moving_fraction, hit_box, frames)
+                        if writer is None:
+                            writer = csv.DictWriter(output, fieldnames=list(row))
+                            writer.writeheader()
+                        writer.writerow(row)
+                        output.flush()
+                        print(f"{backend_name:>12} {count:>6} sprites, {moving_fraction:.0%} moving, "
+                              f"{hit_box} hit box: {row['mean_ms']:.3f}ms mean, {row['p95_ms']:.3f}ms p95, "
+                              f"{row['hits']} hits")
+
+
 def main():
     """ Main function """
-    window = MyGame()
-    window.setup()
-    arcade.run()
+    parser = argparse.ArgumentParser(description="Collision stress tests")
+    parser.add_argument("--window", action="store_true", help="run the original windowed stress test")
+    parser.add_argument("--quick", action="store_true", help="run a small sweep")
+    parser.add_argument("--backends", nargs="+", choices=SWEEP_BACKENDS, default=SWEEP_BACKENDS)
+    parser.add_argument("--counts", nargs="+", type=int, help="sprite counts to sweep")
+    parser.add_argument("--moving", nargs="+", type=float, help="fractions of the sprites that move")
+    parser.add_argument("--hit-boxes", nargs="+", choices=SWEEP_HIT_BOXES, help="hit box algorithms")
+    parser.add_argument("--frames", type=int, default=SWEEP_FRAMES, help="frames to time per combination")
+    parser.add_argument("--output", default=SWEEP_RESULTS_FILE, help="CSV file to write")
+    args = parser.parse_args()
+
+    if args.window:
+        window = MyGame()
+        window.setup()
+        arcade.run()
+        return
+
+    counts = args.counts or (QUICK_SPRITE_COUNTS if args.quick else SWEEP_SPRITE_COUNTS)
+    moving_fractions = args.moving or (QUICK_MOVING_FRACTIONS if args.quick else SWEEP_MOVING_FRACTIONS)
+    hit_boxes = args.hit_boxes or (QUICK_HIT_BOXES if args.quick else SWEEP_HIT_BOXES)
+    sweep(args.backends, counts, moving_fractions, hit_boxes, args.frames, args.output)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
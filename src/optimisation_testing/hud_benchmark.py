@@ -0,0 +1,104 @@
+"""
+HUD Benchmark
+
+Times drawing the game's HUD both ways, a line at a time with
+arcade.draw_text as it used to be, and as one batch of labels that are only
+laid out again when their values change (jinxs_adventure.Hud). The HUD
+values change as they would in play, the score every few frames and the
+rest now and then. It needs a window, which is kept hidden:
+
+python hud_benchmark.py                          # 3000 frames each way
+python hud_benchmark.py --frames 600 --score-every 1
+"""
+
+import argparse
+import os
+import sys
+import time
+import types
+
+import arcade
+import numpy as np
+
+# The game is two folders up
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, REPO_ROOT)
+
+import jinxs_adventure  # noqa: E402
+
+# --- Constants ---
+FRAMES = 3000
+WARMUP_FRAMES = 60
+
+# How many frames between changes to the score, and to everything else
+SCORE_EVERY = 10
+OTHERS_EVERY = 120
+
+
+def hud_values(frame, score_every, others_every):
+    """ The values the HUD shows on a frame, as a stand in for the simulation """
+    change = frame // others_every
+    return types.SimpleNamespace(
+        grenade_booster=change % 4,
+        invincibility_timer=change % 3,
+        lives=10 - change % 10,
+        score=frame // score_every,
+        level=change // 8,
+        level_up=change // 2,
+    )
+
+
+def time_frames(window, draw, frames, score_every, others_every):
+    """ Draw the HUD for some frames, returning each frame's time in milliseconds """
+    frame_times = []
+    for frame in range(WARMUP_FRAMES + frames):
+        simulation = hud_values(frame, score_every, others_every)
+        window.clear()
+        start_time = time.perf_counter()
+        draw(simulation)
+        # Wait for the GPU too, so its share is counted
+        window.ctx.finish()
+        if frame >= WARMUP_FRAMES:
+            frame_times.append((time.perf_counter() - start_time) * 1000)
+    return np.array(frame_times)
+
+
+def main():
+    """ Main function """
+    parser = argparse.ArgumentParser(description="Time drawing the HUD with and without batching")
+    parser.add_argument("--frames", type=int, default=FRAMES, help="frames to time each way")
+    parser.add_argument("--score-every", type=int, default=SCORE_EVERY, help="frames between score changes")
+    parser.add_argument("--others-every", type=int, default=OTHERS_EVERY,
+                        help="frames between changes to the other lines")
+    args = parser.parse_args()
+
+    window = arcade.Window(jinxs_adventure.SCREEN_WIDTH, jinxs_adventure.SCREEN_HEIGHT,
+                           "HUD Benchmark", visible=False)
+    gui_camera = arcade.Camera(window.width, window.height)
+    gui_camera.use()
+
+    hud = jinxs_adventure.Hud()
+
+    def batched(simulation):
+        hud.update(simulation)
+        hud.draw()
+
+    results = {
+        "draw_text": time_frames(window, jinxs_adventure.draw_hud_unbatched,
+                                 args.frames, args.score_every, args.others_every),
+        "batched": time_frames(window, batched, args.frames, args.score_every, args.others_every),
+    }
+
+    print(f"{'':>10} {'mean ms':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for name, frame_times in results.items():
+        print(f"{name:>10} {frame_times.mean():8.4f} {np.percentile(frame_times, 50):8.4f} "
+              f"{np.percentile(frame_times, 95):8.4f} {np.percentile(frame_times, 99):8.4f}")
+    print(f"The batched HUD was laid out {hud.layouts} times in {WARMUP_FRAMES + args.frames} frames, "
+          f"where draw_text laid out {len(jinxs_adventure.HUD_FIELDS) * (WARMUP_FRAMES + args.frames)} lines")
+    print(f"Speed up: {results['draw_text'].mean() / results['batched'].mean():.1f}x")
+
+    window.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,394 @@
+"""
+Level Benchmark
+
+Plays every level headless with the same scripted input and seeded enemy
+weapons, timing each phase of the simulation:
+
+physics    - the pymunk step, less the player animation inside it
+ai         - enemy patrols and firing, and moving their bullets
+collision  - the broadphase, projectile hits and culling
+animation  - enemy, ally and player animation
+streaming  - tiles and characters coming and going around the camera
+draw       - drawing the frame, only with --draw as it needs a window
+
+Each level also gets its load time, the most sprites and bullets that were
+in play at once and, with --draw, the most draw calls a frame took. Results
+are written as JSON and CSV, and can be compared against an earlier JSON run
+to flag regressions:
+
+python level_benchmark.py                         # every level, 600 frames each
+python level_benchmark.py 1 16 --frames 3000      # just levels 1 and 16, for longer
+python level_benchmark.py --baseline baseline.json --threshold 0.15
+"""
+
+import argparse
+import csv
+import json
+import os
+import platform
+import sys
+import time
+
+import numpy as np
+
+# The game is two folders up
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, REPO_ROOT)
+
+import jinxs_adventure  # noqa: E402
+
+# --- Constants ---
+FRAMES_PER_LEVEL = 600
+FRAME_TIME = 1 / jinxs_adventure.SIMULATION_TICK_RATE
+SEED = 1234
+
+RESULTS_FILE = "level_benchmark"
+
+# A phase is a regression if it got slower than the baseline by more than
+# this fraction, and by more than the noise floor in milliseconds per frame
+REGRESSION_THRESHOLD = 0.10
+REGRESSION_NOISE_FLOOR_MS = 0.05
+
+PHASES = ("physics", "ai", "collision", "animation", "streaming", "draw")
+
+# What the player does, over and over: (frames, keys held, jump at the start,
+# throw grenades at this offset from the player at the start or None)
+INPUT_SCRIPT = (
+    (90, {"right"}, False, None),
+    (20, {"right", "shoot"}, True, None),
+    (60, {"right"}, False, (400, 100)),
+    (30, {"right", "shield"}, True, None),
+    (40, {"left", "shoot"}, False, None),
+    (120, {"right", "shoot"}, True, (300, -50)),
+    (30, {"up"}, False, None),
+    (60, {"right"}, True, None),
+)
+
+# Which of the simulation's pressed flags each scripted key sets
+SCRIPT_KEYS = {
+    "left": "left_pressed",
+    "right": "right_pressed",
+    "up": "up_pressed",
+    "down": "down_pressed",
+    "shoot": "shoot_pressed",
+    "shield": "shield_pressed",
+}
+
+
+class PhaseTimer:
+    """
+    Times calls into the simulation by phase.
+
+    Methods are wrapped on the instances (or classes) that own them. A phase
+    only counts its own time, so a call into another phase from inside it,
+    such as the player animating during the physics step, is taken off.
+    """
+    def __init__(self):
+        self.frame = dict.fromkeys(PHASES, 0.0)
+        self.frames = {phase: [] for phase in PHASES}
+        self._stack = []
+        self._patched = []
+
+    def wrap(self, owner, name, phase):
+        """ Time every call to owner.name as phase """
+        original = getattr(owner, name)
+        timer = self
+
+        def timed(*args, **kwargs):
+            return timer.call(phase, original, *args, **kwargs)
+
+        if isinstance(owner, type):
+            # Unbound, so the wrapper gets self as its first argument
+            original = owner.__dict__[name]
+        setattr(owner, name, timed)
+        self._patched.append((owner, name, original))
+
+    def call(self, phase, function, *args, **kwargs):
+        start = time.perf_counter()
+        self._stack.append(0.0)
+        try:
+            return function(*args, **kwargs)
+        finally:
+            nested = self._stack.pop()
+            elapsed = time.perf_counter() - start
+            self.frame[phase] += elapsed - nested
+            if self._stack:
+                self._stack[-1] += elapsed
+
+    def time(self, phase, function, *args):
+        """ Time a single call that isn't wrapped """
+        return self.call(phase, function, *args)
+
+    def end_frame(self):
+        for phase in PHASES:
+            self.frames[phase].append(self.frame[phase])
+        self.frame = dict.fromkeys(PHASES, 0.0)
+
+    def unwrap(self):
+        """ Put back everything wrap replaced, newest first """
+        for owner, name, original in reversed(self._patched):
+            if isinstance(owner, type):
+                setattr(owner, name, original)
+            else:
+                # The wrapper shadowed the class's method on the instance
+                delattr(owner, name)
+        self._patched = []
+
+
+def wrap_simulation(timer, simulation):
+    """ Wrap the parts of a simulation that belong to each phase. Needed again after every setup. """
+    timer.wrap(simulation.physics_engine, "step", "physics")
+
+    timer.wrap(simulation.enemy_detail, "update", "ai")
+    timer.wrap(simulation.enemy_weapons, "fire", "ai")
+    timer.wrap(simulation.enemy_bullets, "update", "ai")
+
+    timer.wrap(simulation.collisions, "rebuild", "collision")
+    timer.wrap(simulation.collisions, "query", "collision")
+    timer.wrap(simulation.terrain, "hits", "collision")
+    timer.wrap(simulation.projectile_culler, "cull", "collision")
+
+    timer.wrap(simulation.scene, "update_animation", "animation")
+
+    timer.wrap(simulation.tile_streamer, "update", "streaming")
+    timer.wrap(simulation.enemy_spawner, "update", "streaming")
+    timer.wrap(simulation.ally_spawner, "update", "streaming")
+
+
+def wrap_classes(timer):
+    """ Animation is done by the sprites themselves, so is wrapped on their classes """
+    timer.wrap(jinxs_adventure.Enemy, "update_animation", "animation")
+    timer.wrap(jinxs_adventure.Ally, "update_animation", "animation")
+    timer.wrap(jinxs_adventure.PlayerSprite, "pymunk_moved", "animation")
+
+
+def script_steps(frames):
+    """ The scripted input for each frame: keys held, whether to jump and where to throw """
+    step = 0
+    while step < frames:
+        for length, keys, jump, throw in INPUT_SCRIPT:
+            for frame in range(length):
+                if step >= frames:
+                    return
+                yield keys, jump and frame == 0, throw if frame == 0 else None
+                step += 1
+
+
+def sprite_count(simulation):
+    """ How many sprites are in play """
+    return (sum(len(sprite_list) for sprite_list in simulation.scene.sprite_lists)
+            + simulation.tile_streamer.sprite_count
+            + len(simulation.player_list))
+
+
+def bullet_count(simulation):
+    """ How many projectiles are in flight """
+    scene = simulation.scene
+    return (simulation.enemy_bullets.count
+            + len(scene[jinxs_adventure.LAYER_NAME_PLAYER_BULLETS])
+            + len(scene[jinxs_adventure.LAYER_NAME_PLAYER_GRENADES])
+            + len(scene[jinxs_adventure.LAYER_NAME_SHIELD]))
+
+
+def summarise(samples):
+    """ Milliseconds per frame: mean, median, 95th percentile and worst """
+    milliseconds = np.array(samples) * 1000
+    return {
+        "mean_ms": float(milliseconds.mean()),
+        "p50_ms": float(np.percentile(milliseconds, 50)),
+        "p95_ms": float(np.percentile(milliseconds, 95)),
+        "max_ms": float(milliseconds.max()),
+    }
+
+
+def run_level(level, frames, seed, view=None):
+    """ Load a level from cold and play it for a number of frames """
+    # Time the load on its own, from nothing cached
+    jinxs_adventure.level_cache.clear()
+    start_time = time.perf_counter()
+    jinxs_adventure.level_cache.get(level)
+    load_time = time.perf_counter() - start_time
+
+    simulation = view.simulation if view else jinxs_adventure.GameSimulation(seed=seed)
+    simulation.level = level
+    start_time = time.perf_counter()
+    if view:
+        view.setup()
+    else:
+        simulation.setup()
+        # The view plays these as it sets up, so only a headless run has them left
+        simulation.drain_events()
+    setup_time = time.perf_counter() - start_time
+
+    # Let the prefetch of the next level finish, so it doesn't steal time from this one
+    while jinxs_adventure.level_cache.loading(level + 1):
+        time.sleep(0.01)
+
+    timer = PhaseTimer()
+    wrap_classes(timer)
+    wrap_simulation(timer, simulation)
+
+    tick_times = []
+    peak_sprites = peak_bullets = peak_draw_calls = 0
+    restarts = completions = 0
+    try:
+        for keys, jump, throw in script_steps(frames):
+            for key, flag in SCRIPT_KEYS.items():
+                setattr(simulation, flag, key in keys)
+            if jump:
+                simulation.jump()
+            if throw:
+                simulation.aim(simulation.player_sprite.center_x + throw[0],
+                               simulation.player_sprite.center_y + throw[1])
+
+            start_time = time.perf_counter()
+            simulation.tick(FRAME_TIME)
+            tick_times.append(time.perf_counter() - start_time)
+
+            events = simulation.drain_events()
+            if simulation.level_complete:
+                # Play the same level again rather than moving on
+                completions += 1
+                simulation.setup()
+                events += simulation.drain_events()
+            if "level_started" in events:
+                # The player lost a life, or the level was set up again
+                restarts += 1
+                timer.unwrap()
+                wrap_classes(timer)
+                wrap_simulation(timer, simulation)
+                if view:
+                    view.level_started()
+
+            if view:
+                timer.time("draw", view.on_draw)
+                peak_draw_calls = max(peak_draw_calls, sum(view.renderer.draw_calls.values()))
+
+            peak_sprites = max(peak_sprites, sprite_count(simulation))
+            peak_bullets = max(peak_bullets, bullet_count(simulation))
+            timer.end_frame()
+    finally:
+        timer.unwrap()
+
+    phases = {phase: summarise(samples) for phase, samples in timer.frames.items()
+              if view or phase != "draw"}
+    return {
+        "level": level,
+        "frames": frames,
+        "load_ms": load_time * 1000,
+        "setup_ms": setup_time * 1000,
+        "tick": summarise(tick_times),
+        "ticks_per_second": len(tick_times) / sum(tick_times),
+        "phases": phases,
+        "peak_sprites": peak_sprites,
+        "peak_bullets": peak_bullets,
+        "peak_draw_calls": peak_draw_calls,
+        "restarts": restarts,
+        "completions": completions,
+        "score": simulation.score,
+    }
+
+
+def all_levels():
+    """ Every level that has a Tiled map """
+    levels = []
+    level = 0
+    while os.path.exists(jinxs_adventure.level_map_paths(level)[0]):
+        levels.append(level)
+        level += 1
+    return levels
+
+
+def write_csv(path, results):
+    """ One row per level and phase, with the level's load time and peaks repeated on each """
+    with open(path, "w", newline="") as results_file:
+        writer = csv.writer(results_file)
+        writer.writerow(["level", "phase", "mean_ms", "p50_ms", "p95_ms", "max_ms",
+                         "load_ms", "setup_ms", "peak_sprites", "peak_bullets"])
+        for result in results:
+            rows = [("tick", result["tick"])] + list(result["phases"].items())
+            for phase, stats in rows:
+                writer.writerow([result["level"], phase,
+                                 f"{stats['mean_ms']:.4f}", f"{stats['p50_ms']:.4f}",
+                                 f"{stats['p95_ms']:.4f}", f"{stats['max_ms']:.4f}",
+                                 f"{result['load_ms']:.2f}", f"{result['setup_ms']:.2f}",
+                                 result["peak_sprites"], result["peak_bullets"]])
+
+
+def regressions(results, baseline, threshold, noise_floor_ms=REGRESSION_NOISE_FLOOR_MS):
+    """ (level, measure, baseline ms, current ms) for everything that got slower than the baseline allows """
+    baseline_levels = {result["level"]: result for result in baseline["levels"]}
+    found = []
+    for result in results:
+        before = baseline_levels.get(result["level"])
+        if before is None:
+            continue
+        measures = [("load", before["load_ms"], result["load_ms"]),
+                    ("tick", before["tick"]["mean_ms"], result["tick"]["mean_ms"])]
+        for phase, stats in result["phases"].items():
+            if phase in before["phases"]:
+                measures.append((phase, before["phases"][phase]["mean_ms"], stats["mean_ms"]))
+        for measure, old, new in measures:
+            if new - old > noise_floor_ms and new > old * (1 + threshold):
+                found.append((result["level"], measure, old, new))
+    return found
+
+
+def main():
+    """ Main function """
+    parser = argparse.ArgumentParser(description="Benchmark every level with scripted input")
+    parser.add_argument("levels", nargs="*", type=int, help="levels to run (default: all)")
+    parser.add_argument("--frames", type=int, default=FRAMES_PER_LEVEL, help="frames to play each level for")
+    parser.add_argument("--seed", type=int, default=SEED, help="seed for the enemy weapons")
+    parser.add_argument("--output", default=RESULTS_FILE, help="results file name, without extension")
+    parser.add_argument("--baseline", help="an earlier JSON results file to compare against")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                        help="how much slower than the baseline is a regression, as a fraction")
+    parser.add_argument("--draw", action="store_true", help="open a window and time drawing too")
+    args = parser.parse_args()
+
+    view = None
+    if args.draw:
+        import arcade
+        window = arcade.Window(jinxs_adventure.SCREEN_WIDTH, jinxs_adventure.SCREEN_HEIGHT, "Level Benchmark")
+        view = jinxs_adventure.GameView()
+        view.simulation = jinxs_adventure.GameSimulation(view.width, view.height, seed=args.seed)
+        window.show_view(view)
+
+    results = []
+    for level in args.levels or all_levels():
+        result = run_level(level, args.frames, args.seed, view)
+        results.append(result)
+        print(f"level {level}: load {result['load_ms']:.1f}ms, "
+              f"tick {result['tick']['mean_ms']:.2f}ms mean {result['tick']['p95_ms']:.2f}ms p95, "
+              f"{result['ticks_per_second']:.0f} ticks/s, "
+              f"peak {result['peak_sprites']} sprites {result['peak_bullets']} bullets")
+
+    report = {
+        "frames": args.frames,
+        "seed": args.seed,
+        "draw": args.draw,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "levels": results,
+    }
+    with open(args.output + ".json", "w") as results_file:
+        json.dump(report, results_file, indent=2)
+    write_csv(args.output + ".csv", results)
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+        if baseline["frames"] != args.frames or baseline["seed"] != args.seed:
+            print("Warning: the baseline was run with different frames or seed, so timings may not compare")
+        found = regressions(results, baseline, args.threshold)
+        for level, measure, old, new in found:
+            print(f"REGRESSION level {level} {measure}: {old:.3f}ms -> {new:.3f}ms")
+        if found:
+            return 1
+        print("No regressions against the baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())